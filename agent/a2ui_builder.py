@@ -0,0 +1,430 @@
+"""
+Server-side A2UI assembly from compact content.
+
+Most of an A2UI payload is boilerplate: surface IDs, component IDs,
+`explicitList` children, `literalString` wrappers and Row/Column layout.
+Following deploy.py's generate_flashcards, the model only writes the content
+of a format (e.g. a list of {front, back, category} cards, constrained by
+CONTENT_SCHEMAS) and build() turns it into the A2UI messages the frontend
+renders. The deterministic renderers use the same builders, so both paths
+produce identical trees.
+
+List formats are laid out by a CardLayout: an optional header, then the cards
+directly in mainColumn, in one Row, or in Rows of a fixed size. SurfaceStream
+builds a list format incrementally while the model is still streaming items.
+"""
+
+from typing import Any, Callable, Mapping, Optional
+
+try:
+    from agent.a2ui_templates import SURFACE_ID
+    from agent.a2ui_schemas import Validator, compile_validator
+except ImportError:
+    from a2ui_templates import SURFACE_ID
+    from a2ui_schemas import Validator, compile_validator
+
+Component = dict[str, Any]
+Message = dict[str, Any]
+
+
+# =============================================================================
+# Component helpers
+# =============================================================================
+
+def literal(text: str) -> dict[str, str]:
+    return {"literalString": text}
+
+
+def column(component_id: str, children: list[str]) -> Component:
+    return {
+        "id": component_id,
+        "component": {"Column": {"children": {"explicitList": children}, "distribution": "start", "alignment": "stretch"}},
+    }
+
+
+def row(component_id: str, children: list[str]) -> Component:
+    return {
+        "id": component_id,
+        "component": {"Row": {"children": {"explicitList": children}, "distribution": "start", "alignment": "stretch"}},
+    }
+
+
+def text(component_id: str, value: str, usage_hint: str) -> Component:
+    return {"id": component_id, "component": {"Text": {"text": literal(value), "usageHint": usage_hint}}}
+
+
+def portfolio_card(component_id: str, card_type: str, item: Mapping[str, Any]) -> Component:
+    card = {"type": card_type, "title": literal(item.get("title", ""))}
+    for key in ("description", "image", "url"):
+        if item.get(key):
+            card[key] = literal(item[key])
+    return {"id": component_id, "component": {"PortfolioCard": card}}
+
+
+def flashcard(component_id: str, item: Mapping[str, Any]) -> Component:
+    return {
+        "id": component_id,
+        "component": {
+            "Flashcard": {
+                "front": literal(item.get("front", "")),
+                "back": literal(item.get("back", "")),
+                "category": literal(item.get("category", "")),
+            }
+        },
+    }
+
+
+def quiz_card(component_id: str, item: Mapping[str, Any]) -> Component:
+    # Option values only need to be unique within the card
+    options = [
+        {"label": literal(option.get("label", "")), "value": chr(ord("a") + i), "isCorrect": bool(option.get("isCorrect"))}
+        for i, option in enumerate(item.get("options", []))
+    ]
+    return {
+        "id": component_id,
+        "component": {
+            "QuizCard": {
+                "question": literal(item.get("question", "")),
+                "options": options,
+                "explanation": literal(item.get("explanation", "")),
+                "category": literal(item.get("category", "")),
+            }
+        },
+    }
+
+
+def experience_card(component_id: str, item: Mapping[str, Any]) -> Component:
+    return {
+        "id": component_id,
+        "component": {
+            "ExperienceCard": {
+                "company": item.get("company", ""),
+                "role": item.get("role", ""),
+                "period": item.get("period", ""),
+                "logo": item.get("logo", ""),
+                "color": item.get("color", ""),
+                "highlights": list(item.get("highlights", [])),
+                "impact": item.get("impact", ""),
+            }
+        },
+    }
+
+
+def begin_rendering(root: str = "mainColumn") -> Message:
+    return {"beginRendering": {"surfaceId": SURFACE_ID, "root": root}}
+
+
+def surface_update(components: list[Component]) -> Message:
+    return {"surfaceUpdate": {"surfaceId": SURFACE_ID, "components": components}}
+
+
+# =============================================================================
+# Content schemas
+# =============================================================================
+
+_STRING = {"type": "string"}
+
+CARD_ITEM = {
+    "type": "object",
+    "properties": {"title": _STRING, "description": _STRING, "image": _STRING, "url": _STRING},
+    "required": ["title", "description"],
+}
+
+FLASHCARD_ITEM = {
+    "type": "object",
+    "properties": {"front": _STRING, "back": _STRING, "category": _STRING},
+    "required": ["front", "back", "category"],
+}
+
+QUIZ_ITEM = {
+    "type": "object",
+    "properties": {
+        "question": _STRING,
+        "options": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"label": _STRING, "isCorrect": {"type": "boolean"}},
+                "required": ["label", "isCorrect"],
+            },
+        },
+        "explanation": _STRING,
+        "category": _STRING,
+    },
+    "required": ["question", "options", "explanation", "category"],
+}
+
+EXPERIENCE_ITEM = {
+    "type": "object",
+    "properties": {
+        "company": _STRING,
+        "role": _STRING,
+        "period": _STRING,
+        "logo": _STRING,
+        "color": _STRING,
+        "highlights": {"type": "array", "items": _STRING},
+        "impact": _STRING,
+    },
+    "required": ["company", "role", "period", "logo", "color", "highlights", "impact"],
+}
+
+IMAGE_CONTENT = {
+    "type": "object",
+    "properties": {
+        "variant": {"type": "string", "enum": ["image", "profile_bubble"]},
+        "url": _STRING,
+        "alt": _STRING,
+    },
+    "required": ["variant", "url", "alt"],
+}
+
+VIDEO_CONTENT = {
+    "type": "object",
+    "properties": {"url": _STRING},
+    "required": ["url"],
+}
+
+CREATIVE_CONTENT = {
+    "type": "object",
+    "properties": {
+        "title": _STRING,
+        "sections": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "heading": _STRING,
+                    "items": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "kind": {"type": "string", "enum": ["card", "text", "image", "profile_bubble"]},
+                                "title": _STRING,
+                                "text": _STRING,
+                                "image": _STRING,
+                                "url": _STRING,
+                            },
+                            "required": ["kind"],
+                        },
+                    },
+                },
+                "required": ["heading", "items"],
+            },
+        },
+    },
+    "required": ["title", "sections"],
+}
+
+
+# =============================================================================
+# List formats
+# =============================================================================
+
+class CardLayout:
+    """
+    Layout of a list format: mainColumn > [header] > cards.
+
+    Cards go directly in mainColumn when grid is None, in a single Row named
+    grid, or, with per_row, in Rows named grid1, grid2, ... of per_row cards.
+    """
+
+    __slots__ = ("prefix", "build_card", "header", "grid", "per_row")
+
+    def __init__(
+        self,
+        prefix: str,
+        build_card: Callable[[str, Mapping[str, Any]], Component],
+        header: Optional[str] = None,
+        grid: Optional[str] = None,
+        per_row: Optional[int] = None,
+    ):
+        self.prefix = prefix
+        self.build_card = build_card
+        self.header = header
+        self.grid = grid
+        self.per_row = per_row
+
+    def card_id(self, index: int) -> str:
+        return f"{self.prefix}{index + 1}"
+
+    def containers(self, ids: list[str]) -> list[Component]:
+        """mainColumn and any Rows holding the given card IDs."""
+        head = ["header"] if self.header else []
+        if self.grid is None:
+            return [column("mainColumn", head + ids)]
+        if self.per_row is None:
+            return [column("mainColumn", head + [self.grid]), row(self.grid, ids)]
+
+        rows = [ids[i:i + self.per_row] for i in range(0, len(ids), self.per_row)]
+        row_ids = [f"{self.grid}{i + 1}" for i in range(len(rows))]
+        return [column("mainColumn", head + row_ids)] + [row(r, children) for r, children in zip(row_ids, rows)]
+
+    def layout(self, ids: list[str], with_header: bool = True) -> list[Component]:
+        """mainColumn, the header and the Rows, in that order."""
+        main, *rows = self.containers(ids)
+        header = [text("header", self.header, "h2")] if self.header and with_header else []
+        return [main] + header + rows
+
+    def build(self, items: list[Mapping[str, Any]]) -> list[Message]:
+        ids = [self.card_id(i) for i in range(len(items))]
+        cards = [self.build_card(card_id, item) for card_id, item in zip(ids, items)]
+        return [begin_rendering(), surface_update(self.layout(ids) + cards)]
+
+
+def _cards(card_type: str) -> Callable[[str, Mapping[str, Any]], Component]:
+    return lambda component_id, item: portfolio_card(component_id, card_type, item)
+
+
+LIST_LAYOUTS: dict[str, CardLayout] = {
+    "flashcards": CardLayout("card", flashcard),
+    # podcast has no template of its own and shows flashcards
+    "podcast": CardLayout("card", flashcard),
+    "quiz": CardLayout("q", quiz_card),
+    "timeline": CardLayout("exp", experience_card, header="Career Historian 📜"),
+    "video_cards": CardLayout("v", _cards("video"), header="Cinema Hub 🎬", grid="videoGrid"),
+    "blog_cards": CardLayout("b", _cards("blog"), header="Insight Stream ✍️", grid="blogRow", per_row=3),
+    "awards": CardLayout("a", _cards("project"), header="Trophy Room 🏆", grid="awardGrid"),
+    "certs": CardLayout("c", _cards("project"), header="Cloud Badge Wall ☁️", grid="certGrid"),
+    "speaker": CardLayout("s", flashcard, header="Stage Presence 🎤", grid="speakerGrid"),
+    "testimonials": CardLayout("t", flashcard, header="Googler Vibes ✨", grid="tGrid"),
+    "gallery": CardLayout("g", _cards("project"), header="Hall of Mastery 🖼️", grid="galleryGrid"),
+    "comics": CardLayout("c", _cards("project"), header="The Agentic Adventures 📂", grid="comicGrid"),
+}
+
+_LIST_ITEMS: dict[str, dict[str, Any]] = {
+    "flashcards": FLASHCARD_ITEM,
+    "podcast": FLASHCARD_ITEM,
+    "quiz": QUIZ_ITEM,
+    "timeline": EXPERIENCE_ITEM,
+    "video_cards": CARD_ITEM,
+    "blog_cards": CARD_ITEM,
+    "awards": CARD_ITEM,
+    "certs": CARD_ITEM,
+    "speaker": FLASHCARD_ITEM,
+    "testimonials": FLASHCARD_ITEM,
+    "gallery": CARD_ITEM,
+    "comics": CARD_ITEM,
+}
+
+
+# =============================================================================
+# Single-surface formats
+# =============================================================================
+
+def build_image(content: Mapping[str, Any]) -> list[Message]:
+    if content.get("variant") == "profile_bubble":
+        component = {"ProfileBubble": {"image": content.get("url", ""), "size": "240px"}}
+    else:
+        component = {"Image": {"url": content.get("url", ""), "alt": content.get("alt", "")}}
+    return [begin_rendering(), surface_update([{"id": "mainColumn", "component": component}])]
+
+
+def build_video(content: Mapping[str, Any]) -> list[Message]:
+    return [begin_rendering(), surface_update([{"id": "mainColumn", "component": {"Video": {"url": content.get("url", "")}}}])]
+
+
+def _creative_item(component_id: str, item: Mapping[str, Any]) -> Component:
+    kind = item.get("kind")
+    if kind == "text":
+        return text(component_id, item.get("text", ""), "body")
+    if kind == "image":
+        image = {"url": item.get("image") or item.get("url", ""), "alt": item.get("title", "")}
+        return {"id": component_id, "component": {"Image": image}}
+    if kind == "profile_bubble":
+        return {"id": component_id, "component": {"ProfileBubble": {"image": item.get("image", ""), "size": "240px"}}}
+    card = {"title": item.get("title", ""), "description": item.get("text", ""), "image": item.get("image"), "url": item.get("url")}
+    return portfolio_card(component_id, "project", card)
+
+
+def build_creative(content: Mapping[str, Any]) -> list[Message]:
+    """mainColumn > title + (heading, Row of items) per section."""
+    body: list[str] = []
+    components: list[Component] = [text("header", content.get("title", ""), "h2")]
+    for s, section in enumerate(content.get("sections", [])):
+        heading_id, row_id = f"section{s + 1}", f"section{s + 1}Row"
+        item_ids = [f"{row_id}Item{i + 1}" for i in range(len(section.get("items", [])))]
+        body += [heading_id, row_id]
+        components.append(text(heading_id, section.get("heading", ""), "h3"))
+        components.append(row(row_id, item_ids))
+        components += [_creative_item(item_id, item) for item_id, item in zip(item_ids, section.get("items", []))]
+    return [begin_rendering(), surface_update([column("mainColumn", ["header"] + body)] + components)]
+
+
+_SINGLE_BUILDERS: dict[str, Callable[[Mapping[str, Any]], list[Message]]] = {
+    "image": build_image,
+    "video": build_video,
+    "creative": build_creative,
+}
+
+CONTENT_SCHEMAS: dict[str, dict[str, Any]] = {
+    **{name: {"type": "array", "items": item} for name, item in _LIST_ITEMS.items()},
+    "image": IMAGE_CONTENT,
+    "video": VIDEO_CONTENT,
+    "creative": CREATIVE_CONTENT,
+}
+
+_CONTENT_VALIDATORS: dict[str, Validator] = {name: compile_validator(schema) for name, schema in CONTENT_SCHEMAS.items()}
+
+
+# =============================================================================
+# Public API
+# =============================================================================
+
+def get_content_schema(format_type: str) -> Optional[dict[str, Any]]:
+    """The `response_schema` the model fills for a format, or None."""
+    return CONTENT_SCHEMAS.get(format_type)
+
+
+def content_errors(format_type: str, content: Any) -> list[str]:
+    """Validate model content for a format; returns a list of errors."""
+    validator = _CONTENT_VALIDATORS.get(format_type)
+    if validator is None:
+        return [f"no content schema for format: {format_type}"]
+    errors: list[str] = []
+    validator(content, "$", errors)
+    if not errors and not content:
+        errors.append("$: empty content")
+    return errors
+
+
+def build(format_type: str, content: Any) -> list[Message]:
+    """Assemble the A2UI messages for a format from its content."""
+    layout = LIST_LAYOUTS.get(format_type)
+    if layout is not None:
+        return layout.build(content)
+    builder = _SINGLE_BUILDERS.get(format_type)
+    if builder is None:
+        raise ValueError(f"No A2UI builder for format: {format_type}")
+    return builder(content)
+
+
+class SurfaceStream:
+    """
+    Incrementally build a list format as its items arrive.
+
+    add() returns the messages that draw one more card: beginRendering and
+    the header with the first card, then the containers re-sent with the new
+    child list and the card itself. The renderer merges components by ID, so
+    the surface ends up identical to build() over all the items.
+    """
+
+    def __init__(self, layout: CardLayout):
+        self.layout = layout
+        self._ids: list[str] = []
+
+    def add(self, item: Mapping[str, Any]) -> list[Message]:
+        card_id = self.layout.card_id(len(self._ids))
+        self._ids.append(card_id)
+        first = len(self._ids) == 1
+        components = self.layout.layout(self._ids, with_header=first)
+        components.append(self.layout.build_card(card_id, item))
+
+        update = surface_update(components)
+        return [begin_rendering(), update] if first else [update]
+
+
+def surface_stream(format_type: str) -> Optional[SurfaceStream]:
+    """An incremental builder for a list format, or None for other formats."""
+    layout = LIST_LAYOUTS.get(format_type)
+    return SurfaceStream(layout) if layout is not None else None
@@ -0,0 +1,303 @@
+"""
+Schemas and validators for assembled A2UI messages.
+
+The component shapes (Flashcard, PortfolioCard, ExperienceCard, ...) are
+inferred from the template examples in a2ui_templates.py, which document the
+trees the frontend renders. Each format only allows the components its
+template uses. The server assembles A2UI itself (a2ui_builder.py), so these
+full-message schemas only check test and regression output; they are built
+on first use rather than at import.
+
+validate_a2ui(format, messages) runs a validator compiled from the format's
+schema, plus the structural checks a schema cannot express: exactly one type
+per component, unique IDs, children and root that reference existing
+components. The model itself fills the much smaller content schemas in
+a2ui_builder.py, which are checked with the same compile_validator().
+"""
+
+import json
+import re
+from typing import Any, Callable, Optional
+
+try:
+    from agent import a2ui_templates as templates
+except ImportError:
+    import a2ui_templates as templates
+
+# Layout components every format may use around its content
+_LAYOUT_COMPONENTS = ("Column", "Row", "Text")
+
+# Properties the frontend components default when absent (src/portfolio-card.ts)
+_OPTIONAL_PROPERTIES: dict[str, tuple[str, ...]] = {
+    "PortfolioCard": ("description", "image", "url"),
+}
+
+# Format -> templates whose components the format may use. Formats without an
+# entry here use their FORMAT_EXAMPLES template.
+_EXTRA_SOURCES: dict[str, tuple[str, ...]] = {
+    "image": (templates.IMAGE_EXAMPLE, templates.PROFILE_BUBBLE_EXAMPLE),
+    "creative": (
+        templates.IMAGE_EXAMPLE,
+        templates.PROFILE_BUBBLE_EXAMPLE,
+        templates.BLOG_CARDS_EXAMPLE,
+    ),
+}
+
+_COMMENT_LINE = re.compile(r"(?m)^\s*//.*$")
+
+
+def _load_example(example: str) -> list[dict[str, Any]]:
+    """Parse a template example, dropping its `// ...` placeholder lines."""
+    return json.loads(_COMMENT_LINE.sub("", example))
+
+
+# =============================================================================
+# Schema inference
+# =============================================================================
+
+def _infer(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"type": "boolean"}
+    if isinstance(value, int):
+        return {"type": "integer"}
+    if isinstance(value, float):
+        return {"type": "number"}
+    if isinstance(value, str):
+        return {"type": "string"}
+    if isinstance(value, list):
+        items = None
+        for item in value:
+            items = _merge(items, _infer(item))
+        return {"type": "array", "items": items or {"type": "string"}}
+    return {
+        "type": "object",
+        "properties": {key: _infer(item) for key, item in value.items()},
+        "required": list(value),
+    }
+
+
+def _merge(a: Optional[dict[str, Any]], b: dict[str, Any]) -> dict[str, Any]:
+    """Combine two inferred schemas; a property is required only if always present."""
+    if a is None:
+        return b
+    if a["type"] != b["type"]:
+        # integer vs number is the only mix in the templates
+        return {"type": "number"} if {a["type"], b["type"]} <= {"integer", "number"} else a
+    if a["type"] == "array":
+        return {"type": "array", "items": _merge(a["items"], b["items"])}
+    if a["type"] == "object":
+        properties = dict(a["properties"])
+        for key, schema in b["properties"].items():
+            properties[key] = _merge(properties.get(key), schema)
+        required = [key for key in a["required"] if key in b["required"]]
+        return {"type": "object", "properties": properties, "required": required}
+    return a
+
+
+def _component_shapes(examples: tuple[str, ...]) -> dict[str, dict[str, Any]]:
+    """Component type -> property schema, merged over every use in the examples."""
+    shapes: dict[str, dict[str, Any]] = {}
+    for example in examples:
+        for message in _load_example(example):
+            for component in message.get("surfaceUpdate", {}).get("components", []):
+                for component_type, props in component["component"].items():
+                    shapes[component_type] = _merge(shapes.get(component_type), _infer(props))
+
+    for component_type, optional in _OPTIONAL_PROPERTIES.items():
+        if component_type in shapes:
+            shape = shapes[component_type]
+            shape["required"] = [key for key in shape["required"] if key not in optional]
+    return shapes
+
+
+def _message_schema(components: dict[str, dict[str, Any]]) -> dict[str, Any]:
+    component_schema = {
+        "type": "object",
+        "properties": {
+            "id": {"type": "string"},
+            "component": {"type": "object", "properties": components},
+        },
+        "required": ["id", "component"],
+    }
+    return {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "properties": {
+                "beginRendering": {
+                    "type": "object",
+                    "properties": {"surfaceId": {"type": "string"}, "root": {"type": "string"}},
+                    "required": ["surfaceId", "root"],
+                },
+                "surfaceUpdate": {
+                    "type": "object",
+                    "properties": {
+                        "surfaceId": {"type": "string"},
+                        "components": {"type": "array", "items": component_schema},
+                    },
+                    "required": ["surfaceId", "components"],
+                },
+            },
+        },
+    }
+
+
+def build_a2ui_schemas(formats: list[str]) -> dict[str, dict[str, Any]]:
+    """A2UI message schema for each format, from its template examples."""
+    all_shapes = _component_shapes(tuple(templates.FORMAT_EXAMPLES.values()))
+    layout = {name: all_shapes[name] for name in _LAYOUT_COMPONENTS}
+
+    schemas = {}
+    for format_type in formats:
+        sources = _EXTRA_SOURCES.get(format_type) or (
+            templates.FORMAT_EXAMPLES.get(format_type, templates.FLASHCARD_EXAMPLE),
+        )
+        schemas[format_type] = _message_schema({**layout, **_component_shapes(sources)})
+    return schemas
+
+
+# =============================================================================
+# Compiled validators
+# =============================================================================
+
+Validator = Callable[[Any, str, list], None]
+
+_PYTHON_TYPES = {
+    "string": str,
+    "boolean": bool,
+    "integer": int,
+    "number": (int, float),
+}
+
+
+def compile_validator(schema: dict[str, Any]) -> Validator:
+    """
+    Turn a schema into a closure tree, so validation does no schema lookups.
+
+    The validator is called as validator(value, path, errors) and appends a
+    message to errors for every problem found.
+    """
+    schema_type = schema["type"]
+
+    if schema_type == "object":
+        properties = {key: compile_validator(sub) for key, sub in schema.get("properties", {}).items()}
+        required = tuple(schema.get("required", ()))
+
+        def check_object(value, path, errors):
+            if not isinstance(value, dict):
+                errors.append(f"{path}: expected object")
+                return
+            for key in required:
+                if key not in value:
+                    errors.append(f"{path}: missing '{key}'")
+            for key, item in value.items():
+                check = properties.get(key)
+                if check is not None:
+                    check(item, f"{path}.{key}", errors)
+
+        return check_object
+
+    if schema_type == "array":
+        check_item = compile_validator(schema["items"])
+
+        def check_array(value, path, errors):
+            if not isinstance(value, list):
+                errors.append(f"{path}: expected array")
+                return
+            for i, item in enumerate(value):
+                check_item(item, f"{path}[{i}]", errors)
+
+        return check_array
+
+    python_type = _PYTHON_TYPES[schema_type]
+    reject_bool = schema_type in ("integer", "number")
+    allowed = frozenset(schema.get("enum", ()))
+
+    def check_scalar(value, path, errors):
+        if not isinstance(value, python_type) or (reject_bool and isinstance(value, bool)):
+            errors.append(f"{path}: expected {schema_type}")
+        elif allowed and value not in allowed:
+            errors.append(f"{path}: expected one of {sorted(allowed)}")
+
+    return check_scalar
+
+
+def _structure_errors(messages: list, component_types: frozenset) -> list[str]:
+    errors = []
+    roots = []
+    ids = set()
+    references = []
+    for message in messages:
+        if "beginRendering" in message:
+            roots.append(message["beginRendering"]["root"])
+        for component in message.get("surfaceUpdate", {}).get("components", []):
+            component_id = component["id"]
+            if component_id in ids:
+                errors.append(f"duplicate component id '{component_id}'")
+            ids.add(component_id)
+            kinds = [kind for kind in component["component"] if kind in component_types]
+            if len(kinds) != 1:
+                errors.append(f"component '{component_id}' must have exactly one known type, got {list(component['component'])}")
+                continue
+            props = component["component"][kinds[0]]
+            children = props.get("children") if isinstance(props, dict) else None
+            if isinstance(children, dict):
+                references.extend((component_id, child) for child in children.get("explicitList", []))
+
+    if not roots:
+        errors.append("missing beginRendering")
+    if not ids:
+        errors.append("missing surfaceUpdate components")
+    for root in roots:
+        if root not in ids:
+            errors.append(f"root '{root}' is not a component")
+    for parent, child in references:
+        if child not in ids:
+            errors.append(f"'{parent}' references unknown child '{child}'")
+    return errors
+
+
+class A2UIValidator:
+    """Schema plus structural validation for one format."""
+
+    def __init__(self, schema: dict[str, Any]):
+        self.schema = schema
+        self._check = compile_validator(schema)
+        component = schema["items"]["properties"]["surfaceUpdate"]["properties"]["components"]["items"]
+        self.component_types = frozenset(component["properties"]["component"]["properties"])
+
+    def errors(self, messages: Any) -> list[str]:
+        """All problems found, or an empty list for a valid message list."""
+        errors: list[str] = []
+        self._check(messages, "$", errors)
+        if errors:
+            return errors
+        return _structure_errors(messages, self.component_types)
+
+
+# Every format with a template
+SCHEMA_FORMATS: tuple[str, ...] = tuple(templates.FORMAT_EXAMPLES) + ("podcast", "creative")
+
+_VALIDATORS: dict[str, A2UIValidator] = {}
+
+
+def get_validator(format_type: str) -> Optional[A2UIValidator]:
+    """The validator for a format, or None. All are built on the first call."""
+    if not _VALIDATORS:
+        schemas = build_a2ui_schemas(list(SCHEMA_FORMATS))
+        _VALIDATORS.update({name: A2UIValidator(schema) for name, schema in schemas.items()})
+    return _VALIDATORS.get(format_type)
+
+
+def get_a2ui_schema(format_type: str) -> Optional[dict[str, Any]]:
+    """The A2UI message schema for a format, or None if it has no template."""
+    validator = get_validator(format_type)
+    return validator.schema if validator is not None else None
+
+
+def validate_a2ui(format_type: str, messages: Any) -> list[str]:
+    """Validate A2UI messages for a format; returns a list of errors."""
+    validator = get_validator(format_type)
+    if validator is None:
+        return [f"no schema for format: {format_type}"]
+    return validator.errors(messages)
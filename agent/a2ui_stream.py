@@ -0,0 +1,167 @@
+"""
+Incremental A2UI JSON parser.
+
+Gemini streams the A2UI payload as arbitrary text chunks of a single JSON array:
+
+    [{"beginRendering": {...}}, {"surfaceUpdate": {"surfaceId": ..., "components": [...]}}]
+
+A2UIStreamParser consumes those chunks and returns each A2UI message the moment
+its closing bracket arrives, so the renderer can draw the first card long before
+the full array has been generated. Components inside a `surfaceUpdate` are
+emitted one at a time as single-component `surfaceUpdate` messages, which the
+renderer merges into the same surface.
+
+For a streamed content array (see a2ui_builder.py) every top-level element is
+returned the same way, as soon as it is complete.
+"""
+
+import json
+import logging
+from typing import Any, Optional
+
+try:
+    from agent.a2ui_templates import SURFACE_ID
+except ImportError:
+    from a2ui_templates import SURFACE_ID
+
+logger = logging.getLogger(__name__)
+
+
+class _Frame:
+    """An open JSON container on the parser stack."""
+
+    __slots__ = ("kind", "key", "start", "streamed")
+
+    def __init__(self, kind: str, key: Optional[str], start: int):
+        self.kind = kind          # "{" or "["
+        self.key = key            # Key this container is the value of (objects only)
+        self.start = start        # Offset of the opening bracket in the buffer
+        self.streamed = False     # True once any child component was emitted
+
+
+class A2UIStreamParser:
+    """
+    Incrementally parse a streamed A2UI JSON array into complete messages.
+
+    Text before the opening `[` (e.g. a ```json fence) and after the closing `]`
+    is ignored. The parser never re-scans text it has already seen.
+    """
+
+    def __init__(self, surface_id: str = SURFACE_ID):
+        self.surface_id = surface_id
+        self._buffer = ""
+        self._pos = 0
+        self._stack: list[_Frame] = []
+        self._started = False
+        self._done = False
+        self._in_string = False
+        self._escape = False
+        self._string_start = -1
+        self._last_string: Optional[str] = None
+        self._pending_key: Optional[str] = None
+
+    @property
+    def done(self) -> bool:
+        """True once the top-level array has been closed."""
+        return self._done
+
+    def feed(self, chunk: str) -> list[dict[str, Any]]:
+        """Consume a text chunk and return any A2UI messages it completed."""
+        if self._done or not chunk:
+            return []
+
+        self._buffer += chunk
+        messages: list[dict[str, Any]] = []
+        buf = self._buffer
+
+        for i in range(self._pos, len(buf)):
+            ch = buf[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    self._last_string = buf[self._string_start:i + 1]
+                continue
+
+            if not self._started:
+                if ch == "[":
+                    self._started = True
+                    self._stack.append(_Frame("[", None, i))
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+            elif ch == ":":
+                if self._stack and self._stack[-1].kind == "{" and self._last_string is not None:
+                    self._pending_key = json.loads(self._last_string)
+                self._last_string = None
+            elif ch == ",":
+                self._record_string_value()
+                self._pending_key = None
+                self._last_string = None
+            elif ch in "{[":
+                self._stack.append(_Frame(ch, self._pending_key, i))
+                self._pending_key = None
+                self._last_string = None
+            elif ch in "}]":
+                self._record_string_value()
+                self._pending_key = None
+                self._last_string = None
+                frame = self._stack.pop()
+                message = self._on_close(frame, buf[frame.start:i + 1])
+                if message is not None:
+                    messages.append(message)
+                if not self._stack:
+                    self._done = True
+                    self._pos = i + 1
+                    return messages
+
+        self._pos = len(buf)
+        return messages
+
+    def _record_string_value(self) -> None:
+        """Remember the surfaceId as soon as it is seen so components can carry it."""
+        if self._pending_key == "surfaceId" and self._last_string is not None:
+            try:
+                self.surface_id = json.loads(self._last_string)
+            except ValueError:
+                pass
+
+    def _on_close(self, frame: _Frame, text: str) -> Optional[dict[str, Any]]:
+        depth = len(self._stack)
+
+        # A component inside [ {msg} {"surfaceUpdate": {"components": [ ... ]}} ]
+        if (
+            frame.kind == "{"
+            and depth == 4
+            and self._stack[-1].key == "components"
+            and self._stack[-2].key == "surfaceUpdate"
+        ):
+            component = self._loads(text)
+            if component is None:
+                return None
+            self._stack[1].streamed = True
+            return {"surfaceUpdate": {"surfaceId": self.surface_id, "components": [component]}}
+
+        # A top-level A2UI message
+        if frame.kind == "{" and depth == 1:
+            if frame.streamed:
+                # Its components have already been emitted individually
+                return None
+            return self._loads(text)
+
+        return None
+
+    @staticmethod
+    def _loads(text: str) -> Optional[dict[str, Any]]:
+        try:
+            value = json.loads(text)
+        except ValueError as e:
+            logger.debug(f"Skipping malformed streamed A2UI fragment: {e}")
+            return None
+        return value if isinstance(value, dict) else None
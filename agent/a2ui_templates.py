@@ -1,3 +1,5 @@
+from typing import Optional
+
 SURFACE_ID = "portfolioContent"
 
 # Flashcard A2UI template
@@ -698,47 +700,227 @@ SKILL_RADAR_EXAMPLE = f"""
 ]
 """
 
-def get_system_prompt(format_type: str, portfolio_data: str, topic: str = "") -> str:
+# ProfileBubble A2UI template
+PROFILE_BUBBLE_EXAMPLE = f"""
+[
+  {{"beginRendering": {{"surfaceId": "{SURFACE_ID}", "root": "mainColumn"}}}},
+  {{
+    "surfaceUpdate": {{
+      "surfaceId": "{SURFACE_ID}",
+      "components": [
+        {{
+          "id": "mainColumn",
+          "component": {{"ProfileBubble": {{"image": "/assets/hero.png", "size": "240px"}}}}
+        }}
+      ]
+    }}
+  }}
+]
+"""
+
+# Format -> A2UI tree the server assembles for it (see a2ui_builder.py). These
+# define the component shapes a2ui_schemas.py validates against; matrix and
+# charts are still written in full by the model.
+FORMAT_EXAMPLES = {
+    "flashcards": FLASHCARD_EXAMPLE,
+    "quiz": QUIZ_EXAMPLE,
+    "image": IMAGE_EXAMPLE,
+    "video": VIDEO_EXAMPLE,
+    "audio": AUDIO_EXAMPLE,
+    "timeline": TIMELINE_EXAMPLE,
+    "video_cards": VIDEO_CARDS_EXAMPLE,
+    "blog_cards": BLOG_CARDS_EXAMPLE,
+    "awards": AWARDS_CARDS_EXAMPLE,
+    "certs": CERT_CARDS_EXAMPLE,
+    "speaker": SPEAKER_CARDS_EXAMPLE,
+    "testimonials": TESTIMONIALS_EXAMPLE,
+    "gallery": GALLERY_CARDS_EXAMPLE,
+    "matrix": STRATEGIC_MATRIX_EXAMPLE,
+    "charts": SKILL_RADAR_EXAMPLE,
+    "comics": COMIC_CARDS_EXAMPLE,
+}
+
+# Compact content the model returns; the server builds the A2UI around it
+FLASHCARD_CONTENT_EXAMPLE = """
+[
+  {"front": "[SPECIFIC_DATA_QUESTION_ABOUT_EXPERIENCE]", "back": "[HIGH_IMPACT_ANSWER_FROM_EXPERIENCE_DATA]", "category": "[RELEVANT_CATEGORY]"}
+]
+"""
+
+QUIZ_CONTENT_EXAMPLE = """
+[
+  {
+    "question": "Which company did Enrique NOT work for?",
+    "options": [
+      {"label": "Google", "isCorrect": false},
+      {"label": "Netflix", "isCorrect": true},
+      {"label": "AWS", "isCorrect": false}
+    ],
+    "explanation": "Enrique has worked at Google, AWS, and Accenture, but never Netflix.",
+    "category": "Career Trivia"
+  }
+]
+"""
+
+TIMELINE_CONTENT_EXAMPLE = """
+[
+  {
+    "company": "Google Cloud",
+    "role": "Outbound Product Manager, Cloud AI",
+    "period": "Nov 2025 – Present",
+    "logo": "google",
+    "color": "#4285F4",
+    "highlights": ["Highlight 1", "Highlight 2"],
+    "impact": "Multi-million dollar impact..."
+  }
+]
+"""
+
+VIDEO_CARDS_CONTENT_EXAMPLE = """
+[
+  {"title": "Rise of Agentic AI", "description": "Enrique's keynote on the transition to autonomous AI agents.", "image": "https://img.youtube.com/vi/nZa5-WyN-rE/maxresdefault.jpg", "url": "https://www.youtube.com/watch?v=nZa5-WyN-rE"}
+]
+"""
+
+BLOG_CARDS_CONTENT_EXAMPLE = """
+[
+  {"title": "Intro to Agents Whitepaper", "description": "The definitive Kaggle guide to the future of AI agents.", "image": "/assets/blog-a2ui.png", "url": "https://www.kaggle.com/whitepaper-introduction-to-agents"},
+  {"title": "Advent of Agents", "description": "A 25-day journey into building and deploying agentic workflows.", "image": "/assets/blog-optimizer.png", "url": "https://adventofagents.com/"}
+]
+"""
+
+AWARDS_CONTENT_EXAMPLE = """
+[
+  {"title": "GTM Cloud Tech Impact Award", "description": "Recognized for the massive scale impact of the Olympic 'Oli' chatbot.", "image": "/assets/award_gtm_2024.jpg", "url": "https://www.google.com/search?q=nbc+olympics+oli+ai"}
+]
+"""
+
+CERT_CONTENT_EXAMPLE = """
+[
+  {"title": "Google Cloud Professional ML Engineer", "description": "10x Google Cloud Certified, specializing in enterprise ML and AI architecture.", "image": "/assets/certs.png", "url": "https://www.credential.net/profile/enriquekchan"}
+]
+"""
+
+GALLERY_CONTENT_EXAMPLE = """
+[
+  {"title": "[IMAGE_TITLE]", "description": "[IMAGE_DESCRIPTION]", "image": "[IMAGE_PATH]"}
+]
+"""
+
+COMIC_CONTENT_EXAMPLE = """
+[
+  {"title": "Business Leaders Edition", "description": "The Architect's Secret Files: Unlocking the future of AI for leaders.", "image": "/assets/agent_comic.png", "url": "https://enriquekchan.web.app/agent_adventures_business_leaders.pdf"}
+]
+"""
+
+SPEAKER_CONTENT_EXAMPLE = """
+[
+  {"front": "[EVENT_NAME_AND_DATE]", "back": "[TALK_TITLE_AND_IMPACT_HINT]", "category": "[SESSION_TYPE]"}
+]
+"""
+
+TESTIMONIALS_CONTENT_EXAMPLE = """
+[
+  {"front": "[LEADER_NAME_AND_TITLE]", "back": "[SPECIFIC_DATA_DRIVEN_QUOTE]", "category": "[IMPACT_CATEGORY]"}
+]
+"""
+
+IMAGE_CONTENT_EXAMPLE = """
+{"variant": "image", "url": "/assets/hero.png", "alt": "Enrique K Chan"}
+"""
+
+VIDEO_CONTENT_EXAMPLE = """
+{"url": "https://www.youtube.com/watch?v=nZa5-WyN-rE"}
+"""
+
+CREATIVE_CONTENT_EXAMPLE = """
+{
+  "title": "[DASHBOARD_TITLE]",
+  "sections": [
+    {
+      "heading": "[SECTION_HEADING]",
+      "items": [
+        {"kind": "profile_bubble", "image": "/assets/hero.png"},
+        {"kind": "card", "title": "[CARD_TITLE]", "text": "[CARD_DESCRIPTION]", "image": "[IMAGE_PATH]", "url": "[LINK]"},
+        {"kind": "text", "text": "[BODY_TEXT]"}
+      ]
+    }
+  ]
+}
+"""
+
+# Format -> content example shown to the model (other formats use FLASHCARD_CONTENT_EXAMPLE)
+CONTENT_EXAMPLES = {
+    "flashcards": FLASHCARD_CONTENT_EXAMPLE,
+    "quiz": QUIZ_CONTENT_EXAMPLE,
+    "image": IMAGE_CONTENT_EXAMPLE,
+    "video": VIDEO_CONTENT_EXAMPLE,
+    "timeline": TIMELINE_CONTENT_EXAMPLE,
+    "video_cards": VIDEO_CARDS_CONTENT_EXAMPLE,
+    "blog_cards": BLOG_CARDS_CONTENT_EXAMPLE,
+    "awards": AWARDS_CONTENT_EXAMPLE,
+    "certs": CERT_CONTENT_EXAMPLE,
+    "speaker": SPEAKER_CONTENT_EXAMPLE,
+    "testimonials": TESTIMONIALS_CONTENT_EXAMPLE,
+    "gallery": GALLERY_CONTENT_EXAMPLE,
+    "comics": COMIC_CONTENT_EXAMPLE,
+    "creative": CREATIVE_CONTENT_EXAMPLE,
+}
+
+def _flashcard_focus(topic: str) -> Optional[str]:
+    """Flashcard angle picked from topic keywords, or None for the general deck."""
+    topic_lower = topic.lower()
+    if "fit" in topic_lower or "analyzer" in topic_lower:
+        return "FOCUS: Fit Analyzer. Create 3-4 cards comparing Enrique's specific experience (Google Cloud, AWS, Scale) to typical Senior AI/Product Lead requirements. Focus on why he's the right choice for high-stakes AI."
+    elif "skill" in topic_lower or "match" in topic_lower:
+        return "FOCUS: Skill Matcher. Create 3-4 cards illustrating how his deep skills (MLOps, Vertex AI, Agent Governance) apply to specific enterprise problems. Focus on technical depth and impact."
+    elif "timeline" in topic_lower or "historian" in topic_lower or "career" in topic_lower:
+        return "FOCUS: Career Historian. Create 3-4 cards showing the narrative progression from Disney's MagicBands to AWS to Google Cloud's Agentic AI transition."
+    elif "project" in topic_lower or "work" in topic_lower:
+        return "FOCUS: Project Spotlight. Create 3-4 cards exploring the technical complexity and impact of his projects (Oli AI, Disney+ rollout, Advent of Agents)."
+    return None
+
+
+def get_topic_instruction(format_type: str, topic: str) -> str:
     """
-    Generate the system prompt for A2UI generation for the portfolio.
+    The topic-specific part of a request, sent in the user turn.
+
+    get_system_prompt(format_type, data) without a topic is then identical
+    for every topic of a format, so one context cache serves all of them.
     """
-    examples = {
-        "flashcards": FLASHCARD_EXAMPLE,
-        "quiz": QUIZ_EXAMPLE,
-        "image": IMAGE_EXAMPLE,
-        "video": VIDEO_EXAMPLE,
-        "audio": AUDIO_EXAMPLE,
-        "timeline": TIMELINE_EXAMPLE,
-        "video_cards": VIDEO_CARDS_EXAMPLE,
-        "blog_cards": BLOG_CARDS_EXAMPLE,
-        "awards": AWARDS_CARDS_EXAMPLE,
-        "certs": CERT_CARDS_EXAMPLE,
-        "speaker": SPEAKER_CARDS_EXAMPLE,
-        "testimonials": TESTIMONIALS_EXAMPLE,
-        "gallery": GALLERY_CARDS_EXAMPLE,
-        "matrix": STRATEGIC_MATRIX_EXAMPLE,
-        "charts": SKILL_RADAR_EXAMPLE,
-        "comics": COMIC_CARDS_EXAMPLE,
-    }
+    instruction = f"Generate {format_type} for topic: {topic}."
+    focus = _flashcard_focus(topic) if format_type.lower() == "flashcards" else None
+    if focus:
+        instruction += f"\n{focus}"
+    return instruction
+
+
+def get_system_prompt(format_type: str, portfolio_data: str, topic: str = "") -> str:
+    """
+    Generate the system prompt for a portfolio format.
 
-    example = examples.get(format_type.lower(), FLASHCARD_EXAMPLE)
+    The model returns only the content of the format (see CONTENT_EXAMPLES);
+    surfaces, component IDs and layout are added by a2ui_builder. The agent
+    leaves `topic` empty and sends it with get_topic_instruction instead.
+    """
+    example = CONTENT_EXAMPLES.get(format_type.lower(), FLASHCARD_CONTENT_EXAMPLE)
+    focus_line = f"FOCUS TOPIC: {topic}\n" if topic else ""
 
     if format_type.lower() == "timeline":
         return f"""You are Enrique K Chan's Portfolio Agent.
 The user wants to see professional career history as a sequential downward timeline.
-FOCUS TOPIC: {topic}
+{focus_line}
 
 ## Enrique's Professional Data
 {portfolio_data}
 
 ## Your Task
-Return A2UI JSON using the 'ExperienceCard' custom component.
+Return a JSON array with one entry per role, most recent first.
 - Display all major relevant roles from the EXPERIENCE data.
-- Use sequential IDs (exp1, exp2, etc).
 - For 'logo', use 'google' if company is Google, 'aws' if Amazon, 'accenture' if Accenture.
 - Ensure 'impact' is included for each role to demonstrate high-level value.
 
-A2UI JSON Template Example:
+JSON Example:
 {example}
 """
 
@@ -750,16 +932,14 @@ Represent Enrique's technical blogs and whitepapers as a nice grid of cards.
 {portfolio_data}
 
 ## Your Task
-Return A2UI JSON with 6 cards split across two Rows (3 cards per row).
-- **TOP PRIORITY (Indices 1 & 2)**: 
+Return a JSON array of exactly 6 cards, in display order.
+- **TOP PRIORITY (Cards 1 & 2)**: 
     1. The "Intro to Agents Whitepaper" (Kaggle).
     2. The "Advent of Agents" project.
 - **Remaining 4 Cards**: Choose the most relevant technical blogs from the BLOGS data.
-- Use two Rows: 'blogRow1' (b1, b2, b3) and 'blogRow2' (b4, b5, b6).
-- Each Card should have an 'onAction' link to the medium/kaggle URL.
-- Use 'PortfolioCard' component with type 'blog'.
+- Each card's 'url' should link to the medium/kaggle page.
 
-A2UI JSON Template Example:
+JSON Example:
 {example}
 """
 
@@ -771,12 +951,11 @@ Represent Enrique's YouTube videos as high-quality cards.
 {portfolio_data}
 
 ## Your Task
-Return A2UI JSON with a Row of exactly 4 PortfolioCards.
-- Use type 'video' for these cards.
+Return a JSON array of exactly 4 video cards.
 - Provide a clear title and description.
-- Pull details from the VIDEOS section of the profile.
+- Pull details from the VIDEOS section of the profile; use the thumbnail as 'image'.
 
-A2UI JSON Template Example:
+JSON Example:
 {example}
 """
 
@@ -788,13 +967,13 @@ The user wants to see Enrique's cloud certifications.
 {portfolio_data}
 
 ## Your Task
-Return A2UI JSON with a grid of PortfolioCards.
+Return a JSON array with one card per certification.
 - **CRITICAL**: You MUST name EACH certification individually (e.g., 'Professional ML Engineer', 'Professional Cloud Architect', 'AWS Solutions Architect Pro').
 - **DO NOT SUMMARIZE**: If the data says "10x Google Cloud Certified", you must still attempt to list the individual titles based on the context.
 - Provide a card for EVERY certification found in the data.
-- Use type 'project' for these cards and '/assets/certs.png' for the image.
+- Use '/assets/certs.png' for the image.
 
-A2UI JSON Template Example:
+JSON Example:
 {example}
 """
 
@@ -806,14 +985,14 @@ The user wants to see Enrique's top speaking events and keynotes.
 {portfolio_data}
 
 ## Your Task
-Return A2UI JSON using 'Flashcard' components in a Row.
+Return a JSON array of flashcards, one per event.
 - **CRITICAL**: Prioritize the 'Google Cloud Next' events (Las Vegas/San Francisco).
 - Use high-fidelity naming (e.g., 'Solutions Talk: Architecting GenAI Agents').
 - The front: Event Name, Location, and Date.
 - The back: Talk Title, Key Takeaways, and Audience Impact.
 - Maintain a premium, executive tone.
 
-A2UI JSON Template Example:
+JSON Example:
 {example}
 """
 
@@ -825,14 +1004,13 @@ The user wants to see Enrique's major awards, honors, and trophies.
 {portfolio_data}
 
 ## Your Task
-Return A2UI JSON with a Row of PortfolioCards.
-- Use type 'project' for these cards.
+Return a JSON array with one card per award.
 - **MANDATORY**: For any award mentioning 'Cloud Tech Impact' or 'Trophy', you MUST use the image '/assets/award_gtm_2024.jpg'. This is the high-fidelity trophy photo from Enrique's website.
 - For other awards (like 'AIS Hackathon' or 'GTM Excellence'), use '/assets/awards.png'.
 - Descriptions should highlight the massive scale and business impact (e.g., 'NBCU Olympic Chatbot serving 40M viewers').
 - Ensure titles are clean and professional (e.g. 'Cloud Tech Impact Award 2024').
 
-A2UI JSON Template Example:
+JSON Example:
 {example}
 """
 
@@ -844,29 +1022,19 @@ The user wants to see "What Googlers Say" about Enrique.
 {portfolio_data}
 
 ## Your Task
-Return A2UI JSON with a Row of Flashcards.
+Return a JSON array of flashcards.
 - Each flashcard should feature a quote from a Googler or Google leader.
 - The front: Persona/Author (e.g., 'CEO, Google Cloud').
 - The back: The specific quote or piece of feedback.
 - Use categories like 'Technical Rigor', 'Leadership', 'Innovation'.
 
-A2UI JSON Template Example:
+JSON Example:
 {example}
 """
 
     if format_type.lower() == "flashcards":
         # Dynamic tailoring based on topic keywords
-        task_instruction = "Create 3-4 high-quality flashcards about Enrique's professional journey."
-        
-        topic_lower = topic.lower()
-        if "fit" in topic_lower or "analyzer" in topic_lower:
-            task_instruction = "FOCUS: Fit Analyzer. Create 3-4 cards comparing Enrique's specific experience (Google Cloud, AWS, Scale) to typical Senior AI/Product Lead requirements. Focus on why he's the right choice for high-stakes AI."
-        elif "skill" in topic_lower or "match" in topic_lower:
-            task_instruction = "FOCUS: Skill Matcher. Create 3-4 cards illustrating how his deep skills (MLOps, Vertex AI, Agent Governance) apply to specific enterprise problems. Focus on technical depth and impact."
-        elif "timeline" in topic_lower or "historian" in topic_lower or "career" in topic_lower:
-            task_instruction = "FOCUS: Career Historian. Create 3-4 cards showing the narrative progression from Disney's MagicBands to AWS to Google Cloud's Agentic AI transition."
-        elif "project" in topic_lower or "work" in topic_lower:
-            task_instruction = "FOCUS: Project Spotlight. Create 3-4 cards exploring the technical complexity and impact of his projects (Oli AI, Disney+ rollout, Advent of Agents)."
+        task_instruction = _flashcard_focus(topic) or "Create 3-4 high-quality flashcards about Enrique's professional journey."
 
         return f"""You are Enrique K Chan's Portfolio Agent. 
 You are helping recruiters/hiring managers learn about Enrique's unique value proposition.
@@ -880,12 +1048,11 @@ You are helping recruiters/hiring managers learn about Enrique's unique value pr
 **VARIETY RULE**: Generate a UNIQUE set of cards every time. Do not repeat the same cards from previous sessions. Use different categories and angles (e.g., 'Leadership', 'Scale', 'Governance', 'Architecture').
 
 ## Rules
-- Output ONLY valid JSON - no markdown, no explanation
-- Use surfaceId: "{SURFACE_ID}"
+- Output ONLY a JSON array of cards - no markdown, no explanation
 - Category: Use logical, high-signal categories.
 
-A2UI JSON Template:
-{FLASHCARD_EXAMPLE}
+JSON Example:
+{FLASHCARD_CONTENT_EXAMPLE}
 """
 
     if format_type.lower() == "image":
@@ -896,29 +1063,13 @@ The user wants to see a picture, avatar, or visual achievement.
 {portfolio_data}
 
 ## Your Task
-Return A2UI JSON containing an 'Image' component OR a 'ProfileBubble' component.
-- **VARIANT RULE**: If the user mentions "bubble" or "avatar", you MUST use the **'ProfileBubble'** custom component.
+Return a JSON object describing one image.
+- **VARIANT RULE**: If the user mentions "bubble" or "avatar", 'variant' MUST be "profile_bubble"; otherwise use "image".
 - If they ask for his profile pic, use "/assets/hero.png".
 - If they ask for the Olympics project architecture, use "/assets/architecture.jpg".
 
-A2UI JSON Template for Image:
-{IMAGE_EXAMPLE}
-
-A2UI JSON Template for ProfileBubble:
-[
-  {{"beginRendering": {{"surfaceId": "{SURFACE_ID}", "root": "mainColumn"}}}},
-  {{
-    "surfaceUpdate": {{
-      "surfaceId": "{SURFACE_ID}",
-      "components": [
-        {{
-          "id": "mainColumn",
-          "component": {{"ProfileBubble": {{"image": "/assets/hero.png", "size": "240px"}}}}
-        }}
-      ]
-    }}
-  }}
-]
+JSON Example:
+{IMAGE_CONTENT_EXAMPLE}
 """
 
     if format_type.lower() == "video":
@@ -929,11 +1080,11 @@ The user wants to see a video or presentation.
 {portfolio_data}
 
 ## Your Task
-Return A2UI JSON containing a 'Video' component with a YouTube URL.
+Return a JSON object with the YouTube 'url' of the video.
 If no specific video is found, use a placeholder or related AI talk.
 
-A2UI JSON Template:
-{VIDEO_EXAMPLE}
+JSON Example:
+{VIDEO_CONTENT_EXAMPLE}
 """
 
     if format_type.lower() == "quiz":
@@ -944,14 +1095,14 @@ Create a HIGH-QUALITY, DYNAMIC quiz about Enrique's background based on the data
 {portfolio_data}
 
 ## Your Task
-Return A2UI JSON using the 'QuizCard' component.
+Return a JSON array of quiz questions.
 - **VARIETY RULE**: DO NOT repeat the same questions. Generate a DIFFERENT set of questions every time (e.g., about his certifications, his specific Olympic metrics, his tenure at Accenture, or his Seattle location).
 - Provide 3-4 options per question with 1 correct answer.
 - Include a technical explanation for the answer.
 - Tone: Engaging and professional.
 
-A2UI JSON Template (Blueprint):
-{QUIZ_EXAMPLE}
+JSON Example:
+{QUIZ_CONTENT_EXAMPLE}
 """
 
     if format_type.lower() == "comics":
@@ -962,14 +1113,12 @@ The user has unlocked the ARCHITECT'S SECRET FILES (The Agent Adventures Comics)
 {portfolio_data}
 
 ## Your Task
-Return A2UI JSON featuring the comics as interactive PortfolioCards.
+Return a JSON array with one card per comic.
 - List all available comic issues/editions from the COMICS data.
-- Use 'PortfolioCard' component with type 'project'.
 - Use the provided URLs for the PDF assets.
-- Ensure the header is "The Agentic Adventures 📂".
 
-A2UI JSON Template Example:
-{COMIC_CARDS_EXAMPLE}
+JSON Example:
+{COMIC_CONTENT_EXAMPLE}
 """
 
     if format_type.lower() == "creative":
@@ -979,45 +1128,23 @@ The user wants a UNIQUE, HIGH-FIDELITY visual experience that doesn't fit existi
 ## Portfolio Data
 {portfolio_data}
 
-## FOCUS TOPIC: {topic}
+{f"## FOCUS TOPIC: {topic}" if topic else ""}
 
 ## Your Task
-You are in **CREATIVE MODE**. You must construct a novel rich UI experience from scratch using the following base components:
-- `Column`: For vertical layout
-- `Row`: For horizontal grids
-- `Text`: For headings (usageHint: h1, h2, h3) and bodies
-- `Image`: For visuals (url, alt)
-- `PortfolioCard`: For interactive items (title, description, image, url, type)
-- `ProfileBubble`: For a premium avatar (image, size)
+You are in **CREATIVE MODE**. Design a novel "Dashboard" or "Matrix" from sections, each rendered as a heading over a row of items:
+- `card`: An interactive item (title, text, image, url)
+- `text`: A body paragraph (text)
+- `image`: A visual (image or url, title as alt text)
+- `profile_bubble`: A premium avatar (image)
 
 **Instructions**:
-1. Design a layout that perfectly answers the user's specific request for a "{topic}". 
-2. Use a mix of Rows and Columns to create a "Dashboard" or "Matrix" feel.
+1. Design a layout that perfectly answers the user's specific request{f' for a "{topic}"' if topic else ""}. 
+2. Mix item kinds across sections to create a "Dashboard" or "Matrix" feel.
 3. Keep it premium, executive, and high-signal.
-4. Output ONLY valid A2UI JSON.
+4. Output ONLY the JSON object.
 
-A2UI JSON Template (Start here and build a custom structure):
-[
-  {{"beginRendering": {{"surfaceId": "{SURFACE_ID}", "root": "creativeRoot"}}}},
-  {{
-    "surfaceUpdate": {{
-      "surfaceId": "{SURFACE_ID}",
-      "components": [
-        {{
-          "id": "creativeRoot",
-          "component": {{
-            "Column": {{
-              "children": {{"explicitList": ["headerRow", "contentGrid"]}},
-              "distribution": "start",
-              "alignment": "stretch"
-            }}
-          }}
-        }}
-        // BUILD THE REST DYNAMICALLY...
-      ]
-    }}
-  }}
-]
+JSON Example (Start here and build a custom structure):
+{CREATIVE_CONTENT_EXAMPLE}
 """
 
     if format_type.lower() == "gallery":
@@ -1028,13 +1155,12 @@ The user wants to see a visual gallery of Enrique's work, achievements, and even
 {portfolio_data}
 
 ## Your Task
-Return A2UI JSON with a Row of PortfolioCards.
-- Use type 'project' for these cards.
+Return a JSON array with one card per image.
 - Each card should feature a title and a descriptive caption from the data.
 - Ensure you include high-signal visuals like the 'NBC Olympic Architecture' and 'Cloud Tech Impact Award'.
 
-A2UI JSON Template Example:
-{GALLERY_CARDS_EXAMPLE}
+JSON Example:
+{GALLERY_CONTENT_EXAMPLE}
 """
 
     if format_type.lower() == "matrix":
@@ -1071,16 +1197,16 @@ A2UI JSON Template Example:
 """
 
     return f"""You are Enrique K Chan's Portfolio Agent.
-Generate HIGH-FIDELITY A2UI JSON for {format_type} content.
+Generate HIGH-FIDELITY content for {format_type}.
 Focus on demonstrating Enrique's 15+ years of experience and his 19x cloud certifications.
 
 ## Portfolio Data
 {portfolio_data}
 
 ## Your Task
-Synthesize UNIQUE, data-driven components. Do NOT just copy the example.
-Ensure all component IDs are unique.
+Synthesize UNIQUE, data-driven flashcards. Do NOT just copy the example.
+Return a JSON array of cards.
 
-A2UI JSON Template:
+JSON Example:
 {example}
 """
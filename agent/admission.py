@@ -0,0 +1,208 @@
+"""
+Admission control for Gemini calls.
+
+Every model call goes through the controller for its model, which applies, in
+order:
+
+- a bounded wait queue: when the queue is already full the caller is rejected
+  immediately (503) instead of piling up behind everyone else;
+- a concurrency semaphore, waited on for at most `queue_timeout` seconds;
+- a token bucket matched to the project's requests-per-second quota. A caller
+  that would have to wait past its deadline for a token is rejected (429).
+
+Rejections raise AdmissionRejected, which carries a Retry-After estimate that
+server.py turns into a fast 429/503 response. Quota errors from Gemini itself
+(HTTP 429) are reported back with note_throttled(), which drains the bucket so
+the next callers back off instead of hammering Vertex.
+
+Configuration (per model, from the environment):
+  GENAI_MAX_CONCURRENCY  concurrent calls per model (default 32)
+  GENAI_MAX_QUEUE        callers allowed to wait for a slot (default 64)
+  GENAI_QUEUE_TIMEOUT    seconds a caller may wait in total (default 10)
+  GENAI_RATE_LIMIT       sustained calls per second, 0 = unlimited (default 0)
+  GENAI_RATE_BURST       bucket size (default: the rate, at least 1)
+"""
+
+import asyncio
+import math
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Optional
+
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("GENAI_MAX_CONCURRENCY", "32"))
+DEFAULT_MAX_QUEUE = int(os.getenv("GENAI_MAX_QUEUE", "64"))
+DEFAULT_QUEUE_TIMEOUT = float(os.getenv("GENAI_QUEUE_TIMEOUT", "10"))
+DEFAULT_RATE_LIMIT = float(os.getenv("GENAI_RATE_LIMIT", "0"))
+DEFAULT_RATE_BURST = int(os.getenv("GENAI_RATE_BURST", "0"))
+
+# Pause applied to the bucket when Gemini answers 429 RESOURCE_EXHAUSTED
+THROTTLE_BACKOFF = float(os.getenv("GENAI_THROTTLE_BACKOFF", "5"))
+
+
+class AdmissionRejected(Exception):
+    """A model call was not admitted; retry after `retry_after` seconds."""
+
+    def __init__(self, message: str, retry_after: float, status_code: int = 503):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.status_code = status_code
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class TokenBucket:
+    """
+    Token bucket with reservations.
+
+    reserve() always takes a token and returns how long the caller must wait
+    for it (the balance may go negative, which queues later callers behind
+    it). refund() gives an unused reservation back.
+    """
+
+    def __init__(self, rate: float, burst: int = 0):
+        self.rate = rate
+        self.burst = max(1, burst or math.ceil(rate))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.rate <= 0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        if self.unlimited:
+            return 0.0
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def refund(self) -> None:
+        if self.unlimited:
+            return
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + 1)
+
+    def penalize(self, seconds: float) -> None:
+        """Empty the bucket so no token is available for `seconds`."""
+        if self.unlimited:
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, -seconds * self.rate)
+
+
+class AdmissionController:
+    """Concurrency semaphore, bounded wait queue and token bucket for one model."""
+
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        queue_timeout: float = DEFAULT_QUEUE_TIMEOUT,
+        rate: float = DEFAULT_RATE_LIMIT,
+        burst: int = DEFAULT_RATE_BURST,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.bucket = TokenBucket(rate, burst)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._paused_until = 0.0
+        self._avg_service = 1.0
+        self.waiting = 0
+        self.active = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.throttled = 0
+
+    def _retry_after(self) -> float:
+        # Time for the callers ahead of us to drain through the slots
+        backlog = (self.waiting + 1) / max(1, self.max_concurrency)
+        return max(self._avg_service * backlog, self._paused_until - time.monotonic(), 1.0)
+
+    def _reject(self, message: str, status_code: int, retry_after: Optional[float] = None) -> AdmissionRejected:
+        self.rejected += 1
+        return AdmissionRejected(message, retry_after or self._retry_after(), status_code)
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        """Hold a model-call slot for the duration of the block."""
+        deadline = time.monotonic() + self.queue_timeout
+
+        if self._semaphore.locked() and self.waiting >= self.max_queue:
+            raise self._reject("Model call queue is full", 503)
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise self._reject("Timed out waiting for a model call slot", 503) from None
+        finally:
+            self.waiting -= 1
+
+        try:
+            now = time.monotonic()
+            remaining = deadline - now
+            if remaining <= 0:
+                # The slot came free too late; no token has been taken yet
+                raise self._reject("Timed out waiting for a model call slot", 503)
+            wait = max(self.bucket.reserve(), self._paused_until - now)
+            if wait > 0 and wait > remaining:
+                self.bucket.refund()
+                raise self._reject("Model call rate limit exceeded", 429, retry_after=wait)
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+            self.admitted += 1
+            self.active += 1
+            started = time.monotonic()
+            try:
+                yield
+            finally:
+                self.active -= 1
+                self._avg_service = 0.8 * self._avg_service + 0.2 * (time.monotonic() - started)
+        finally:
+            self._semaphore.release()
+
+    def note_throttled(self, backoff: float = THROTTLE_BACKOFF) -> AdmissionRejected:
+        """Record an upstream 429 and hold new admissions back for `backoff` seconds."""
+        self.throttled += 1
+        self._paused_until = time.monotonic() + backoff
+        self.bucket.penalize(backoff)
+        return AdmissionRejected("Model quota exhausted", backoff, 429)
+
+    def stats(self) -> dict[str, Any]:
+        """Queue depth and admission counters."""
+        return {
+            "active": self.active,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "throttled": self.throttled,
+        }
+
+
+_controllers: dict[str, AdmissionController] = {}
+
+
+def get_admission_controller(model: str) -> AdmissionController:
+    """The process-wide controller for a model, so every caller shares its quota."""
+    controller = _controllers.get(model)
+    if controller is None:
+        controller = _controllers[model] = AdmissionController()
+    return controller
+
+
+def is_quota_error(error: BaseException) -> bool:
+    """True for Gemini 429 RESOURCE_EXHAUSTED errors."""
+    return getattr(error, "code", None) == 429
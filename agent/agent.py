@@ -5,33 +5,108 @@ An agent that generates A2UI JSON for interactive portfolio materials.
 Re-implemented as a class for compatibility with the sample's server.py.
 """
 
+import asyncio
 import json
 import logging
 import os
 import time
-from typing import Any, Optional, AsyncGenerator
+from typing import TYPE_CHECKING, Any, Optional, AsyncGenerator
 
-from dotenv import load_dotenv
-load_dotenv()
+# Cloud Run (K_SERVICE) injects the configuration; .env is for local runs
+if not os.getenv("K_SERVICE"):
+    from dotenv import load_dotenv
+    load_dotenv()
 
-from google import genai
-from google.genai import types
+# google.genai takes about as long to import as the rest of the server, so it
+# is imported where a request first needs it (see tests/test_import_time.py)
+if TYPE_CHECKING:
+    from google.genai import types
 
 # Import portfolio data
 try:
-    from agent.portfolio_data import PROFILE, EXPERIENCE, PROJECTS, SKILLS, CERTIFICATIONS, _CERTIFICATIONS, AWARDS, _AWARDS, PUBLICATIONS, _BLOGS, _VIDEOS, TESTIMONIALS, _SPEAKING, _GALLERY, COMICS
+    from agent.context_projections import DEFAULT_PORTFOLIO, FORMAT_SECTIONS, FULL_CONTEXT, Portfolio, get_format_context
 except ImportError:
-    from portfolio_data import PROFILE, EXPERIENCE, PROJECTS, SKILLS, CERTIFICATIONS, _CERTIFICATIONS, AWARDS, _AWARDS, PUBLICATIONS, _BLOGS, _VIDEOS, TESTIMONIALS, _SPEAKING, _GALLERY, COMICS
+    from context_projections import DEFAULT_PORTFOLIO, FORMAT_SECTIONS, FULL_CONTEXT, Portfolio, get_format_context
 
 # Import A2UI templates
 try:
-    from agent.a2ui_templates import get_system_prompt, SURFACE_ID
+    from agent.a2ui_templates import get_system_prompt, get_topic_instruction, SURFACE_ID
+    from agent.a2ui_stream import A2UIStreamParser
+    from agent.a2ui_builder import build, content_errors, get_content_schema, surface_stream
+    from agent.response_cache import ResponseCache, content_digest, make_cache_key
+    from agent.result_store import ResultStore, create_result_store
+    from agent.singleflight import SingleFlight
+    from agent.context_cache import ContextCacheRegistry, ContextCacheStore
+    from agent.admission import AdmissionRejected, get_admission_controller, is_quota_error
+    from agent.circuit_breaker import HALF_OPEN, STALE_SNAPSHOT_PATH, StaleSnapshot, get_circuit_breaker
+    from agent.hedging import Hedger
+    from agent.intent_router import ADVENT_OF_AGENTS, route
+    from agent.metrics import record_cache, stage
+    from agent.model_backend import MODEL_BACKEND, create_client
+    from agent.tenants import DEFAULT_TENANT, TENANTS_DIR, TenantRegistry
+    from agent.sessions import SessionStore
+    from agent.renderers import (
+        DETERMINISTIC_FORMATS, RENDER_MODE_DETERMINISTIC, RENDER_MODE_LLM, RENDER_MODES,
+        default_render_mode, render,
+    )
 except ImportError:
-    from a2ui_templates import get_system_prompt, SURFACE_ID
+    from a2ui_templates import get_system_prompt, get_topic_instruction, SURFACE_ID
+    from a2ui_stream import A2UIStreamParser
+    from a2ui_builder import build, content_errors, get_content_schema, surface_stream
+    from response_cache import ResponseCache, content_digest, make_cache_key
+    from result_store import ResultStore, create_result_store
+    from singleflight import SingleFlight
+    from context_cache import ContextCacheRegistry, ContextCacheStore
+    from admission import AdmissionRejected, get_admission_controller, is_quota_error
+    from circuit_breaker import HALF_OPEN, STALE_SNAPSHOT_PATH, StaleSnapshot, get_circuit_breaker
+    from hedging import Hedger
+    from intent_router import ADVENT_OF_AGENTS, route
+    from metrics import record_cache, stage
+    from model_backend import MODEL_BACKEND, create_client
+    from tenants import DEFAULT_TENANT, TENANTS_DIR, TenantRegistry
+    from sessions import SessionStore
+    from renderers import (
+        DETERMINISTIC_FORMATS, RENDER_MODE_DETERMINISTIC, RENDER_MODE_LLM, RENDER_MODES,
+        default_render_mode, render,
+    )
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Response cache configuration. RESPONSE_CACHE_VARIANTS > 1 opts into variety:
+# each (format, topic) pools that many generations and serves them round-robin.
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "512"))
+RESPONSE_CACHE_VARIANTS = int(os.getenv("RESPONSE_CACHE_VARIANTS", "1"))
+# Smaller per-tenant caches keep memory bounded with many tenants loaded
+TENANT_RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("TENANT_RESPONSE_CACHE_MAX_ENTRIES", "64"))
+# Optional second tier shared by every worker and tenant (see result_store.py)
+RESULT_STORE_URL = os.getenv("RESULT_STORE_URL", "")
+
+# Default render mode. Unset: data-backed formats (certs, awards, timeline, ...)
+# are built directly from portfolio data and generative ones use the LLM.
+# "llm" sends every format to the model.
+DEFAULT_RENDER_MODE = os.getenv("RENDER_MODE", "").lower()
+
+# Optional request hedging: when GENAI_HEDGE_PERCENTILE is set (e.g. 95), a call
+# still outstanding after that percentile of recent latency gets one duplicate,
+# for at most GENAI_HEDGE_MAX_RATIO of calls.
+HEDGE_PERCENTILE = float(os.getenv("GENAI_HEDGE_PERCENTILE", "0"))
+HEDGE_MAX_RATIO = float(os.getenv("GENAI_HEDGE_MAX_RATIO", "0.1"))
+
+# Requests still waiting on the model after GENERATION_DEADLINE seconds get the
+# last known good result, marked stale, while the generation finishes in the
+# background and refreshes the cache. Slower generations count as failures
+# for the format's circuit breaker (see circuit_breaker.py). 0 disables.
+GENERATION_DEADLINE = float(os.getenv("GENERATION_DEADLINE", "20"))
+
+# Context cache registry, shared by all workers on the host through SQLite
+CONTEXT_CACHE_DB = os.getenv("CONTEXT_CACHE_DB", "")
+CONTEXT_CACHE_TTL = int(os.getenv("CONTEXT_CACHE_TTL", "3600"))
+
+# Sections every chat follow-up gets on top of those of the formats rendered
+CHAT_CORE_SECTIONS = ("PROFILE", "EXPERIENCE")
+
 class LearningMaterialAgent:
     """Agent for generating personalized portfolio materials."""
     
@@ -40,72 +115,336 @@ class LearningMaterialAgent:
         "video_cards", "blog_cards", "awards", "certs", "speaker", "testimonials", "gallery", "creative", "comics"
     ]
     
-    def __init__(self, model_id: str = "gemini-1.5-flash"):
+    def __init__(
+        self,
+        model_id: str = "gemini-1.5-flash",
+        portfolio: Portfolio = DEFAULT_PORTFOLIO,
+        client: Any = None,
+        cache_store: Optional[ContextCacheStore] = None,
+        response_cache_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+        result_store: Optional[ResultStore] = None,
+        session_store: Optional[SessionStore] = None,
+    ):
         self.model_id = model_id
+        # Whose portfolio this agent presents (see tenants.py)
+        self.portfolio = portfolio
         # Client will be initialized on first use if needed for simple calls
-        self.client = None
-        
+        self.client = client
+        # Bounds the number of concurrent model calls issued by this agent
+        # Shared with every other caller of this model in the process (see admission.py)
+        self.admission = get_admission_controller(model_id)
+        self.hedger = Hedger(HEDGE_PERCENTILE, HEDGE_MAX_RATIO) if HEDGE_PERCENTILE > 0 else None
+        self.response_cache = ResponseCache(
+            max_entries=response_cache_entries,
+            ttl=RESPONSE_CACHE_TTL,
+            variants=RESPONSE_CACHE_VARIANTS,
+            store=result_store,
+        )
+        self._data_versions: dict[str, str] = {}
+        # Coalesces identical concurrent generations onto one model call
+        self._inflight = SingleFlight()
+        # Generations that outlived their request (revalidations, missed deadlines)
+        self._background: set[asyncio.Future] = set()
+        # Reviewed outputs of the built-in portfolio, the fallback of last resort
+        self.snapshot = StaleSnapshot(STALE_SNAPSHOT_PATH) if portfolio is DEFAULT_PORTFOLIO else None
+        # Compacted history and rendered formats per session_id, in a store
+        # tenants share under their own namespace
+        self.sessions = session_store if session_store is not None else SessionStore()
+        if cache_store is None and MODEL_BACKEND == "local":
+            # Stand-in cache names must not leak into the store real workers share
+            cache_store = ContextCacheStore(":memory:")
+        elif cache_store is None:
+            cache_store = ContextCacheStore(CONTEXT_CACHE_DB) if CONTEXT_CACHE_DB else ContextCacheStore()
+        self.context_caches = ContextCacheRegistry(
+            lambda: self._get_client().aio.caches,
+            cache_store,
+            ttl_seconds=CONTEXT_CACHE_TTL,
+        )
+
     def _get_client(self):
         if self.client is None:
-            # Use Vertex AI if configured, else default to Gemini API
-            use_vertex = os.getenv("GOOGLE_GENAI_USE_VERTEXAI", "TRUE").upper() == "TRUE"
-            project = os.getenv("GOOGLE_CLOUD_PROJECT")
-            location = os.getenv("GOOGLE_CLOUD_LOCATION", "us-central1")
-            
-            if use_vertex and project:
-                self.client = genai.Client(vertexai=True, project=project, location=location)
-            else:
-                self.client = genai.Client()
+            self.client = create_client()
         return self.client
 
-    def _get_combined_context(self, context_topic: str = "") -> str:
-        """Combine all portfolio data into a single context string."""
-        context = f"""
-PROFILE: {PROFILE}
-EXPERIENCE: {EXPERIENCE}
-PROJECTS: {PROJECTS}
-SKILLS: {SKILLS}
-CERTIFICATIONS: {CERTIFICATIONS}
-RAW_CERTIFICATIONS: {_CERTIFICATIONS}
-AWARDS: {AWARDS}
-RAW_AWARDS: {_AWARDS}
-PUBLICATIONS: {PUBLICATIONS}
-BLOGS: {_BLOGS}
-VIDEOS: {_VIDEOS}
-SPEAKING: {_SPEAKING}
-TESTIMONIALS: {TESTIMONIALS}
-COMICS: {COMICS}
-
-CURRENT_TIMESTAMP: {time.time()}
-"""
+    def _get_combined_context(self, context_topic: str = "", format_type: str = FULL_CONTEXT) -> str:
+        """
+        Portfolio context for a format, projected to the sections it needs.
+
+        Projections are serialized once at import (see context_projections);
+        the default is the full context used by open-ended chat.
+        """
+        context = get_format_context(format_type, self.portfolio.contexts)
         if context_topic:
             context += f"\n\nFOCUS TOPIC: {context_topic}"
         return context
 
-    async def generate_content(self, format_type: str, context_topic: str = "") -> dict[str, Any]:
-        """Generate A2UI content for the specified format."""
+    async def generate_content(self, format_type: str, context_topic: str = "", render_mode: Optional[str] = None) -> dict[str, Any]:
+        """
+        Generate A2UI content for the specified format.
+
+        render_mode selects "deterministic" (built directly from portfolio
+        data, data-backed formats only) or "llm". By default data-backed
+        formats render deterministically; RENDER_MODE overrides the default.
+        """
         logger.info(f"Generating {format_type} for topic: {context_topic}")
         
         if format_type not in self.SUPPORTED_FORMATS:
             return {"error": f"Unsupported format: {format_type}"}
-            
-        full_context = self._get_combined_context(context_topic)
-        system_prompt = get_system_prompt(format_type, full_context, context_topic)
-        
-        client = self._get_client()
+
+        mode = self._resolve_render_mode(format_type, render_mode)
+        if mode is None:
+            return {"error": f"Unsupported render_mode {render_mode!r} for format: {format_type}"}
+        if mode == RENDER_MODE_DETERMINISTIC:
+            return self._render_deterministic(format_type)
+
+        cache_key = self._cache_key(format_type, context_topic)
+        cached = await self.response_cache.aget(cache_key)
+        record_cache("response", format_type, "miss" if cached is None else "hit")
+        if cached is not None:
+            return cached
+
+        short_circuit = self._short_circuit(format_type, context_topic, cache_key)
+        if short_circuit is not None:
+            return short_circuit
+
+        # Concurrent callers with the same key share one in-flight generation
+        record_cache("inflight", format_type, "hit" if self._inflight.pending(cache_key) else "miss")
+        return await self._join_generation(format_type, context_topic, cache_key)
+
+    async def _join_generation(self, format_type: str, context_topic: str, cache_key: str) -> dict[str, Any]:
+        """
+        Start or join the key's generation and wait up to GENERATION_DEADLINE.
+
+        Past the deadline, or if the generation fails, the last known good
+        result is served stale when there is one.
+        """
+        generation = asyncio.ensure_future(self._inflight.do(
+            cache_key, lambda: self._generate_uncached(format_type, context_topic, cache_key)
+        ))
+        if GENERATION_DEADLINE > 0:
+            try:
+                await asyncio.wait({generation}, timeout=GENERATION_DEADLINE)
+            except asyncio.CancelledError:
+                # The caller went away; other waiters may still need the result
+                self._keep_in_background(generation)
+                raise
+            if not generation.done():
+                stale = self._serve_stale(format_type, context_topic, cache_key, "deadline")
+                if stale is not None:
+                    self._keep_in_background(generation)
+                    return stale
+        try:
+            result = await generation
+        except Exception:
+            stale = self._serve_stale(format_type, context_topic, cache_key, "error")
+            if stale is None:
+                raise
+            return stale
+        if "error" in result:
+            return self._serve_stale(format_type, context_topic, cache_key, "error") or result
+        return result
+
+    async def _generate_uncached(self, format_type: str, context_topic: str, cache_key: str) -> dict[str, Any]:
+        """Call the model for a cache miss, store the result and report to the breaker."""
+        breaker = get_circuit_breaker(self.model_id, format_type)
+        started = time.monotonic()
+        # None (cancelled, shed by admission control) only frees a half-open probe
+        success = None
+        try:
+            contents, config = await self._prepare_generation(format_type, context_topic)
+
+            # Simple non-streaming call for the tool-like behavior
+            try:
+                with stage("model", format_type):
+                    response = await self._call_model(contents=contents, config=config)
+            except Exception as e:
+                if not isinstance(e, AdmissionRejected):
+                    success = False
+                raise
+            result = self._parse_response(format_type, response.text)
+            slow = GENERATION_DEADLINE > 0 and time.monotonic() - started > GENERATION_DEADLINE
+            success = "error" not in result and not slow
+        finally:
+            breaker.record(success)
+        await self.response_cache.aput(cache_key, result)
+        return result
+
+    def _short_circuit(self, format_type: str, context_topic: str, cache_key: str) -> Optional[dict[str, Any]]:
+        """
+        The response for a request that should not wait on the model, or None.
+
+        While the format's breaker is open: the stale result, or else
+        AdmissionRejected (503) with Retry-After set to when it will probe.
+        While it is half-open and a stale result exists: that result, with the
+        probe generation run in the background.
+        """
+        breaker = get_circuit_breaker(self.model_id, format_type)
+        if not breaker.allow():
+            stale = self._serve_stale(format_type, context_topic, cache_key, "circuit_open")
+            if stale is None:
+                raise AdmissionRejected(
+                    f"{format_type} is temporarily unavailable, please try again shortly",
+                    retry_after=breaker.retry_after(),
+                    status_code=503,
+                )
+            return stale
+        if breaker.state == HALF_OPEN:
+            stale = self._serve_stale(format_type, context_topic, cache_key, "revalidating")
+            if stale is not None:
+                self._keep_in_background(asyncio.ensure_future(self._inflight.do(
+                    cache_key, lambda: self._generate_uncached(format_type, context_topic, cache_key)
+                )))
+            return stale
+        return None
+
+    def _serve_stale(self, format_type: str, context_topic: str, cache_key: str, reason: str) -> Optional[dict[str, Any]]:
+        """The last known good result, marked stale: expired cache entry, then snapshot."""
+        result = self.response_cache.stale(cache_key)
+        if result is None and self.snapshot is not None:
+            result = self.snapshot.get(format_type, context_topic)
+        record_cache("stale", format_type, "miss" if result is None else "hit")
+        if result is None:
+            return None
+        logger.warning(f"Serving stale {format_type} for topic {context_topic!r} ({reason})")
+        return {**result, "stale": True, "stale_reason": reason}
+
+    def _keep_in_background(self, generation: asyncio.Future) -> None:
+        """Let a generation finish after its request returned; it fills the cache."""
+        self._background.add(generation)
+
+        def done(future: asyncio.Future) -> None:
+            self._background.discard(future)
+            if not future.cancelled() and future.exception() is not None:
+                logger.warning(f"Background generation failed: {future.exception()}")
+
+        generation.add_done_callback(done)
+
+    async def stream_content(self, format_type: str, context_topic: str = "", render_mode: Optional[str] = None) -> AsyncGenerator[dict[str, Any], None]:
+        """
+        Generate A2UI content progressively using the model's streaming API.
+
+        Yields a partial event for every A2UI message (and every surfaceUpdate
+        component) as soon as it is complete, then a final event identical to
+        the result of generate_content.
+        """
+        logger.info(f"Streaming {format_type} for topic: {context_topic}")
+
+        if format_type not in self.SUPPORTED_FORMATS:
+            yield {"error": f"Unsupported format: {format_type}"}
+            return
+
+        mode = self._resolve_render_mode(format_type, render_mode)
+        if mode is None:
+            yield {"error": f"Unsupported render_mode {render_mode!r} for format: {format_type}"}
+            return
+        if mode == RENDER_MODE_DETERMINISTIC:
+            yield self._render_deterministic(format_type)
+            return
+
+        cache_key = self._cache_key(format_type, context_topic)
+        cached = await self.response_cache.aget(cache_key)
+        record_cache("response", format_type, "miss" if cached is None else "hit")
+        if cached is not None:
+            yield cached
+            return
+
+        short_circuit = self._short_circuit(format_type, context_topic, cache_key)
+        if short_circuit is not None:
+            yield short_circuit
+            return
+
+        # An identical generation is already running: wait for it rather than
+        # starting a second model call.
+        if self._inflight.pending(cache_key):
+            record_cache("inflight", format_type, "hit")
+            yield await self._join_generation(format_type, context_topic, cache_key)
+            return
+
+        record_cache("inflight", format_type, "miss")
+        breaker = get_circuit_breaker(self.model_id, format_type)
+        contents, config = await self._prepare_generation(format_type, context_topic)
+
+        # List formats stream one content item per top-level array element;
+        # each is assembled into its card as soon as it is complete.
+        parser = A2UIStreamParser()
+        surface = surface_stream(format_type)
+        chunks = []
+        # Reported however the stream ends: a consumer that disconnects
+        # (GeneratorExit, cancellation) must not leave a half-open probe held
+        success = None
+        try:
+            try:
+                # Includes time the consumer spends on partial events
+                with stage("model", format_type):
+                    async for text in self._stream_model(contents=contents, config=config):
+                        chunks.append(text)
+                        if surface is None:
+                            continue
+                        for item in parser.feed(text):
+                            for message in surface.add(item):
+                                yield {
+                                    "partial": True,
+                                    "format": format_type,
+                                    "a2ui": [message],
+                                    "surfaceId": SURFACE_ID,
+                                }
+            except Exception as e:
+                if not isinstance(e, AdmissionRejected):
+                    success = False
+                stale = self._serve_stale(format_type, context_topic, cache_key, "error")
+                if stale is None:
+                    raise
+                yield stale
+                return
+
+            result = self._parse_response(format_type, "".join(chunks))
+            success = "error" not in result
+            if not success:
+                yield self._serve_stale(format_type, context_topic, cache_key, "error") or result
+                return
+        finally:
+            breaker.record(success)
+        await self.response_cache.aput(cache_key, result)
+        yield result
+
+    def _cache_key(self, format_type: str, context_topic: str) -> str:
+        """Response cache key: format, normalized topic and data version."""
+        data_version = self._data_versions.get(format_type)
+        if data_version is None:
+            # Hash the data and the format's prompt template, so editing either
+            # invalidates cached responses without a manual flush.
+            data_version = content_digest(
+                self._get_combined_context(format_type=format_type),
+                get_system_prompt(format_type, "", ""),
+            )
+            self._data_versions[format_type] = data_version
+        return make_cache_key(format_type, context_topic, data_version)
+
+    async def _prepare_generation(self, format_type: str, context_topic: str) -> tuple[list["types.Content"], "types.GenerateContentConfig"]:
+        """Build the request contents and config for a format generation."""
+        from google.genai import types
+
+        # The topic goes in the user turn, so the system prompt (and its
+        # context cache) is shared by every topic of the format
+        with stage("context", format_type):
+            format_context = self._get_combined_context(format_type=format_type)
+        with stage("prompt", format_type):
+            system_prompt = self.portfolio.personalize(get_system_prompt(format_type, format_context))
         
-        is_json_format = format_type in [
-            "flashcards", "quiz", "image", "video", "timeline", 
-            "video_cards", "blog_cards", "awards", "certs", "speaker", "testimonials", "gallery", "creative"
-        ]
+        # The model only fills the format's content; the A2UI tree is built
+        # server-side (see a2ui_builder.py)
+        response_schema = get_content_schema(format_type)
         
         # Context Caching Optimization (AgentOps Audit: High Impact)
         # Reduces redundant token processing for large static instructions
-        cache_name = self._get_cache_name(system_prompt)
+        with stage("context_cache", format_type):
+            cache_name = await self._get_cache_name(system_prompt, format_type)
         
         config_args = {
-            "response_mime_type": "application/json" if is_json_format else "text/plain"
+            "response_mime_type": "application/json" if response_schema else "text/plain"
         }
+        if response_schema:
+            config_args["response_schema"] = response_schema
         
         # If cache created successfully, use it; otherwise fallback to system_instruction
         if cache_name:
@@ -113,152 +452,240 @@ CURRENT_TIMESTAMP: {time.time()}
         else:
             config_args["system_instruction"] = system_prompt
 
-        # Simple non-streaming call for the tool-like behavior
-        # VARIETY FIX: Use a random seed/timestamp in the user message 
-        # to prevent cached-result repetition for generic "Generate" requests.
-        user_message = f"Generate {format_type} for topic: {context_topic}. [Random Seed: {time.time()}]"
+        # The user message is deterministic so identical requests can be cached.
+        # Variety is opt-in through the response cache's variant pool.
+        user_message = self.portfolio.personalize(get_topic_instruction(format_type, context_topic))
 
-        response = client.models.generate_content(
-            model=self.model_id,
-            contents=[types.Content(role="user", parts=[types.Part.from_text(text=user_message)])],
-            config=types.GenerateContentConfig(**config_args)
-        )
+        contents = [types.Content(role="user", parts=[types.Part.from_text(text=user_message)])]
+        return contents, types.GenerateContentConfig(**config_args)
 
-    def _get_cache_name(self, system_instruction: str) -> Optional[str]:
-        """Get or create a context cache for the given instruction."""
-        # Minimum token requirement for caching is often ~32k, but Vertex/GenAI SDK
-        # handles the logic. We implement it to follow audit best practices.
+    def _resolve_render_mode(self, format_type: str, render_mode: Optional[str]) -> Optional[str]:
+        """Pick the render mode for a request; None if the request is invalid."""
+        if render_mode is not None:
+            if render_mode not in RENDER_MODES:
+                return None
+            if render_mode == RENDER_MODE_DETERMINISTIC and format_type not in DETERMINISTIC_FORMATS:
+                return None
+            return render_mode
+
+        if DEFAULT_RENDER_MODE == RENDER_MODE_LLM:
+            return RENDER_MODE_LLM
+        return default_render_mode(format_type)
+
+    def _render_deterministic(self, format_type: str) -> dict[str, Any]:
+        """Build a data-backed format without calling the model."""
+        with stage("render", format_type):
+            a2ui = render(format_type, self.portfolio.sections)
+        return {
+            "format": format_type,
+            "a2ui": a2ui,
+            "surfaceId": SURFACE_ID,
+            "source": self._source_for(format_type)
+        }
+
+    def _source_for(self, format_type: str) -> dict[str, Any]:
+        """Source attribution shown alongside the rendered format."""
+        source = self.portfolio.sections.get("SOURCES", {}).get(format_type)
+        if source is not None:
+            return source
+
+        links = self.portfolio.profile.get("links", {})
+        if format_type == "video_cards":
+            return {"provider": "YouTube", "url": links.get("youtube")}
+        elif format_type == "blog_cards":
+            return {"provider": "Medium", "url": links.get("medium")}
+        elif format_type == "timeline":
+            return {"provider": "Portfolio", "url": links.get("portfolio"), "title": "Career History"}
+        return {"provider": self.portfolio.owner, "url": links.get("portfolio")}
+
+    def _parse_response(self, format_type: str, raw_text: str) -> dict[str, Any]:
+        """Turn raw model output into the A2UI result dict returned to clients."""
+        # Output is schema-constrained content JSON, so it is parsed as-is,
+        # validated and assembled into A2UI
+        with stage("parse", format_type):
+            try:
+                content = json.loads(raw_text)
+                errors = content_errors(format_type, content)
+            except ValueError as e:
+                errors = [f"invalid JSON: {e}"]
+
+        if errors:
+            logger.error(f"Invalid {format_type} content: {'; '.join(errors[:5])}")
+            if format_type in DETERMINISTIC_FORMATS:
+                # Serve the data-backed rendering rather than an error
+                return self._render_deterministic(format_type)
+            return {"error": "Failed to generate UI components", "raw": raw_text}
+
+        with stage("build", format_type):
+            a2ui = build(format_type, content)
+        return {
+            "format": format_type,
+            "a2ui": a2ui,
+            "surfaceId": SURFACE_ID,
+            "source": self._source_for(format_type)
+        }
+
+    async def _call_model(self, contents: Any, config: "types.GenerateContentConfig") -> "types.GenerateContentResponse":
+        """
+        Issue a single Gemini call through the async client.
+
+        The synchronous client blocks the event loop for the whole generation,
+        stalling every other request on the worker (including /health). The
+        async client yields while waiting on the network, and the admission
+        controller bounds how many calls are in flight and how fast they start.
+        With hedging enabled, a slow call may race one duplicate.
+        """
+        if self.hedger is not None:
+            return await self.hedger.run(lambda: self._call_model_once(contents, config))
+        return await self._call_model_once(contents, config)
+
+    async def _call_model_once(self, contents: Any, config: "types.GenerateContentConfig") -> "types.GenerateContentResponse":
         client = self._get_client()
-        
-        if not hasattr(self, '_cache_map'):
-            self._cache_map = {}
-            
-        inst_hash = hash(system_instruction)
-        if inst_hash in self._cache_map:
-            return self._cache_map[inst_hash]
-            
-        try:
-            # Context caching provides a 90% cost reduction on reuse
-            logger.info("Initializing Context Cache for high-signal system prompt...")
-            
-            # Caching often requires specific model versions (e.g. -001)
-            model_name = self.model_id
-            if 'flash' in model_name and '001' not in model_name and '002' not in model_name:
-                model_name = 'gemini-1.5-flash-001'
-
-            cached_content = client.caches.create(
-                model=model_name,
-                config=types.CachedContentConfig(
-                    system_instruction=system_instruction,
-                    ttl='3600s',
+        async with self.admission.admit():
+            try:
+                return await client.aio.models.generate_content(
+                    model=self.model_id,
+                    contents=contents,
+                    config=config
                 )
-            )
-            self._cache_map[inst_hash] = cached_content.name
-            logger.info(f"Context Cache active: {cached_content.name}")
-            return cached_content.name
-        except Exception as e:
-            # Fallback gracefully if caching is not supported for this model/size
-            logger.debug(f"Context caching skipped: {e}")
-            return None
+            except Exception as e:
+                if is_quota_error(e):
+                    raise self.admission.note_throttled() from e
+                raise
 
-        
-        try:
-            text = response.text
-            # Handle possible markdown wrapping
-            if "```json" in text:
-                text = text.split("```json")[1].split("```")[0].strip()
-            elif "```" in text:
-                text = text.split("```")[1].split("```")[0].strip()
-            
-            # Determine source attribution
-            source = {"provider": "Enrique K Chan", "url": PROFILE.get("links", {}).get("portfolio")}
-            
-            if format_type == "video_cards":
-                source = {"provider": "YouTube", "url": PROFILE.get("links", {}).get("youtube"), "title": "@enriquekchan"}
-            elif format_type == "blog_cards":
-                source = {"provider": "Medium", "url": PROFILE.get("links", {}).get("medium"), "title": "Insight Stream"}
-            elif format_type == "certs":
-                source = {"provider": "Credly / Google", "url": "https://www.credential.net/profile/enriquekchan", "title": "Cloud Certifications"}
-            elif format_type == "speaker":
-                source = {"provider": "Google Cloud Next", "url": "https://cloud.withgoogle.com/next", "title": "Speaking Engagements"}
-            elif format_type == "awards":
-                source = {"provider": "LinkedIn", "url": "https://www.linkedin.com/in/enriquechan/details/honors/", "title": "Trophy Room"}
-            elif format_type == "timeline":
-                source = {"provider": "Portfolio", "url": PROFILE.get("links", {}).get("portfolio"), "title": "Career History"}
-
-            a2ui_json = json.loads(text)
-            return {
-                "format": format_type,
-                "a2ui": a2ui_json,
-                "surfaceId": SURFACE_ID,
-                "source": source
-            }
-        except Exception as e:
-            logger.error(f"Failed to parse A2UI JSON: {e}")
-            return {"error": "Failed to generate UI components", "raw": response.text}
+    async def _stream_model(self, contents: Any, config: "types.GenerateContentConfig") -> AsyncGenerator[str, None]:
+        """Stream a Gemini call through the async client, yielding text chunks."""
+        client = self._get_client()
+        async with self.admission.admit():
+            try:
+                stream = await client.aio.models.generate_content_stream(
+                    model=self.model_id,
+                    contents=contents,
+                    config=config
+                )
+                async for chunk in stream:
+                    if chunk.text:
+                        yield chunk.text
+            except Exception as e:
+                if is_quota_error(e):
+                    raise self.admission.note_throttled() from e
+                raise
+
+    async def _get_cache_name(self, system_instruction: str, format_type: str = "") -> Optional[str]:
+        """Get or create a context cache for the given instruction."""
+        # Minimum token requirement for caching is often ~32k, but Vertex/GenAI SDK
+        # handles the logic. Context caching provides a 90% cost reduction on reuse.
+        # The cache must be created for the same model that later serves requests.
+        return await self.context_caches.get_or_create(self.model_id, system_instruction, format_type)
 
     async def stream(self, message: str, session_id: str = "default") -> AsyncGenerator[dict[str, Any], None]:
         """
         A2A-compatible streaming interface.
         If message is "format:topic", it generates that format.
+
+        Renders and chat turns are remembered per session_id (see sessions.py),
+        so chat follow-ups carry the compacted history, the portfolio sections
+        the session has seen and an outline of the rest instead of the full
+        portfolio.
         """
         parts = message.split(":", 1)
         format_type = parts[0].strip().lower()
         context = parts[1].strip() if len(parts) > 1 else ""
         
-        if "advent of agents" in message.lower():
+        intent = route(message)
+        if ADVENT_OF_AGENTS in intent.scores and self.portfolio is DEFAULT_PORTFOLIO:
             response_text = "Enrique played a key role developing [adventofagents.com](https://adventofagents.com) and served as the primary content moderator for the campaign."
+            self.sessions.record_turn(session_id, message, response_text, namespace=self.portfolio.tenant_id)
             yield {"text": response_text}
             return
 
-        if format_type not in self.SUPPORTED_FORMATS:
-            # Handle specific portfolio intents if they appear in the message
-            # This is for requests coming from the frontend orchestrator or raw chat
-            message_lower = message.lower()
-            if "award" in message_lower or "honor" in message_lower or "trophy" in message_lower:
-                format_type = "awards"
-            elif "cert" in message_lower or "credential" in message_lower or "badge" in message_lower:
-                format_type = "certs"
-            elif "speak" in message_lower or "keynote" in message_lower:
-                format_type = "speaker"
-            elif "testimonial" in message_lower or "what people say" in message_lower:
-                format_type = "testimonials"
-            elif "blog" in message_lower or "article" in message_lower or "medium" in message_lower:
-                format_type = "blog_cards"
-            elif "video cards" in message_lower or "video gallery" in message_lower or "youtube gallery" in message_lower:
-                format_type = "video_cards"
-            elif "timeline" in message_lower or "career journey" in message_lower or "history" in message_lower:
-                format_type = "timeline"
-            elif "gallery" in message_lower or "portfolio sample" in message_lower:
-                format_type = "gallery"
-            elif "skill match" in message_lower or "analyze fit" in message_lower or "role fit" in message_lower:
-                format_type = "flashcards"
-            elif "comic" in message_lower or "secret file" in message_lower or "unlocked" in message_lower:
-                format_type = "comics"
+        if format_type not in self.SUPPORTED_FORMATS and intent.intent is not None:
+            # Portfolio intents in requests coming from the frontend
+            # orchestrator or raw chat (see intent_router.py)
+            logger.info(f"Routed message to {intent.intent} (confidence {intent.confidence:.2f})")
+            format_type = intent.intent
 
         if format_type in self.SUPPORTED_FORMATS:
-            result = await self.generate_content(format_type, context)
-            yield result
+            async for event in self.stream_content(format_type, context):
+                yield event
+            self.record_render(session_id, format_type, context, message)
         else:
+            contents, config = await self._prepare_chat(message, self.sessions.get(session_id, namespace=self.portfolio.tenant_id))
+            response = await self._call_model(contents=contents, config=config)
+            self.sessions.record_turn(session_id, message, response.text or "", namespace=self.portfolio.tenant_id)
+            yield {"text": response.text}
+
+    async def _prepare_chat(self, message: str, session: Optional[dict[str, Any]]) -> tuple[list["types.Content"], "types.GenerateContentConfig"]:
+        """
+        Build the contents and config for a chat turn.
+
+        A new session gets the full portfolio context (context-cached). Once
+        it has rendered formats or summarized older turns, the instruction
+        holds the core sections and those of the rendered formats in full, an
+        outline of every other section (so any of them can still be answered
+        about), what was already shown and the summary of earlier turns.
+        Recent turns lead the contents, alternating user and model.
+        """
+        from google.genai import types
+
+        persona = f"You are {self.portfolio.owner}'s Portfolio Agent."
+        if session is None or not (session["rendered"] or session["summary"]):
             # General chat fallback with Context Caching
-            full_context = self._get_combined_context(context)
-            client = self._get_client()
-            
-            instruction = f"You are Enrique K Chan's Portfolio Agent. {full_context}"
+            instruction = f"{persona} {self._get_combined_context()}"
             
-            cache_name = self._get_cache_name(instruction)
+            cache_name = await self._get_cache_name(instruction)
             config_args = {}
             if cache_name:
                 config_args["cached_content"] = cache_name
             else:
                 config_args["system_instruction"] = instruction
-
-            response = client.models.generate_content(
-                model=self.model_id,
-                contents=[types.Content(role="user", parts=[types.Part.from_text(text=message)])],
-                config=types.GenerateContentConfig(**config_args)
+        else:
+            full = CHAT_CORE_SECTIONS + tuple(
+                label for rendered in session["rendered"] for label in FORMAT_SECTIONS.get(rendered, ())
             )
-            yield {"text": response.text}
+            instruction = f"{persona} {self.portfolio.sections_context(full)}"
+            outlined = self.portfolio.sections_outline(
+                label for label in FORMAT_SECTIONS[FULL_CONTEXT] if label not in full
+            )
+            if outlined:
+                instruction += f"\n\nOUTLINE OF THE OTHER SECTIONS:\n{outlined}"
+            if session["rendered"]:
+                shown = "; ".join(
+                    f"{rendered} ({', '.join(filter(None, topics)) or 'general'})"
+                    for rendered, topics in session["rendered"].items()
+                )
+                instruction += f"\n\nALREADY SHOWN TO THE USER: {shown}"
+            if session["summary"]:
+                instruction += "\n\nEARLIER IN THIS CONVERSATION:\n" + "\n".join(session["summary"])
+            config_args = {"system_instruction": instruction}
+
+        contents = []
+        if session is not None:
+            for turn in session["turns"]:
+                contents.append(types.Content(role=turn["role"], parts=[types.Part.from_text(text=turn["text"])]))
+        contents.append(types.Content(role="user", parts=[types.Part.from_text(text=message)]))
+        return contents, types.GenerateContentConfig(**config_args)
+
+    def record_render(self, session_id: str, format_type: str, topic: str = "", message: Optional[str] = None) -> None:
+        """
+        Remember that a session was shown a format, for its chat follow-ups.
+
+        The render is recorded as a turn: the user's message (by default the
+        "format:topic" request) and a note of what was shown.
+        """
+        self.sessions.record_render(session_id, format_type, topic, namespace=self.portfolio.tenant_id)
+        shown = f"{format_type} about {topic}" if topic else format_type
+        if message is None:
+            message = f"{format_type}:{topic}" if topic else format_type
+        self.sessions.record_turn(session_id, message, f"[Showed {shown}]", namespace=self.portfolio.tenant_id)
+
+def __getattr__(name: str) -> Any:
+    # `agent.genai` stays available (and patchable) without importing it eagerly
+    if name == "genai":
+        from google import genai
+        return genai
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 # Singleton instance
 _agent = None
@@ -266,5 +693,38 @@ _agent = None
 def get_agent() -> LearningMaterialAgent:
     global _agent
     if _agent is None:
-        _agent = LearningMaterialAgent(model_id=os.getenv("GENAI_MODEL", "gemini-1.5-flash"))
+        _agent = LearningMaterialAgent(
+            model_id=os.getenv("GENAI_MODEL", "gemini-1.5-flash"),
+            result_store=create_result_store(RESULT_STORE_URL),
+        )
     return _agent
+
+
+def _create_tenant_agent(portfolio: Portfolio) -> LearningMaterialAgent:
+    """A tenant's agent, sharing the default agent's client, cache and session stores."""
+    default = get_agent()
+    return LearningMaterialAgent(
+        model_id=default.model_id,
+        portfolio=portfolio,
+        client=default._get_client(),
+        cache_store=default.context_caches.store,
+        response_cache_entries=TENANT_RESPONSE_CACHE_MAX_ENTRIES,
+        result_store=default.response_cache.store,
+        session_store=default.sessions,
+    )
+
+
+_tenants = None
+
+def get_tenant_registry() -> TenantRegistry:
+    global _tenants
+    if _tenants is None:
+        _tenants = TenantRegistry(TENANTS_DIR, _create_tenant_agent)
+    return _tenants
+
+
+def get_tenant_agent(tenant_id: Optional[str] = None) -> LearningMaterialAgent:
+    """The agent for a tenant; the default tenant is the built-in portfolio."""
+    if not tenant_id or tenant_id == DEFAULT_TENANT:
+        return get_agent()
+    return get_tenant_registry().get(tenant_id)
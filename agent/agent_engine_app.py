@@ -17,7 +17,6 @@ from typing import Any
 
 import vertexai
 from dotenv import load_dotenv
-from google.adk.artifacts import GcsArtifactService, InMemoryArtifactService
 from vertexai.agent_engines.templates.adk import AdkApp
 
 try:
@@ -61,11 +60,18 @@ class AgentEngineApp(AdkApp):
         return operations
 
 
+def _artifact_service():
+    """Built by the engine at set-up; the artifact services are imported then."""
+    from google.adk.artifacts import GcsArtifactService, InMemoryArtifactService
+
+    if logs_bucket_name:
+        return GcsArtifactService(bucket_name=logs_bucket_name)
+    return InMemoryArtifactService()
+
+
 gemini_location = os.environ.get("GOOGLE_CLOUD_LOCATION")
 logs_bucket_name = os.environ.get("LOGS_BUCKET_NAME")
 agent_engine = AgentEngineApp(
     app=adk_app,
-    artifact_service_builder=lambda: GcsArtifactService(bucket_name=logs_bucket_name)
-    if logs_bucket_name
-    else InMemoryArtifactService(),
+    artifact_service_builder=_artifact_service,
 )
@@ -8,8 +8,10 @@ import os
 from google.adk.agents import Agent
 try:
     from agent.portfolio_data import PROFILE, EXPERIENCE, PROJECTS, SKILLS, CERTIFICATIONS, _AWARDS, TESTIMONIALS, _GALLERY
+    from agent.model_backend import create_adk_model
 except ImportError:
     from portfolio_data import PROFILE, EXPERIENCE, PROJECTS, SKILLS, CERTIFICATIONS, _AWARDS, TESTIMONIALS, _GALLERY
+    from model_backend import create_adk_model
 
 # Portfolio context for the agent
 portfolio_context = f"""
@@ -30,7 +32,7 @@ model_id = os.getenv("GENAI_MODEL", "gemini-2.5-flash")
 
 app = Agent(
     name="portfolio_agent",
-    model=model_id,
+    model=create_adk_model(model_id),
     instruction=f"""You are Enrique K Chan's Portfolio Agent.
         
 Enrique is a high-scale AI leader at Google specializing in the transition from RAG to Agentic Workflows.
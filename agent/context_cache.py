@@ -0,0 +1,347 @@
+"""
+Managed lifecycle for Vertex AI / Gemini context caches.
+
+The registry maps a stable digest of (model, system instruction) to the name of
+a server-side CachedContent and keeps it alive:
+
+- Entries are refreshed (TTL extended) shortly before they expire, and
+  recreated if the server-side cache has already expired.
+- Entries live in a small SQLite store so every uvicorn worker on the host
+  reuses the same caches instead of creating one each.
+- Caches created by this store but no longer tracked (lost creation races,
+  superseded prompts) are garbage-collected once they are older than a grace
+  period, so a cache another worker is about to claim is never deleted.
+- Failures are logged and backed off instead of being retried on every call.
+- Store calls on a file-backed store run in a worker thread: `claim` may wait
+  up to 5s for another worker's write lock, which must not stall the event
+  loop.
+
+The caches client is anything with async `create`, `update`, `delete` and
+`list` methods, i.e. `client.aio.caches` or a fake in tests.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, Callable, Optional
+
+try:
+    from agent.metrics import record_cache
+except ImportError:
+    from metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_PATH = os.path.join(tempfile.gettempdir(), "portfolio_context_caches.sqlite")
+
+
+def instruction_digest(model: str, system_instruction: str) -> str:
+    """Stable digest of a cacheable prompt (unlike hash(), identical across processes)."""
+    hasher = hashlib.sha256()
+    hasher.update(model.encode("utf-8"))
+    hasher.update(b"\0")
+    hasher.update(system_instruction.encode("utf-8"))
+    return hasher.hexdigest()[:32]
+
+
+class ContextCacheStore:
+    """SQLite-backed table of live context caches, shared by all workers on a host."""
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        self.path = path
+        # File-backed stores do disk I/O and wait on other workers' locks
+        self.blocking = path != ":memory:"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5)
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS context_caches ("
+                " digest TEXT PRIMARY KEY, name TEXT NOT NULL, model TEXT NOT NULL,"
+                " expire_at REAL NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            self._conn.execute(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES ('store_id', ?)", (uuid.uuid4().hex[:8],)
+            )
+            self.store_id = self._conn.execute("SELECT value FROM meta WHERE key = 'store_id'").fetchone()[0]
+
+    def get(self, digest: str) -> Optional[dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT name, model, expire_at FROM context_caches WHERE digest = ?", (digest,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"name": row[0], "model": row[1], "expire_at": row[2]}
+
+    def claim(self, digest: str, name: str, model: str, expire_at: float, min_remaining: float) -> str:
+        """
+        Record a newly created cache unless another worker already recorded a
+        live one for the same digest. Returns the name that won.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT name, expire_at FROM context_caches WHERE digest = ?", (digest,)
+                ).fetchone()
+                if row is not None and row[0] != name and row[1] - now > min_remaining:
+                    self._conn.execute("COMMIT")
+                    return row[0]
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO context_caches (digest, name, model, expire_at, created_at)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (digest, name, model, expire_at, now),
+                )
+                self._conn.execute("COMMIT")
+                return name
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def update_expiry(self, digest: str, expire_at: float) -> None:
+        with self._lock:
+            self._conn.execute("UPDATE context_caches SET expire_at = ? WHERE digest = ?", (expire_at, digest))
+
+    def delete(self, digest: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM context_caches WHERE digest = ?", (digest,))
+
+    def delete_expired(self, now: float) -> int:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM context_caches WHERE expire_at <= ?", (now,))
+        return cursor.rowcount
+
+    def live_names(self) -> set[str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT name FROM context_caches").fetchall()
+        return {row[0] for row in rows}
+
+
+class ContextCacheRegistry:
+    """
+    Get-or-create context caches with expiry tracking, refresh and GC.
+
+    Args:
+        caches_client: Zero-argument callable returning the async caches API
+            (resolved lazily so the genai client is only built when needed).
+        store: Shared ContextCacheStore.
+        ttl_seconds: TTL requested for created and refreshed caches.
+        refresh_margin: Refresh a cache once less than this many seconds remain.
+        failure_backoff: Seconds to skip caching for a prompt after a failure.
+        gc_interval: Minimum seconds between garbage collection passes.
+        gc_grace: Untracked caches younger than this many seconds are left
+            alone; another worker may not have claimed them yet.
+    """
+
+    DISPLAY_PREFIX = "portfolio-ctx"
+
+    def __init__(
+        self,
+        caches_client: Callable[[], Any],
+        store: ContextCacheStore,
+        ttl_seconds: int = 3600,
+        refresh_margin: float = 300,
+        failure_backoff: float = 300,
+        gc_interval: float = 600,
+        gc_grace: float = 300,
+    ):
+        self._caches_client = caches_client
+        self.store = store
+        self.ttl_seconds = ttl_seconds
+        self.refresh_margin = refresh_margin
+        self.failure_backoff = failure_backoff
+        self.gc_interval = gc_interval
+        self.gc_grace = gc_grace
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._failed_until: dict[str, float] = {}
+        self._last_gc = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.creates = 0
+        self.refreshes = 0
+        self.errors = 0
+        self.collected = 0
+
+    @property
+    def _display_prefix(self) -> str:
+        # Scoped to this store so GC never touches caches owned by another host
+        return f"{self.DISPLAY_PREFIX}-{self.store.store_id}-"
+
+    async def _store(self, method: Callable[..., Any], *args: Any) -> Any:
+        """Call a store method, in a worker thread if the store blocks."""
+        if self.store.blocking:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    async def get_or_create(self, model: str, system_instruction: str, format_type: str = "") -> Optional[str]:
+        """
+        Return the name of a live context cache for the prompt, or None.
+
+        format_type only labels the lookup in the cache metrics.
+        """
+        digest = instruction_digest(model, system_instruction)
+        now = time.time()
+
+        if self._failed_until.get(digest, 0) > now:
+            record_cache("context", format_type, "error")
+            return None
+
+        entry = await self._store(self.store.get, digest)
+        if entry is not None and entry["expire_at"] - now > self.refresh_margin:
+            self.hits += 1
+            record_cache("context", format_type, "hit")
+            return entry["name"]
+
+        lock = self._locks.setdefault(digest, asyncio.Lock())
+        async with lock:
+            # Another coroutine may have refreshed, created or failed it while we waited
+            now = time.time()
+            if self._failed_until.get(digest, 0) > now:
+                record_cache("context", format_type, "error")
+                return None
+            entry = await self._store(self.store.get, digest)
+            if entry is not None and entry["expire_at"] - now > self.refresh_margin:
+                self.hits += 1
+                record_cache("context", format_type, "hit")
+                return entry["name"]
+
+            try:
+                name = None
+                if entry is not None and entry["expire_at"] > now:
+                    name = await self._refresh(digest, entry["name"])
+                if name is not None:
+                    self.hits += 1
+                    record_cache("context", format_type, "hit")
+                else:
+                    self.misses += 1
+                    record_cache("context", format_type, "miss")
+                    if entry is not None:
+                        await self._store(self.store.delete, digest)
+                    name = await self._create(digest, model, system_instruction)
+            except Exception as e:
+                self.errors += 1
+                record_cache("context", format_type, "error")
+                self._failed_until[digest] = time.time() + self.failure_backoff
+                logger.warning(f"Context caching unavailable for {model}, using inline system instruction: {e}")
+                return None
+
+        if time.time() - self._last_gc >= self.gc_interval:
+            await self.collect_garbage()
+        return name
+
+    async def _refresh(self, digest: str, name: str) -> Optional[str]:
+        """Extend a cache's TTL. Returns None if the server no longer has it."""
+        from google.genai import types
+
+        caches = self._caches_client()
+        try:
+            updated = await caches.update(
+                name=name,
+                config=types.UpdateCachedContentConfig(ttl=f"{self.ttl_seconds}s"),
+            )
+        except Exception as e:
+            logger.info(f"Context Cache {name} could not be refreshed, recreating: {e}")
+            return None
+        await self._store(self.store.update_expiry, digest, self._expire_at(updated))
+        self.refreshes += 1
+        logger.info(f"Context Cache refreshed: {name}")
+        return name
+
+    async def _create(self, digest: str, model: str, system_instruction: str) -> str:
+        from google.genai import types
+
+        logger.info("Initializing Context Cache for high-signal system prompt...")
+        caches = self._caches_client()
+        cached_content = await caches.create(
+            model=model,
+            config=types.CreateCachedContentConfig(
+                system_instruction=system_instruction,
+                ttl=f"{self.ttl_seconds}s",
+                display_name=f"{self._display_prefix}{digest}",
+            ),
+        )
+        self.creates += 1
+
+        expire_at = self._expire_at(cached_content)
+        winner = await self._store(self.store.claim, digest, cached_content.name, model, expire_at, self.refresh_margin)
+        if winner != cached_content.name:
+            # Another worker created one concurrently; drop ours
+            await self._delete(cached_content.name)
+        logger.info(f"Context Cache active: {winner}")
+        return winner
+
+    def _expire_at(self, cached_content: Any) -> float:
+        expire_time = getattr(cached_content, "expire_time", None)
+        if expire_time is not None and hasattr(expire_time, "timestamp"):
+            return expire_time.timestamp()
+        return time.time() + self.ttl_seconds
+
+    async def _delete(self, name: str) -> bool:
+        try:
+            await self._caches_client().delete(name=name)
+            self.collected += 1
+            return True
+        except Exception as e:
+            logger.debug(f"Failed to delete context cache {name}: {e}")
+            return False
+
+    async def collect_garbage(self) -> int:
+        """
+        Drop expired store rows and delete server-side caches created through
+        this store, no longer tracked and older than gc_grace. Returns the
+        number deleted.
+        """
+        self._last_gc = time.time()
+        await self._store(self.store.delete_expired, self._last_gc)
+        live = await self._store(self.store.live_names)
+        created_before = self._last_gc - self.gc_grace
+
+        deleted = 0
+        try:
+            pager = await self._caches_client().list()
+            orphans = [
+                cache.name
+                async for cache in pager
+                if (cache.display_name or "").startswith(self._display_prefix)
+                and cache.name not in live
+                and self._created_before(cache, created_before)
+            ]
+        except Exception as e:
+            logger.debug(f"Context cache GC skipped: {e}")
+            return 0
+
+        for name in orphans:
+            if await self._delete(name):
+                deleted += 1
+        if deleted:
+            logger.info(f"Garbage-collected {deleted} orphaned context caches")
+        return deleted
+
+    @staticmethod
+    def _created_before(cache: Any, timestamp: float) -> bool:
+        # Without a creation time the cache may still be about to be claimed
+        create_time = getattr(cache, "create_time", None)
+        if create_time is None or not hasattr(create_time, "timestamp"):
+            return False
+        return create_time.timestamp() < timestamp
+
+    def stats(self) -> dict[str, int]:
+        """Hit, miss, create, refresh, error and GC counters."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "creates": self.creates,
+            "refreshes": self.refreshes,
+            "errors": self.errors,
+            "collected": self.collected,
+        }
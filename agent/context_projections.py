@@ -0,0 +1,192 @@
+"""
+Per-format context projections of the portfolio data.
+
+Each A2UI format only needs a slice of portfolio_data.py (video_cards only
+needs the videos, certs only the certifications, ...). The projections below
+are serialized once at import as compact JSON, so building a prompt is a dict
+lookup instead of an f-string over the repr of every structure.
+
+Run this module directly for a per-format token report:
+  python context_projections.py
+"""
+
+import json
+from typing import Any, Iterable, Mapping, Optional
+
+try:
+    from agent import portfolio_data
+except ImportError:
+    import portfolio_data
+
+# Section label -> portfolio data. Labels are what the prompts refer to.
+PORTFOLIO_SECTIONS: dict[str, Any] = {
+    "PROFILE": portfolio_data.PROFILE,
+    "EXPERIENCE": portfolio_data.EXPERIENCE,
+    "PROJECTS": portfolio_data.PROJECTS,
+    "SKILLS": portfolio_data.SKILLS,
+    "CERTIFICATIONS": portfolio_data.CERTIFICATIONS,
+    "RAW_CERTIFICATIONS": portfolio_data._CERTIFICATIONS,
+    "AWARDS": portfolio_data.AWARDS,
+    "RAW_AWARDS": portfolio_data._AWARDS,
+    "PUBLICATIONS": portfolio_data.PUBLICATIONS,
+    "BLOGS": portfolio_data._BLOGS,
+    "VIDEOS": portfolio_data._VIDEOS,
+    "SPEAKING": portfolio_data._SPEAKING,
+    "TESTIMONIALS": portfolio_data.TESTIMONIALS,
+    "GALLERY": portfolio_data._GALLERY,
+    "MATRIX": portfolio_data.MATRIX,
+    "COMICS": portfolio_data.COMICS,
+}
+
+# Sections used by open-ended generation (creative mode and general chat)
+FULL_CONTEXT = "full"
+_ALL_SECTIONS = tuple(PORTFOLIO_SECTIONS)
+
+# Format -> minimal sections it needs
+FORMAT_SECTIONS: dict[str, tuple[str, ...]] = {
+    "flashcards": ("PROFILE", "EXPERIENCE", "PROJECTS", "SKILLS", "CERTIFICATIONS", "AWARDS", "PUBLICATIONS"),
+    "quiz": ("PROFILE", "EXPERIENCE", "PROJECTS", "SKILLS", "CERTIFICATIONS", "AWARDS"),
+    "podcast": ("PROFILE", "EXPERIENCE", "PROJECTS"),
+    "video": ("VIDEOS",),
+    "image": ("PROFILE", "GALLERY"),
+    "timeline": ("EXPERIENCE",),
+    "video_cards": ("VIDEOS",),
+    "blog_cards": ("BLOGS", "PUBLICATIONS", "PROJECTS"),
+    "awards": ("AWARDS", "RAW_AWARDS"),
+    "certs": ("CERTIFICATIONS", "RAW_CERTIFICATIONS"),
+    "speaker": ("SPEAKING",),
+    "testimonials": ("TESTIMONIALS",),
+    "gallery": ("GALLERY",),
+    "creative": _ALL_SECTIONS,
+    "comics": ("COMICS",),
+    FULL_CONTEXT: _ALL_SECTIONS,
+}
+
+
+def _serialize(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+# Fields kept when a section is outlined: enough to name and place each item
+_OUTLINE_FIELDS = ("title", "name", "company", "role", "period", "author", "impact", "description")
+_OUTLINE_CHARS = 60
+
+
+def outline(value: Any) -> Any:
+    """
+    A compact outline of a section's data.
+
+    Records keep only their naming fields (_OUTLINE_FIELDS) when they have
+    any; long strings are cut. An outline tells the model what exists, so it
+    can answer about a section whose full data is not in the prompt.
+    """
+    if isinstance(value, dict):
+        named = {key: item for key, item in value.items() if key in _OUTLINE_FIELDS}
+        return {key: outline(item) for key, item in (named or value).items()}
+    if isinstance(value, list):
+        return [outline(item) for item in value]
+    if isinstance(value, str) and len(value) > _OUTLINE_CHARS:
+        return value[:_OUTLINE_CHARS - 3] + "..."
+    return value
+
+
+def build_projections(sections: Mapping[str, Any]) -> dict[str, str]:
+    """Serialize each format's sections into its context string."""
+    serialized = {label: _serialize(value) for label, value in sections.items()}
+    return {
+        format_type: "\n".join(f"{label}: {serialized[label]}" for label in labels if label in serialized)
+        for format_type, labels in FORMAT_SECTIONS.items()
+    }
+
+
+# Computed once at import
+FORMAT_CONTEXTS: dict[str, str] = build_projections(PORTFOLIO_SECTIONS)
+
+
+def get_format_context(format_type: str, contexts: Mapping[str, str] = FORMAT_CONTEXTS) -> str:
+    """Projected context for a format; unknown formats get the full context."""
+    return contexts.get(format_type, contexts[FULL_CONTEXT])
+
+
+# The prompts in a2ui_templates.py are written for the built-in portfolio
+DEFAULT_OWNER = portfolio_data.PROFILE["name"]
+
+
+class Portfolio:
+    """
+    One portfolio's sections and their format contexts, serialized once.
+
+    The built-in portfolio is DEFAULT_PORTFOLIO; other tenants are loaded from
+    files by tenants.py. An optional SOURCES section ({format: source dict})
+    overrides the source attribution shown with each format.
+    """
+
+    def __init__(self, sections: Mapping[str, Any], tenant_id: str = "default", contexts: Optional[Mapping[str, str]] = None):
+        self.tenant_id = tenant_id
+        self.sections = dict(sections)
+        self.contexts = dict(contexts) if contexts is not None else build_projections(self.sections)
+        self._serialized: dict[str, str] = {}
+        self._outlines: dict[str, str] = {}
+
+    def sections_context(self, labels: Iterable[str]) -> str:
+        """Context with just these sections, in order, each serialized once."""
+        parts = []
+        for label in dict.fromkeys(labels):
+            if label in self.sections:
+                if label not in self._serialized:
+                    self._serialized[label] = _serialize(self.sections[label])
+                parts.append(f"{label}: {self._serialized[label]}")
+        return "\n".join(parts)
+
+    def sections_outline(self, labels: Iterable[str]) -> str:
+        """Like sections_context, with each section reduced to its outline()."""
+        parts = []
+        for label in dict.fromkeys(labels):
+            if label in self.sections:
+                if label not in self._outlines:
+                    self._outlines[label] = _serialize(outline(self.sections[label]))
+                parts.append(f"{label}: {self._outlines[label]}")
+        return "\n".join(parts)
+
+    @property
+    def profile(self) -> dict[str, Any]:
+        return self.sections.get("PROFILE", {})
+
+    @property
+    def owner(self) -> str:
+        return self.profile.get("name") or DEFAULT_OWNER
+
+    def personalize(self, prompt: str) -> str:
+        """Address a prompt written for the built-in portfolio to this owner."""
+        if self.owner == DEFAULT_OWNER:
+            return prompt
+        return prompt.replace(DEFAULT_OWNER, self.owner).replace(DEFAULT_OWNER.split()[0], self.owner.split()[0])
+
+
+DEFAULT_PORTFOLIO = Portfolio({**PORTFOLIO_SECTIONS, "SOURCES": portfolio_data.SOURCES}, contexts=FORMAT_CONTEXTS)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough Gemini token estimate (~4 characters per token)."""
+    return (len(text) + 3) // 4
+
+
+def token_report(contexts: Mapping[str, str] = FORMAT_CONTEXTS) -> dict[str, dict[str, Any]]:
+    """Per-format context size, compared to sending the full context."""
+    full_tokens = estimate_tokens(contexts[FULL_CONTEXT])
+    report = {}
+    for format_type, context in contexts.items():
+        tokens = estimate_tokens(context)
+        report[format_type] = {
+            "sections": list(FORMAT_SECTIONS[format_type]),
+            "chars": len(context),
+            "est_tokens": tokens,
+            "pct_of_full": round(100 * tokens / full_tokens, 1),
+        }
+    return report
+
+
+if __name__ == "__main__":
+    print(f"{'format':<14}{'est_tokens':>12}{'% of full':>11}  sections")
+    for format_type, row in token_report().items():
+        print(f"{format_type:<14}{row['est_tokens']:>12}{row['pct_of_full']:>10}%  {', '.join(row['sections'])}")
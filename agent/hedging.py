@@ -0,0 +1,143 @@
+"""
+Hedged requests for long-tail model latency.
+
+Most Gemini calls finish in a few seconds but a small fraction take several
+times longer. A Hedger runs the call, and if it has not returned after the
+configured percentile of recently observed latency, fires one duplicate. The
+first attempt to succeed wins and the other is cancelled.
+
+Hedges are capped to a fraction of recent calls (`max_hedge_ratio`) so a
+latency spike that affects every call cannot double the quota spent, and no
+hedging happens until enough samples have been seen to estimate the
+percentile.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class LatencyTracker:
+    """Sliding window of recent call latencies."""
+
+    def __init__(self, window: int = 200):
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Nearest-rank percentile of the window, or None if it is empty."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        rank = max(1, math.ceil(pct / 100 * len(ordered)))
+        return ordered[rank - 1]
+
+
+class Hedger:
+    """
+    Run an async call with at most one hedged duplicate.
+
+    Args:
+        percentile: Hedge once a call has been outstanding longer than this
+            percentile of recent latencies.
+        max_hedge_ratio: Maximum fraction of recent calls that may be hedged.
+        min_samples: Latency samples required before hedging starts.
+        min_delay: Never hedge earlier than this many seconds.
+        window: Number of recent calls used for latency and the hedge ratio.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95,
+        max_hedge_ratio: float = 0.1,
+        min_samples: int = 20,
+        min_delay: float = 0.05,
+        window: int = 200,
+    ):
+        self.percentile = percentile
+        self.max_hedge_ratio = max_hedge_ratio
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.latency = LatencyTracker(window)
+        self._recent_hedges: deque[bool] = deque(maxlen=window)
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None while there are too few samples."""
+        if len(self.latency) < self.min_samples:
+            return None
+        return max(self.min_delay, self.latency.percentile(self.percentile))
+
+    def _hedge_allowed(self) -> bool:
+        recent = len(self._recent_hedges) + 1
+        return sum(self._recent_hedges) + 1 <= self.max_hedge_ratio * recent
+
+    async def _timed(self, fn: Callable[[], Awaitable[T]]) -> T:
+        start = time.monotonic()
+        result = await fn()
+        self.latency.record(time.monotonic() - start)
+        return result
+
+    async def run(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """Return the result of fn(), hedging it once if it runs long."""
+        self.calls += 1
+        delay = self.hedge_delay()
+        primary = asyncio.ensure_future(self._timed(fn))
+        if delay is None:
+            self._recent_hedges.append(False)
+            return await primary
+
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done or not self._hedge_allowed():
+                self._recent_hedges.append(False)
+                return await primary
+
+            self._recent_hedges.append(True)
+            self.hedges += 1
+            logger.debug(f"Hedging model call after {delay:.2f}s")
+            hedge = asyncio.ensure_future(self._timed(fn))
+            return await self._first_success(primary, hedge)
+        except BaseException:
+            primary.cancel()
+            raise
+
+    async def _first_success(self, primary: asyncio.Future, hedge: asyncio.Future) -> Any:
+        pending = {primary, hedge}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.hedge_wins += 1
+                        return task.result()
+            # Both failed: surface the original call's error
+            return primary.result()
+        finally:
+            for task in (primary, hedge):
+                if not task.done():
+                    task.cancel()
+
+    def stats(self) -> dict[str, Any]:
+        """Call, hedge and hedge-win counters plus the current hedge delay."""
+        return {
+            "calls": self.calls,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "hedge_delay": self.hedge_delay(),
+        }
@@ -0,0 +1,122 @@
+"""
+Compiled intent router for free-text chat messages.
+
+Every keyword of every intent is compiled once into a single regex whose
+alternation is factored as a trie (e.g. "c(?:ert|redential|omic)"), so the
+message is scanned in one left-to-right pass and each position is matched by
+walking the trie instead of trying every keyword in turn. Routing cost depends
+on the message length, not on how many intents or keywords exist.
+
+Keywords match as substrings of the lowercased message, like the chain of
+`"x" in message_lower` checks this replaces ("cert" matches "certifications").
+Each hit scores a point for its intent. The highest score wins and ties go to
+the intent listed first (highest priority). Confidence is the winner's share
+of all hits.
+
+Run this module directly to route a message from the command line:
+  python intent_router.py "show me your awards"
+"""
+
+import re
+import sys
+from typing import Iterable, Optional
+
+# Canned-answer intent, checked ahead of the explicit "format:topic" prefix
+ADVENT_OF_AGENTS = "advent_of_agents"
+
+# (intent, keywords) in priority order. Intents other than ADVENT_OF_AGENTS
+# are A2UI formats.
+DEFAULT_INTENTS: list[tuple[str, tuple[str, ...]]] = [
+    (ADVENT_OF_AGENTS, ("advent of agents",)),
+    ("awards", ("award", "honor", "trophy")),
+    ("certs", ("cert", "credential", "badge")),
+    ("speaker", ("speak", "keynote")),
+    ("testimonials", ("testimonial", "what people say")),
+    ("blog_cards", ("blog", "article", "medium")),
+    ("video_cards", ("video cards", "video gallery", "youtube gallery")),
+    ("timeline", ("timeline", "career journey", "history")),
+    ("gallery", ("gallery", "portfolio sample")),
+    ("flashcards", ("skill match", "analyze fit", "role fit")),
+    ("comics", ("comic", "secret file", "unlocked")),
+]
+
+
+class Route:
+    """Result of routing a message."""
+
+    __slots__ = ("intent", "confidence", "scores")
+
+    def __init__(self, intent: Optional[str], confidence: float, scores: dict[str, int]):
+        self.intent = intent
+        self.confidence = confidence
+        self.scores = scores
+
+    def __repr__(self) -> str:
+        return f"Route(intent={self.intent!r}, confidence={self.confidence:.2f}, scores={self.scores})"
+
+
+def _trie_pattern(node: dict) -> str:
+    """Regex for a keyword trie; greedy so the longest keyword wins."""
+    branches = [re.escape(char) + _trie_pattern(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ""
+    if len(branches) == 1 and "" not in node:
+        return branches[0]
+    pattern = "(?:" + "|".join(branches) + ")"
+    return pattern + "?" if "" in node else pattern
+
+
+class IntentRouter:
+    """Single-pass keyword router compiled from (intent, keywords) pairs."""
+
+    def __init__(self, intents: Iterable[tuple[str, Iterable[str]]] = DEFAULT_INTENTS):
+        self.priority: dict[str, int] = {}
+        self._keyword_intent: dict[str, str] = {}
+        trie: dict = {}
+
+        for intent, keywords in intents:
+            self.priority.setdefault(intent, len(self.priority))
+            for keyword in keywords:
+                keyword = keyword.lower()
+                # First (highest-priority) intent keeps a shared keyword
+                self._keyword_intent.setdefault(keyword, intent)
+                node = trie
+                for char in keyword:
+                    node = node.setdefault(char, {})
+                node[""] = {}
+
+        self._pattern = re.compile(_trie_pattern(trie)) if trie else None
+
+    def route(self, message: str) -> Route:
+        """Score every intent in one pass over the message."""
+        if self._pattern is None:
+            return Route(None, 0.0, {})
+        hits = self._pattern.findall(message.lower())
+        if not hits:
+            return Route(None, 0.0, {})
+
+        keyword_intent = self._keyword_intent
+        if len(hits) == 1:
+            intent = keyword_intent[hits[0]]
+            return Route(intent, 1.0, {intent: 1})
+
+        scores: dict[str, int] = {}
+        for keyword in hits:
+            intent = keyword_intent[keyword]
+            scores[intent] = scores.get(intent, 0) + 1
+        priority = self.priority
+        intent = min(scores, key=lambda name: (-scores[name], priority[name]))
+        return Route(intent, scores[intent] / len(hits), scores)
+
+
+# Compiled once at import
+DEFAULT_ROUTER = IntentRouter()
+
+
+def route(message: str) -> Route:
+    """Route a message with the default intents."""
+    return DEFAULT_ROUTER.route(message)
+
+
+if __name__ == "__main__":
+    print(route(" ".join(sys.argv[1:])))
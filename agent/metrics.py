@@ -0,0 +1,241 @@
+"""
+Prometheus metrics for request stages and cache layers.
+
+prometheus_client is not a dependency, so the two metric types needed here are
+implemented directly and rendered in the Prometheus text exposition format
+(version 0.0.4) by REGISTRY.render(), which server.py serves on /metrics.
+
+- portfolio_stage_seconds{stage, format}: histogram of time spent in each
+  stage of a generation (context, prompt, context_cache, model, parse, build,
+  render), of whole /generate requests (request) and of OpenStax lookups
+  (openstax_search, openstax_fetch, openstax_parse).
+- portfolio_cache_requests_total{layer, format, result}: cache lookups per
+  layer (response, inflight, context, openstax_module) and result (hit, miss,
+  error).
+- portfolio_stream_cancellations_total{endpoint, reason}: streaming responses
+  (a2a_stream, batch) stopped before completion because the client
+  disconnected or the stream outran its deadline (reason: disconnect,
+  deadline); the generations behind them are cancelled.
+
+Recording is a dict lookup, a bisect and two additions under a lock: about
+2µs per timed stage and 1µs per cache lookup, against model calls measured in
+hundreds of milliseconds (see tests/test_metrics.py). METRICS_ENABLED=false
+turns every call into a no-op.
+"""
+
+import bisect
+import os
+import threading
+import time
+from typing import Iterable
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() != "false"
+
+# Seconds; spans sub-millisecond renders up to slow model calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    """Shared naming and label handling."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _label_text(self, labels: tuple[str, ...], extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, labels)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonic counter with positional label values."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{self._label_text(labels)} {_format_value(value)}" for labels, value in values]
+
+
+class _HistogramSeries:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, buckets: int):
+        self.counts = [0] * buckets
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram with positional label values."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._series: dict[tuple[str, ...], _HistogramSeries] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = _HistogramSeries(len(self.buckets))
+            series.counts[index] += 1
+            series.sum += value
+            series.count += 1
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return series.count if series is not None else 0
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            snapshot = sorted(
+                (labels, list(series.counts), series.sum, series.count)
+                for labels, series in self._series.items()
+            )
+
+        lines = []
+        for labels, counts, total, count in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{self._label_text(labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._label_text(labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{self._label_text(labels)} {count}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Duplicate metric: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "portfolio_stage_seconds",
+    "Time spent in each stage of content generation.",
+    ("stage", "format"),
+))
+
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "portfolio_cache_requests_total",
+    "Cache lookups by cache layer and result.",
+    ("layer", "format", "result"),
+))
+
+
+STREAM_CANCELLATIONS = REGISTRY.register(Counter(
+    "portfolio_stream_cancellations_total",
+    "Streams cancelled before completion, by endpoint and reason.",
+    ("endpoint", "reason"),
+))
+
+
+class _Stage:
+    """Context manager that records its duration in STAGE_SECONDS."""
+
+    __slots__ = ("stage", "format_type", "start")
+
+    def __init__(self, stage: str, format_type: str):
+        self.stage = stage
+        self.format_type = format_type
+
+    def __enter__(self) -> "_Stage":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        STAGE_SECONDS.observe(time.perf_counter() - self.start, self.stage, self.format_type)
+
+
+class _NoopStage:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopStage":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+_NOOP_STAGE = _NoopStage()
+
+
+def stage(name: str, format_type: str = "") -> "_Stage | _NoopStage":
+    """Time a block as one stage: `with stage("model", "quiz"): ...`."""
+    if not METRICS_ENABLED:
+        return _NOOP_STAGE
+    return _Stage(name, format_type)
+
+
+def record_cache(layer: str, format_type: str, result: str) -> None:
+    """Count one lookup in a cache layer ("hit", "miss" or "error")."""
+    if METRICS_ENABLED:
+        CACHE_REQUESTS.inc(layer, format_type, result)
+
+
+def record_stream_cancel(endpoint: str, reason: str) -> None:
+    """Count a stream cancelled for a client disconnect or its deadline."""
+    if METRICS_ENABLED:
+        STREAM_CANCELLATIONS.inc(endpoint, reason)
@@ -0,0 +1,425 @@
+"""
+Pluggable model backends.
+
+Everything that calls Gemini (agent.py, openstax_content.py, app.py) gets its
+client from create_client(). MODEL_BACKEND selects the implementation:
+
+- "gemini" (default): the google-genai client, on Vertex AI when
+  GOOGLE_GENAI_USE_VERTEXAI and GOOGLE_CLOUD_PROJECT are set.
+- "local": LocalGeminiClient, an in-process stand-in with the same
+  `client.aio.models` / `client.aio.caches` / `client.models` surface. It
+  needs no network or credentials, so the server can be load-tested and
+  profiled in CI or on a laptop.
+
+The stand-in answers with a replayed response when LOCAL_MODEL_REPLAY names a
+JSON file of {"prompt substring": response text or [texts...]}, else with
+content synthesized from the request's response_schema, so every format
+parses and assembles like a real generation. Latency, streaming chunk timing,
+server errors and 429s are configurable and reproducible with a seed. Usage
+metadata estimates prompt tokens from the contents, the system instruction and
+the cached content, so prompt growth shows up in token baselines:
+
+  MODEL_BACKEND=local
+  LOCAL_MODEL_LATENCY=lognormal:0.8,0.4   # fixed:S | uniform:LO,HI | lognormal:MEDIAN,SIGMA | bimodal:FAST,SLOW,TAIL
+  LOCAL_MODEL_CHUNK_CHARS=64
+  LOCAL_MODEL_CHUNK_INTERVAL=0.02
+  LOCAL_MODEL_ERROR_RATE=0.01
+  LOCAL_MODEL_QUOTA_RATE=0.02
+  LOCAL_MODEL_SEED=7
+"""
+
+import asyncio
+import datetime
+import json
+import logging
+import math
+import os
+import random
+import threading
+import time
+import uuid
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Iterator, Optional
+
+# Imported on first use, so importing the server does not pay for the SDK
+if TYPE_CHECKING:
+    from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+MODEL_BACKEND = os.getenv("MODEL_BACKEND", "gemini").lower()
+BACKENDS = ("gemini", "local")
+
+LatencySampler = Callable[[random.Random], float]
+
+
+def parse_latency(spec: str) -> LatencySampler:
+    """
+    Parse a latency distribution such as "lognormal:0.8,0.4" into a sampler.
+
+    fixed:S, uniform:LO,HI, lognormal:MEDIAN,SIGMA and bimodal:FAST,SLOW,TAIL
+    (FAST +/-50% latency, SLOW for a TAIL fraction of calls). Seconds.
+    """
+    kind, _, params = spec.partition(":")
+    try:
+        args = [float(p) for p in params.split(",")] if params else []
+        if kind == "fixed" and len(args) == 1:
+            return lambda rng: args[0]
+        if kind == "uniform" and len(args) == 2:
+            return lambda rng: rng.uniform(args[0], args[1])
+        if kind == "lognormal" and len(args) == 2:
+            mu = math.log(args[0]) if args[0] > 0 else 0.0
+            return lambda rng: rng.lognormvariate(mu, args[1]) if args[0] > 0 else 0.0
+        if kind == "bimodal" and len(args) == 3:
+            fast, slow, tail = args
+            return lambda rng: slow if rng.random() < tail else fast * rng.uniform(0.5, 1.5)
+    except ValueError:
+        pass
+    raise ValueError(f"Invalid latency distribution: {spec!r}")
+
+
+class LocalModelConfig:
+    """Behaviour of the local stand-in; from_env() reads the LOCAL_MODEL_* settings."""
+
+    def __init__(
+        self,
+        latency: str = "lognormal:0.8,0.4",
+        chunk_chars: int = 64,
+        chunk_interval: float = 0.02,
+        error_rate: float = 0.0,
+        quota_rate: float = 0.0,
+        replay: Optional[dict[str, Any]] = None,
+        seed: Optional[int] = None,
+    ):
+        self.latency = parse_latency(latency)
+        self.chunk_chars = max(1, chunk_chars)
+        self.chunk_interval = chunk_interval
+        self.error_rate = error_rate
+        self.quota_rate = quota_rate
+        self.replay = replay or {}
+        self.seed = seed
+
+    @classmethod
+    def from_env(cls) -> "LocalModelConfig":
+        replay = None
+        replay_path = os.getenv("LOCAL_MODEL_REPLAY", "")
+        if replay_path:
+            with open(replay_path) as f:
+                replay = json.load(f)
+        seed = os.getenv("LOCAL_MODEL_SEED", "")
+        return cls(
+            latency=os.getenv("LOCAL_MODEL_LATENCY", "lognormal:0.8,0.4"),
+            chunk_chars=int(os.getenv("LOCAL_MODEL_CHUNK_CHARS", "64")),
+            chunk_interval=float(os.getenv("LOCAL_MODEL_CHUNK_INTERVAL", "0.02")),
+            error_rate=float(os.getenv("LOCAL_MODEL_ERROR_RATE", "0")),
+            quota_rate=float(os.getenv("LOCAL_MODEL_QUOTA_RATE", "0")),
+            replay=replay,
+            seed=int(seed) if seed else None,
+        )
+
+
+# =============================================================================
+# Canned responses
+# =============================================================================
+
+def synthesize(schema: Any, key: str = "value", index: int = 0) -> Any:
+    """Deterministic instance of a response schema (dict or types.Schema)."""
+    if hasattr(schema, "model_dump"):
+        schema = schema.model_dump(mode="json", exclude_none=True)
+    schema_type = str(schema.get("type", "string")).lower()
+    if schema.get("enum"):
+        return schema["enum"][0]
+    if schema_type == "object":
+        return {name: synthesize(sub, name, index) for name, sub in schema.get("properties", {}).items()}
+    if schema_type == "array":
+        return [synthesize(schema.get("items", {}), key, i) for i in range(3)]
+    if schema_type == "boolean":
+        return index == 0
+    if schema_type in ("integer", "number"):
+        return index + 1
+    return f"Sample {key} {index + 1}"
+
+
+def _prompt_text(contents: Any) -> str:
+    """Flatten request contents (str, Content, Part or lists of them) to text."""
+    if contents is None:
+        return ""
+    if isinstance(contents, str):
+        return contents
+    if isinstance(contents, (list, tuple)):
+        return "\n".join(_prompt_text(item) for item in contents)
+    parts = getattr(contents, "parts", None)
+    if parts is not None:
+        return "\n".join(_prompt_text(part) for part in parts)
+    return getattr(contents, "text", None) or ""
+
+
+def _tokens(text: str) -> int:
+    # Roughly four characters per token, like the Gemini tokenizer on English
+    return len(text) // 4 + 1 if text else 0
+
+
+def _response(text: str, usage: tuple[int, int]) -> "types.GenerateContentResponse":
+    from google.genai import types
+
+    # Like Gemini, the prompt count includes the cached tokens
+    prompt_tokens, cached_tokens = usage
+    output_tokens = _tokens(text) or 1
+    return types.GenerateContentResponse(
+        candidates=[types.Candidate(
+            content=types.Content(role="model", parts=[types.Part.from_text(text=text)]),
+            finish_reason=types.FinishReason.STOP,
+        )],
+        usage_metadata=types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=prompt_tokens,
+            cached_content_token_count=cached_tokens or None,
+            candidates_token_count=output_tokens,
+            total_token_count=prompt_tokens + output_tokens,
+        ),
+    )
+
+
+# =============================================================================
+# Local stand-in
+# =============================================================================
+
+class _Behaviour:
+    """Shared response, latency and failure logic for the sync and async APIs."""
+
+    def __init__(self, config: LocalModelConfig):
+        self.config = config
+        self._rng = random.Random(config.seed)
+        self._lock = threading.Lock()
+        self._replay_cursor: dict[str, int] = {}
+        # System instruction of each live context cache, counted as prompt tokens
+        self.cached_instructions: dict[str, str] = {}
+        self.calls = 0
+
+    def usage(self, prompt: str, config: Any) -> tuple[int, int]:
+        """Prompt and cached token counts for the contents, system instruction and cache."""
+        system = _prompt_text(getattr(config, "system_instruction", None))
+        cached = self.cached_instructions.get(getattr(config, "cached_content", None) or "", "")
+        cached_tokens = _tokens(cached)
+        return cached_tokens + _tokens(system) + (_tokens(prompt) or 1), cached_tokens
+
+    def plan(self, contents: Any, config: Any) -> tuple[float, str, tuple[int, int], Optional[Exception]]:
+        """Latency, response text, token usage and the error to raise, if any."""
+        from google.genai import errors
+
+        prompt = _prompt_text(contents)
+        usage = self.usage(prompt, config)
+        with self._lock:
+            self.calls += 1
+            latency = max(0.0, self.config.latency(self._rng))
+            roll = self._rng.random()
+
+        if roll < self.config.quota_rate:
+            error = errors.ClientError(429, {"error": {"code": 429, "message": "Resource exhausted (local stand-in)", "status": "RESOURCE_EXHAUSTED"}})
+            return latency, "", usage, error
+        if roll < self.config.quota_rate + self.config.error_rate:
+            error = errors.ServerError(503, {"error": {"code": 503, "message": "Service unavailable (local stand-in)", "status": "UNAVAILABLE"}})
+            return latency, "", usage, error
+        return latency, self.respond(prompt, config), usage, None
+
+    def respond(self, prompt: str, config: Any) -> str:
+        for pattern, replies in self.config.replay.items():
+            if pattern == "*" or pattern in prompt:
+                if isinstance(replies, list):
+                    with self._lock:
+                        cursor = self._replay_cursor.get(pattern, 0)
+                        self._replay_cursor[pattern] = cursor + 1
+                    return replies[cursor % len(replies)]
+                return replies
+
+        schema = getattr(config, "response_schema", None)
+        if schema is not None:
+            return json.dumps(synthesize(schema))
+        if getattr(config, "response_mime_type", None) == "application/json":
+            return "[]"
+        return "This is a response from the local model stand-in."
+
+    def chunks(self, text: str) -> list[str]:
+        size = self.config.chunk_chars
+        return [text[i:i + size] for i in range(0, len(text), size)] or [""]
+
+    def total_latency(self, latency: float, text: str) -> float:
+        """A non-streamed call waits for the whole stream."""
+        return latency + (len(self.chunks(text)) - 1) * self.config.chunk_interval
+
+
+class _AsyncModels:
+    def __init__(self, behaviour: _Behaviour):
+        self._behaviour = behaviour
+
+    async def generate_content(self, *, model: str, contents: Any, config: Any = None) -> "types.GenerateContentResponse":
+        latency, text, usage, error = self._behaviour.plan(contents, config)
+        await asyncio.sleep(self._behaviour.total_latency(latency, text))
+        if error is not None:
+            raise error
+        return _response(text, usage)
+
+    async def generate_content_stream(self, *, model: str, contents: Any, config: Any = None) -> AsyncIterator["types.GenerateContentResponse"]:
+        # Errors surface when the stream is opened, after time to first token
+        latency, text, usage, error = self._behaviour.plan(contents, config)
+        await asyncio.sleep(latency)
+        if error is not None:
+            raise error
+
+        behaviour = self._behaviour
+
+        async def stream() -> AsyncIterator["types.GenerateContentResponse"]:
+            for i, chunk in enumerate(behaviour.chunks(text)):
+                if i:
+                    await asyncio.sleep(behaviour.config.chunk_interval)
+                yield _response(chunk, usage)
+
+        return stream()
+
+
+class _Models:
+    def __init__(self, behaviour: _Behaviour):
+        self._behaviour = behaviour
+
+    def generate_content(self, *, model: str, contents: Any, config: Any = None) -> "types.GenerateContentResponse":
+        latency, text, usage, error = self._behaviour.plan(contents, config)
+        time.sleep(self._behaviour.total_latency(latency, text))
+        if error is not None:
+            raise error
+        return _response(text, usage)
+
+    def generate_content_stream(self, *, model: str, contents: Any, config: Any = None) -> Iterator["types.GenerateContentResponse"]:
+        latency, text, usage, error = self._behaviour.plan(contents, config)
+        time.sleep(latency)
+        if error is not None:
+            raise error
+        for i, chunk in enumerate(self._behaviour.chunks(text)):
+            if i:
+                time.sleep(self._behaviour.config.chunk_interval)
+            yield _response(chunk, usage)
+
+
+class _AsyncCaches:
+    """In-memory context caches with the same create/update/delete/list calls."""
+
+    def __init__(self, behaviour: _Behaviour):
+        self._behaviour = behaviour
+        self._caches: dict[str, "types.CachedContent"] = {}
+
+    @staticmethod
+    def _expire_time(ttl: Optional[str]) -> datetime.datetime:
+        seconds = float((ttl or "3600s").rstrip("s"))
+        return datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=seconds)
+
+    async def create(self, *, model: str, config: Any = None) -> "types.CachedContent":
+        from google.genai import types
+
+        name = f"cachedContents/local-{uuid.uuid4().hex[:12]}"
+        cache = types.CachedContent(
+            name=name,
+            model=model,
+            display_name=getattr(config, "display_name", None),
+            create_time=datetime.datetime.now(datetime.timezone.utc),
+            expire_time=self._expire_time(getattr(config, "ttl", None)),
+        )
+        self._caches[name] = cache
+        self._behaviour.cached_instructions[name] = _prompt_text(getattr(config, "system_instruction", None))
+        return cache
+
+    async def update(self, *, name: str, config: Any = None) -> "types.CachedContent":
+        if name not in self._caches:
+            from google.genai import errors
+            raise errors.ClientError(404, {"error": {"code": 404, "message": f"{name} not found", "status": "NOT_FOUND"}})
+        cache = self._caches[name].model_copy(update={"expire_time": self._expire_time(getattr(config, "ttl", None))})
+        self._caches[name] = cache
+        return cache
+
+    async def delete(self, *, name: str, config: Any = None) -> None:
+        self._caches.pop(name, None)
+        self._behaviour.cached_instructions.pop(name, None)
+
+    async def list(self, *, config: Any = None) -> AsyncIterator["types.CachedContent"]:
+        async def pager() -> AsyncIterator["types.CachedContent"]:
+            for cache in list(self._caches.values()):
+                yield cache
+
+        return pager()
+
+
+class _Aio:
+    def __init__(self, behaviour: _Behaviour):
+        self.models = _AsyncModels(behaviour)
+        self.caches = _AsyncCaches(behaviour)
+
+
+class LocalGeminiClient:
+    """Offline stand-in for genai.Client (see module docstring)."""
+
+    def __init__(self, config: Optional[LocalModelConfig] = None):
+        self.config = config or LocalModelConfig.from_env()
+        self._behaviour = _Behaviour(self.config)
+        self.aio = _Aio(self._behaviour)
+        self.models = _Models(self._behaviour)
+
+    @property
+    def calls(self) -> int:
+        """Model calls made so far, including failed ones."""
+        return self._behaviour.calls
+
+
+# =============================================================================
+# Factories
+# =============================================================================
+
+def __getattr__(name: str) -> Any:
+    # `model_backend.genai` stays available (and patchable) without an eager import
+    if name == "genai":
+        from google import genai
+        return genai
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def create_client(backend: Optional[str] = None) -> Any:
+    """A model client for the configured backend."""
+    backend = (backend or MODEL_BACKEND).lower()
+    if backend == "local":
+        logger.info("Using the local model stand-in (MODEL_BACKEND=local)")
+        return LocalGeminiClient()
+    if backend != "gemini":
+        raise ValueError(f"Unknown MODEL_BACKEND {backend!r}; expected one of {BACKENDS}")
+
+    from google import genai
+
+    # Use Vertex AI if configured, else default to Gemini API
+    use_vertex = os.getenv("GOOGLE_GENAI_USE_VERTEXAI", "TRUE").upper() == "TRUE"
+    project = os.getenv("GOOGLE_CLOUD_PROJECT")
+    location = os.getenv("GOOGLE_CLOUD_LOCATION", "us-central1")
+    if use_vertex and project:
+        return genai.Client(vertexai=True, project=project, location=location)
+    return genai.Client()
+
+
+def create_adk_model(model_id: str, backend: Optional[str] = None) -> Any:
+    """
+    The `model` for an ADK Agent: the model name for Gemini, or a BaseLlm
+    backed by LocalGeminiClient for the local backend.
+    """
+    if (backend or MODEL_BACKEND).lower() != "local":
+        return model_id
+
+    from google.adk.models import BaseLlm, LlmResponse
+
+    client = LocalGeminiClient()
+
+    class LocalLlm(BaseLlm):
+        async def generate_content_async(self, llm_request, stream: bool = False):
+            if stream:
+                async for chunk in await client.aio.models.generate_content_stream(
+                    model=self.model, contents=llm_request.contents, config=llm_request.config
+                ):
+                    yield LlmResponse.create(chunk)
+                return
+            response = await client.aio.models.generate_content(
+                model=self.model, contents=llm_request.contents, config=llm_request.config
+            )
+            yield LlmResponse.create(response)
+
+    return LocalLlm(model=model_id)
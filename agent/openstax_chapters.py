@@ -202,13 +202,13 @@ OPENSTAX_CHAPTERS = {
     "38-4-preserving-biodiversity": "Preserving Biodiversity",
 }
 
-# Build a formatted string for LLM context
+# Formatted once for LLM context
+_CHAPTER_LIST_FOR_LLM = "\n".join(f"- {slug}: {title}" for slug, title in OPENSTAX_CHAPTERS.items())
+
+
 def get_chapter_list_for_llm() -> str:
     """Return a formatted list of all chapters for LLM context."""
-    lines = []
-    for slug, title in OPENSTAX_CHAPTERS.items():
-        lines.append(f"- {slug}: {title}")
-    return "\n".join(lines)
+    return _CHAPTER_LIST_FOR_LLM
 
 
 # Pre-computed keyword hints for faster matching (optional optimization)
@@ -18,6 +18,11 @@ import xml.etree.ElementTree as ET
 from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Tuple
 
+try:
+    from agent.metrics import record_cache, stage
+except ImportError:
+    from metrics import record_cache, stage
+
 logger = logging.getLogger(__name__)
 
 # GCS configuration
@@ -219,19 +224,21 @@ def fetch_module_content(module_id: str, parse: bool = True) -> Optional[str]:
     Returns:
         Module content as text, or None if not found.
     """
-    # Try GCS first
-    content = fetch_module_from_gcs(module_id)
+    with stage("openstax_fetch"):
+        # Try GCS first
+        content = fetch_module_from_gcs(module_id)
 
-    # Fall back to GitHub
-    if content is None:
-        content = fetch_module_from_github(module_id)
+        # Fall back to GitHub
+        if content is None:
+            content = fetch_module_from_github(module_id)
 
     if content is None:
         return None
 
     # Parse if requested
     if parse:
-        return parse_cnxml_to_text(content)
+        with stage("openstax_parse"):
+            return parse_cnxml_to_text(content)
 
     return content
 
@@ -257,9 +264,11 @@ def fetch_module_content_cached(module_id: str, parse: bool = True) -> Optional[
         content, cached_at = _MODULE_CACHE[cache_key]
         if now - cached_at < _MODULE_CACHE_TTL:
             logger.debug(f"Cache hit for module {module_id}")
+            record_cache("openstax_module", "", "hit")
             return content
 
     # Cache miss - fetch fresh
+    record_cache("openstax_module", "", "miss")
     content = fetch_module_content(module_id, parse)
     if content:
         _MODULE_CACHE[cache_key] = (content, now)
@@ -403,7 +412,8 @@ async def fetch_modules_for_topic(topic: str, max_modules: int = 3) -> dict:
 
     # Search for matching modules using keyword matching
     logger.info("Step 1: Searching for modules using keyword matching...")
-    matched_modules = search_modules(topic, max_results=max_modules)
+    with stage("openstax_search"):
+        matched_modules = search_modules(topic, max_results=max_modules)
     logger.info(f"Keyword matching found {len(matched_modules)} modules: {[m.get('id', m.get('title', 'unknown')) for m in matched_modules]}")
 
     if not matched_modules:
@@ -533,20 +543,15 @@ async def _llm_match_topic_to_chapters(topic: str, max_chapters: int = 3) -> lis
     Returns list of chapter slugs.
     """
     from .openstax_chapters import get_chapter_list_for_llm
+    from .admission import get_admission_controller, is_quota_error
+    from .model_backend import create_client
 
     try:
-        from google import genai
         from google.genai import types
 
-        project = os.getenv("GOOGLE_CLOUD_PROJECT")
-        location = os.getenv("GOOGLE_CLOUD_LOCATION", "us-central1")
         model = os.getenv("GENAI_MODEL", "gemini-3-flash")
 
-        client = genai.Client(
-            vertexai=True,
-            project=project,
-            location=location,
-        )
+        client = create_client()
 
         chapter_list = get_chapter_list_for_llm()
 
@@ -563,13 +568,21 @@ Return ONLY a JSON array of chapter slugs (the part before the colon), nothing e
 Example: ["6-4-atp-adenosine-triphosphate", "7-1-energy-in-living-systems"]
 """
 
-        response = client.models.generate_content(
-            model=model,
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                response_mime_type="application/json",
-            ),
-        )
+        # Shares the model's concurrency and quota budget with the portfolio agent
+        admission = get_admission_controller(model)
+        async with admission.admit():
+            try:
+                response = await client.aio.models.generate_content(
+                    model=model,
+                    contents=prompt,
+                    config=types.GenerateContentConfig(
+                        response_mime_type="application/json",
+                    ),
+                )
+            except Exception as e:
+                if is_quota_error(e):
+                    raise admission.note_throttled() from e
+                raise
 
         # Parse the response
         slugs = json.loads(response.text.strip())
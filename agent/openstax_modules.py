@@ -1520,6 +1520,20 @@ KEYWORD_TO_MODULES = {
     "sustainability": ["m63051"],
 }
 
+# Compiled once at import (and shared copy-on-write by pre-forked workers, see
+# prefork.py). Single-word keywords match on word boundaries so "stem" does not
+# match inside "system"; multi-word keywords match as substrings.
+_KEYWORD_MATCHERS = [
+    (keyword, module_ids, None if " " in keyword else re.compile(r"\b" + re.escape(keyword) + r"\b"))
+    for keyword, module_ids in KEYWORD_TO_MODULES.items()
+]
+_WORD = re.compile(r"\b\w+\b")
+# Words of each module's title and chapter, for the title-search fallback
+_MODULE_WORDS = {
+    module_id: frozenset(_WORD.findall(info["title"].lower())) | frozenset(_WORD.findall(info["chapter"].lower()))
+    for module_id, info in MODULE_INDEX.items()
+}
+
 
 def get_module_url(module_id: str) -> str:
     """
@@ -1575,22 +1589,11 @@ def search_modules(topic: str, max_results: int = 3) -> list[dict]:
     matched_ids = set()
     matched_keywords = []  # Track which keywords matched for debugging
 
-    # First, check direct keyword matches using word boundaries
-    # to avoid matching "stem" inside "system"
-    for keyword, module_ids in KEYWORD_TO_MODULES.items():
-        # Use word boundary matching for single-word keywords
-        # For multi-word keywords, require exact substring match
-        if ' ' in keyword:
-            # Multi-word keyword - exact substring match is fine
-            if keyword in topic_lower:
-                matched_ids.update(module_ids)
-                matched_keywords.append(keyword)
-        else:
-            # Single-word keyword - require word boundaries
-            pattern = r'\b' + re.escape(keyword) + r'\b'
-            if re.search(pattern, topic_lower):
-                matched_ids.update(module_ids)
-                matched_keywords.append(keyword)
+    # First, check direct keyword matches
+    for keyword, module_ids, pattern in _KEYWORD_MATCHERS:
+        if (keyword in topic_lower) if pattern is None else pattern.search(topic_lower):
+            matched_ids.update(module_ids)
+            matched_keywords.append(keyword)
 
     if matched_keywords:
         logger.info(f"KEYWORD MATCHES FOUND: {matched_keywords}")
@@ -1600,16 +1603,10 @@ def search_modules(topic: str, max_results: int = 3) -> list[dict]:
 
     # If no keyword matches, search titles
     if not matched_ids:
-        for module_id, info in MODULE_INDEX.items():
-            title_lower = info["title"].lower()
-            chapter_lower = info["chapter"].lower()
-
-            # Check if any word from topic is in title or chapter
-            topic_words = set(re.findall(r'\b\w+\b', topic_lower))
-            title_words = set(re.findall(r'\b\w+\b', title_lower))
-            chapter_words = set(re.findall(r'\b\w+\b', chapter_lower))
-
-            if topic_words & title_words or topic_words & chapter_words:
+        # Any word from the topic in the title or chapter
+        topic_words = set(_WORD.findall(topic_lower))
+        for module_id, words in _MODULE_WORDS.items():
+            if topic_words & words:
                 matched_ids.add(module_id)
 
         if matched_ids:
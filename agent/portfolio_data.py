@@ -387,3 +387,12 @@ COMICS = [
         "url": "https://enriquekchan.web.app/agent_adventures_part_4.pdf"
     }
 ]
+
+# Source attribution shown with each format (see LearningMaterialAgent._source_for)
+SOURCES = {
+    "video_cards": {"provider": "YouTube", "url": PROFILE["links"]["youtube"], "title": "@enriquekchan"},
+    "blog_cards": {"provider": "Medium", "url": PROFILE["links"]["medium"], "title": "Insight Stream"},
+    "certs": {"provider": "Credly / Google", "url": "https://www.credential.net/profile/enriquekchan", "title": "Cloud Certifications"},
+    "speaker": {"provider": "Google Cloud Next", "url": "https://cloud.withgoogle.com/next", "title": "Speaking Engagements"},
+    "awards": {"provider": "LinkedIn", "url": "https://www.linkedin.com/in/enriquechan/details/honors/", "title": "Trophy Room"},
+}
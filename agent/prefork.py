@@ -0,0 +1,174 @@
+"""
+Pre-fork serving entry point.
+
+`uvicorn server:app --workers N` spawns fresh interpreters, so every worker
+re-imports the portfolio data, OpenStax tables and prompt projections and
+builds its own copies. Here the parent does that once and forks the workers:
+
+1. With the garbage collector disabled (so freed objects leave no holes in
+   the pages about to be shared), import the server and everything static it
+   serves: portfolio data and its serialized projections, A2UI templates,
+   schemas and validators, the intent router, the google-genai SDK and the
+   OpenStax module and chapter indexes with their precompiled keyword patterns.
+2. gc.freeze() moves all of it to the permanent generation, so collections in
+   the workers never write to those objects and their pages stay shared
+   copy-on-write.
+3. Bind the listening socket and fork WEB_CONCURRENCY workers that accept on
+   it. The parent never builds an agent: genai clients, SQLite connections and
+   Redis sockets are created in each worker after the fork, before it starts
+   accepting, so the first request does not pay for them either.
+
+The parent restarts workers that exit unexpectedly and forwards SIGTERM and
+SIGINT to the workers for a graceful shutdown.
+
+Usage:
+    python prefork.py --workers 4 --port 8080
+"""
+
+import argparse
+import gc
+import logging
+import os
+import random
+import signal
+import sys
+import time
+from typing import Optional
+
+import uvicorn
+
+logger = logging.getLogger(__name__)
+
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+
+# A worker that dies sooner than this after starting is restarted after a pause
+_RESTART_BACKOFF = 1.0
+
+
+def preload():
+    """Import and build the static tables workers share; returns the ASGI app."""
+    try:
+        from agent import openstax_chapters, openstax_content, openstax_modules  # noqa: F401
+        from agent.server import app
+    except ImportError:
+        import openstax_chapters, openstax_content, openstax_modules  # noqa: F401,E401
+        from server import app
+
+    # Deferred on a cold `import server` (see tests/test_import_time.py), but
+    # every worker needs it for its first generation
+    import google.genai.types  # noqa: F401
+
+    openstax_chapters.get_chapter_list_for_llm()
+    return app
+
+
+def _init_worker() -> None:
+    """Per-worker setup after the fork, before accepting requests."""
+    # The supervisor's handlers must not run in a worker; uvicorn installs its own
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, signal.SIG_DFL)
+    gc.enable()
+    # Each worker gets its own random stream (sampling, jitter, stand-in latency)
+    random.seed()
+
+    try:
+        from agent.agent import get_agent
+    except ImportError:
+        from agent import get_agent
+    try:
+        get_agent()._get_client()
+    except Exception as e:
+        # Left to the first request to retry (and report)
+        logger.warning(f"Worker {os.getpid()} could not create the model client: {e}")
+
+
+def _run_worker(config: uvicorn.Config, sock) -> None:
+    _init_worker()
+    try:
+        uvicorn.Server(config).run(sockets=[sock])
+    finally:
+        os._exit(0)
+
+
+class Supervisor:
+    """Forks the workers and keeps WEB_CONCURRENCY of them running."""
+
+    def __init__(self, config: uvicorn.Config, workers: int):
+        self.config = config
+        self.workers = max(1, workers)
+        self.sock = config.bind_socket()
+        self.children: dict[int, float] = {}
+        self.stopping = False
+
+    def spawn(self) -> int:
+        pid = os.fork()
+        if pid == 0:
+            _run_worker(self.config, self.sock)
+        self.children[pid] = time.monotonic()
+        logger.info(f"Started worker {pid}")
+        return pid
+
+    def stop(self, signum: int, frame=None) -> None:
+        self.stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self) -> int:
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for _ in range(self.workers):
+            self.spawn()
+
+        status = 0
+        while self.children:
+            try:
+                pid, code = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+            started = self.children.pop(pid, None)
+            if started is None:
+                continue
+            if self.stopping:
+                continue
+            status = os.waitstatus_to_exitcode(code)
+            logger.warning(f"Worker {pid} exited with {status}; restarting")
+            if time.monotonic() - started < _RESTART_BACKOFF:
+                time.sleep(_RESTART_BACKOFF)
+            if not self.stopping:
+                self.spawn()
+
+        self.sock.close()
+        logger.info("All workers stopped")
+        return 0 if self.stopping else status
+
+
+def serve(host: str = "0.0.0.0", port: int = 8080, workers: int = WEB_CONCURRENCY, log_level: Optional[str] = "info") -> int:
+    """Preload in this process, then fork and supervise the workers."""
+    # Objects created and freed while importing would leave holes in pages the
+    # workers share; nothing here is garbage worth collecting.
+    gc.disable()
+    app = preload()
+    config = uvicorn.Config(app, host=host, port=port, log_level=log_level, lifespan="on")
+    supervisor = Supervisor(config, workers)
+    gc.freeze()
+    logger.info(f"Preloaded {gc.get_freeze_count()} objects; forking {supervisor.workers} workers on {host}:{port}")
+    return supervisor.run()
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve the portfolio agent from pre-forked workers")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8080")))
+    parser.add_argument("--workers", type=int, default=WEB_CONCURRENCY)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args(argv)
+    return serve(args.host, args.port, args.workers, args.log_level)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
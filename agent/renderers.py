@@ -0,0 +1,135 @@
+"""
+Deterministic A2UI renderers for data-backed formats.
+
+Formats such as certs, awards or timeline only restyle structured data that
+already lives in portfolio_data.py. These renderers project that data into the
+same compact content the model would write and assemble it with a2ui_builder,
+in well under a millisecond and without a model call.
+
+Generative formats (flashcards, quiz, creative, ...) still go through the LLM.
+"""
+
+from typing import Any, Callable, Mapping
+
+try:
+    from agent.a2ui_builder import build
+    from agent.context_projections import PORTFOLIO_SECTIONS
+except ImportError:
+    from a2ui_builder import build
+    from context_projections import PORTFOLIO_SECTIONS
+
+RENDER_MODE_DETERMINISTIC = "deterministic"
+RENDER_MODE_LLM = "llm"
+RENDER_MODES = (RENDER_MODE_DETERMINISTIC, RENDER_MODE_LLM)
+
+
+# =============================================================================
+# Format renderers
+# =============================================================================
+
+def render_timeline(data: Mapping[str, Any]) -> list[dict[str, Any]]:
+    return build("timeline", data.get("EXPERIENCE", []))
+
+
+def render_video_cards(data: Mapping[str, Any]) -> list[dict[str, Any]]:
+    videos = [{**video, "image": video.get("thumbnail", "")} for video in data.get("VIDEOS", [])[:4]]
+    return build("video_cards", videos)
+
+
+def render_blog_cards(data: Mapping[str, Any]) -> list[dict[str, Any]]:
+    # The whitepaper and Advent of Agents always lead, followed by the blogs
+    featured = []
+    for publication in data.get("PUBLICATIONS", []):
+        featured.append({**publication, "description": publication.get("impact", "")})
+    for project in data.get("PROJECTS", []):
+        if "adventofagents" in project.get("url", ""):
+            featured.append(project)
+    return build("blog_cards", (featured + list(data.get("BLOGS", [])))[:6])
+
+
+def render_awards(data: Mapping[str, Any]) -> list[dict[str, Any]]:
+    return build("awards", data.get("RAW_AWARDS", []))
+
+
+def _cert_provider(title: str) -> str:
+    if title.startswith("Google Cloud"):
+        return "Google Cloud"
+    if title.startswith("AWS"):
+        return "AWS"
+    if "Azure" in title:
+        return "Microsoft Azure"
+    return ""
+
+
+def render_certs(data: Mapping[str, Any]) -> list[dict[str, Any]]:
+    # Every certification gets its own card. The detailed entries provide
+    # descriptions where titles match and credential links per provider.
+    details = {c["title"]: c for c in data.get("RAW_CERTIFICATIONS", [])}
+    provider_urls = {}
+    for detail in details.values():
+        provider_urls.setdefault(_cert_provider(detail["title"]), detail.get("url", ""))
+    fallback_url = data.get("PROFILE", {}).get("links", {}).get("linkedin", "")
+
+    items = []
+    for title in data.get("CERTIFICATIONS", []):
+        provider = _cert_provider(title)
+        detail = details.get(title, {})
+        items.append({
+            "title": title,
+            "description": detail.get("description") or f"{provider or 'Professional'} certification.",
+            "image": "/assets/certs.png",
+            "url": detail.get("url") or provider_urls.get(provider) or fallback_url,
+        })
+    return build("certs", items)
+
+
+def render_speaker(data: Mapping[str, Any]) -> list[dict[str, Any]]:
+    talks = [
+        {"front": talk.get("title", ""), "back": talk.get("description", ""), "category": "Speaking Engagement"}
+        for talk in data.get("SPEAKING", [])
+    ]
+    return build("speaker", talks)
+
+
+def render_testimonials(data: Mapping[str, Any]) -> list[dict[str, Any]]:
+    quotes = [
+        {"front": quote.get("author", ""), "back": quote.get("quote", ""), "category": "What Googlers Say"}
+        for quote in data.get("TESTIMONIALS", [])
+    ]
+    return build("testimonials", quotes)
+
+
+def render_gallery(data: Mapping[str, Any]) -> list[dict[str, Any]]:
+    return build("gallery", data.get("GALLERY", []))
+
+
+def render_comics(data: Mapping[str, Any]) -> list[dict[str, Any]]:
+    return build("comics", data.get("COMICS", []))
+
+
+RENDERERS: dict[str, Callable[[Mapping[str, Any]], list[dict[str, Any]]]] = {
+    "timeline": render_timeline,
+    "video_cards": render_video_cards,
+    "blog_cards": render_blog_cards,
+    "awards": render_awards,
+    "certs": render_certs,
+    "speaker": render_speaker,
+    "testimonials": render_testimonials,
+    "gallery": render_gallery,
+    "comics": render_comics,
+}
+
+DETERMINISTIC_FORMATS = frozenset(RENDERERS)
+
+
+def default_render_mode(format_type: str) -> str:
+    """Data-backed formats render deterministically unless the LLM is requested."""
+    return RENDER_MODE_DETERMINISTIC if format_type in DETERMINISTIC_FORMATS else RENDER_MODE_LLM
+
+
+def render(format_type: str, data: Mapping[str, Any] = PORTFOLIO_SECTIONS) -> list[dict[str, Any]]:
+    """Build the A2UI messages for a data-backed format."""
+    renderer = RENDERERS.get(format_type)
+    if renderer is None:
+        raise ValueError(f"No deterministic renderer for format: {format_type}")
+    return renderer(data)
@@ -0,0 +1,213 @@
+"""
+In-process response cache for generated A2UI content.
+
+Entries are keyed by (format, normalized topic, data version) so that repeat
+views of the same section are served from memory instead of Gemini. The data
+version is a content hash of the portfolio data and prompt template, so any
+edit to either automatically invalidates old entries.
+
+Variety is opt-in: with `variants=K`, each key holds a pool of up to K distinct
+generations. Lookups miss until the pool is full (so new variants get
+generated), then the pool is served round-robin.
+
+Expired entries miss but are kept (until LRU eviction or a fresh put) so
+stale() can still serve them as the last known good result while the model
+is failing (see circuit_breaker.py).
+
+With a `store` (see result_store.py) the cache has a second tier shared across
+workers: local misses fall through to the store and load its variant pool, and
+every put writes the key's pool back with its remaining TTL. Use aget/aput from
+async code so disk or network stores run off the event loop.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+def normalize_topic(topic: str) -> str:
+    """Normalize a free-text topic so trivially different phrasings share a key."""
+    topic = _PUNCTUATION.sub(" ", topic.lower())
+    return _WHITESPACE.sub(" ", topic).strip()
+
+
+def content_digest(*parts: Any) -> str:
+    """Stable short digest of arbitrary JSON-serializable parts."""
+    hasher = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, str):
+            part = json.dumps(part, sort_keys=True, default=str)
+        hasher.update(part.encode("utf-8"))
+        hasher.update(b"\0")
+    return hasher.hexdigest()[:16]
+
+
+def make_cache_key(format_type: str, topic: str, data_version: str) -> str:
+    """Build the cache key for a generation request."""
+    return f"{format_type}|{normalize_topic(topic)}|{data_version}"
+
+
+class _Entry:
+    __slots__ = ("variants", "created_at", "cursor")
+
+    def __init__(self, created_at: float):
+        self.variants: list[dict[str, Any]] = []
+        self.created_at = created_at
+        self.cursor = 0
+
+
+class ResponseCache:
+    """
+    LRU + TTL cache of generation results.
+
+    Args:
+        max_entries: Maximum number of keys kept before the least recently
+            used key is evicted.
+        ttl: Seconds an entry stays valid after its first variant was stored.
+        variants: Number of distinct results pooled per key (1 = no variety).
+        store: Optional shared ResultStore used as a second tier.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl: float = 3600, variants: int = 1, store=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.variants = max(1, variants)
+        self.store = store
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _expired(self, entry: _Entry, now: float) -> bool:
+        return now - entry.created_at >= self.ttl
+
+    def _lookup(self, key: str, now: float) -> Optional[dict[str, Any]]:
+        entry = self._entries.get(key)
+        # While the variant pool is still filling, report a miss so the
+        # caller generates (and stores) another variant.
+        if entry is None or self._expired(entry, now) or len(entry.variants) < self.variants:
+            return None
+
+        self._entries.move_to_end(key)
+        value = entry.variants[entry.cursor % len(entry.variants)]
+        entry.cursor += 1
+        return value
+
+    def _count(self, value: Optional[dict[str, Any]]) -> Optional[dict[str, Any]]:
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def _load(self, key: str, shared: Optional[dict[str, Any]]) -> Optional[dict[str, Any]]:
+        """Adopt a pool read from the store (unless a newer local one exists) and retry."""
+        now = time.time()
+        with self._lock:
+            local = self._entries.get(key)
+            if shared and shared.get("variants") and (local is None or self._expired(local, now)):
+                entry = _Entry(shared["created_at"])
+                entry.variants = shared["variants"][-self.variants:]
+                self._entries[key] = entry
+                self._evict()
+            return self._count(self._lookup(key, now))
+
+    def get(self, key: str) -> Optional[dict[str, Any]]:
+        """Return a cached result for the key, or None on a miss."""
+        with self._lock:
+            value = self._lookup(key, time.time())
+            if value is not None or self.store is None:
+                return self._count(value)
+        return self._load(key, self.store.get(key))
+
+    async def aget(self, key: str) -> Optional[dict[str, Any]]:
+        """get() that reads blocking stores in a worker thread."""
+        with self._lock:
+            value = self._lookup(key, time.time())
+            if value is not None or self.store is None:
+                return self._count(value)
+        if self.store.blocking:
+            shared = await asyncio.to_thread(self.store.get, key)
+        else:
+            shared = self.store.get(key)
+        return self._load(key, shared)
+
+    def stale(self, key: str) -> Optional[dict[str, Any]]:
+        """The newest result stored for the key, even if expired; None if never stored."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.variants[-1] if entry is not None and entry.variants else None
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _put_local(self, key: str, value: dict[str, Any]) -> Optional[tuple[dict[str, Any], float]]:
+        """Store locally; returns the pool and its remaining TTL for the store."""
+        if "error" in value:
+            return None
+
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self._expired(entry, now):
+                entry = _Entry(now)
+                self._entries[key] = entry
+
+            if len(entry.variants) >= self.variants:
+                # Pool is full: replace the oldest variant
+                entry.variants.pop(0)
+            entry.variants.append(value)
+            self._entries.move_to_end(key)
+            self._evict()
+
+            shared = {"created_at": entry.created_at, "variants": list(entry.variants)}
+            return shared, entry.created_at + self.ttl - now
+
+    def put(self, key: str, value: dict[str, Any]) -> None:
+        """Store a result. Results carrying an "error" are never cached."""
+        pool = self._put_local(key, value)
+        if pool is not None and self.store is not None:
+            self.store.put(key, *pool)
+
+    async def aput(self, key: str, value: dict[str, Any]) -> None:
+        """put() that writes blocking stores in a worker thread."""
+        pool = self._put_local(key, value)
+        if pool is None or self.store is None:
+            return
+        if self.store.blocking:
+            await asyncio.to_thread(self.store.put, key, *pool)
+        else:
+            self.store.put(key, *pool)
+
+    def clear(self) -> None:
+        """Drop all cached entries. Useful for testing."""
+        with self._lock:
+            self._entries.clear()
+        logger.info("Response cache cleared")
+
+    def stats(self) -> dict[str, int]:
+        """Hit/miss/eviction counters and current size (plus the store's, if any)."""
+        with self._lock:
+            stats = {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+        if self.store is not None:
+            stats["store"] = self.store.stats()
+        return stats
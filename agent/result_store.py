@@ -0,0 +1,375 @@
+"""
+Shared result stores behind the response cache.
+
+Each uvicorn worker keeps its own in-memory ResponseCache; a ResultStore is
+the second tier those caches share, so a result generated by one worker (or
+replica) is served by the others instead of being regenerated. RESULT_STORE_URL
+picks the backend:
+
+- "memory://": in-process LRU (one worker; mostly for tests).
+- "sqlite:///path/to/results.sqlite": SQLite in WAL mode on local disk, shared
+  by the workers of one host.
+- "redis://host:6379/0": any Redis-protocol server (Redis, Valkey, KeyDB,
+  Memorystore), shared by every replica. Spoken over a small built-in RESP
+  client, so no extra dependency.
+
+Values are JSON compressed with zlib (A2UI compresses 4-8x). Every backend
+honours a per-entry TTL, refuses values larger than max_value_bytes and counts
+hits, misses, writes, evictions and errors. Memory and SQLite also cap their
+total size, evicting the oldest entries; Redis leaves that to the server's
+maxmemory policy. Backend errors are logged and treated as misses: the shared
+tier must never fail a request.
+"""
+
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Optional
+from urllib.parse import unquote, urlparse
+
+logger = logging.getLogger(__name__)
+
+RESULT_STORE_MAX_BYTES = int(os.getenv("RESULT_STORE_MAX_BYTES", str(256 * 1024 * 1024)))
+RESULT_STORE_MAX_VALUE_BYTES = int(os.getenv("RESULT_STORE_MAX_VALUE_BYTES", str(1024 * 1024)))
+
+_COMPRESSION_LEVEL = 6
+
+
+def encode(value: Any) -> bytes:
+    """Compact JSON, zlib-compressed."""
+    return zlib.compress(json.dumps(value, separators=(",", ":")).encode("utf-8"), _COMPRESSION_LEVEL)
+
+
+def decode(blob: bytes) -> Any:
+    return json.loads(zlib.decompress(blob))
+
+
+class ResultStore:
+    """
+    Base class: compression, size limits and stats around raw byte storage.
+
+    Subclasses implement _get, _set, _delete and _clear on compressed bytes.
+    Thread-safe, since the response cache calls stores from worker threads.
+    """
+
+    blocking = False  # True when calls do disk or network I/O
+
+    def __init__(self, max_value_bytes: int = RESULT_STORE_MAX_VALUE_BYTES):
+        self.max_value_bytes = max_value_bytes
+        self._stats_lock = threading.Lock()
+        self._counts = {"hits": 0, "misses": 0, "writes": 0, "rejected": 0, "evictions": 0, "errors": 0}
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self._counts[name] += amount
+
+    def get(self, key: str) -> Optional[Any]:
+        """The stored value, or None on a miss, expiry or backend error."""
+        try:
+            blob = self._get(key)
+            value = decode(blob) if blob is not None else None
+        except Exception as e:
+            logger.warning(f"{type(self).__name__} get failed: {e}")
+            self._count("errors")
+            value = None
+        self._count("hits" if value is not None else "misses")
+        return value
+
+    def put(self, key: str, value: Any, ttl: float) -> bool:
+        """Store a value for ttl seconds; False if it was too large or failed."""
+        blob = encode(value)
+        if len(blob) > self.max_value_bytes or ttl <= 0:
+            self._count("rejected")
+            return False
+        try:
+            self._set(key, blob, ttl)
+        except Exception as e:
+            logger.warning(f"{type(self).__name__} put failed: {e}")
+            self._count("errors")
+            return False
+        self._count("writes")
+        return True
+
+    def delete(self, key: str) -> None:
+        try:
+            self._delete(key)
+        except Exception as e:
+            logger.warning(f"{type(self).__name__} delete failed: {e}")
+            self._count("errors")
+
+    def clear(self) -> None:
+        """Drop every entry this store owns."""
+        self._clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._stats_lock:
+            return dict(self._counts)
+
+    def _get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def _set(self, key: str, blob: bytes, ttl: float) -> None:
+        raise NotImplementedError
+
+    def _delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def _clear(self) -> None:
+        raise NotImplementedError
+
+
+class MemoryResultStore(ResultStore):
+    """In-process LRU of compressed values, capped in total bytes."""
+
+    def __init__(self, max_bytes: int = RESULT_STORE_MAX_BYTES, **kwargs):
+        super().__init__(**kwargs)
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, tuple[float, bytes]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def _remove(self, key: str) -> None:
+        _, blob = self._entries.pop(key)
+        self._bytes -= len(blob)
+
+    def _set(self, key: str, blob: bytes, ttl: float) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.time() + ttl, blob)
+            self._bytes += len(blob)
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._count("evictions")
+
+    def _delete(self, key: str) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def _clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+class SQLiteResultStore(ResultStore):
+    """
+    SQLite (WAL) table shared by the workers on a host.
+
+    Over max_bytes the oldest written entries are deleted first, so reads
+    never write.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, max_bytes: int = RESULT_STORE_MAX_BYTES, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5)
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL,"
+                " expire_at REAL NOT NULL, written_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS results_written_at ON results (written_at)")
+
+    def _get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM results WHERE key = ? AND expire_at > ?", (key, time.time())
+            ).fetchone()
+        return row[0] if row is not None else None
+
+    def _set(self, key: str, blob: bytes, ttl: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO results (key, value, size, expire_at, written_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, blob, len(blob), now + ttl, now),
+                )
+                self._conn.execute("DELETE FROM results WHERE expire_at <= ?", (now,))
+                total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+                evicted = 0
+                while total > self.max_bytes:
+                    row = self._conn.execute("SELECT key, size FROM results ORDER BY written_at LIMIT 1").fetchone()
+                    self._conn.execute("DELETE FROM results WHERE key = ?", (row[0],))
+                    total -= row[1]
+                    evicted += 1
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        if evicted:
+            self._count("evictions", evicted)
+
+    def _delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+
+    def _clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM results")
+
+
+class RedisProtocolError(Exception):
+    """An error reply from a Redis-protocol server."""
+
+
+class _RespConnection:
+    """Minimal blocking RESP2 client: one socket, one command at a time."""
+
+    def __init__(self, host: str, port: int, db: int, password: Optional[str], timeout: float):
+        self.host, self.port, self.db, self.password, self.timeout = host, port, db, password, timeout
+        self._sock: Optional[socket.socket] = None
+        self._file = None
+
+    def _connect(self) -> None:
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._file = self._sock.makefile("rb")
+        if self.password:
+            self._roundtrip("AUTH", self.password)
+        if self.db:
+            self._roundtrip("SELECT", str(self.db))
+
+    def close(self) -> None:
+        if self._sock is not None:
+            try:
+                self._file.close()
+                self._sock.close()
+            finally:
+                self._sock = self._file = None
+
+    def _read(self) -> Any:
+        line = self._file.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("connection closed")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body.decode()
+        if kind == b"-":
+            raise RedisProtocolError(body.decode())
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            data = self._file.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            length = int(body)
+            return None if length < 0 else [self._read() for _ in range(length)]
+        raise ConnectionError(f"unexpected reply {line[:20]!r}")
+
+    def _roundtrip(self, *args: Any) -> Any:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self._sock.sendall(b"".join(parts))
+        return self._read()
+
+    def execute(self, *args: Any) -> Any:
+        """Run a command, reconnecting once if the connection was lost."""
+        for attempt in (0, 1):
+            try:
+                if self._sock is None:
+                    self._connect()
+                return self._roundtrip(*args)
+            except (ConnectionError, OSError):
+                self.close()
+                if attempt:
+                    raise
+
+
+class RedisResultStore(ResultStore):
+    """
+    Redis-protocol backend. Keys are namespaced with `prefix`; TTLs map to
+    SET ... PX and the size cap is the server's maxmemory policy.
+    """
+
+    blocking = True
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 6379,
+        db: int = 0,
+        password: Optional[str] = None,
+        prefix: str = "portfolio:result:",
+        timeout: float = 0.25,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.prefix = prefix
+        self._conn = _RespConnection(host, port, db, password, timeout)
+        self._lock = threading.Lock()
+
+    def _execute(self, *args: Any) -> Any:
+        with self._lock:
+            return self._conn.execute(*args)
+
+    def _get(self, key: str) -> Optional[bytes]:
+        return self._execute("GET", self.prefix + key)
+
+    def _set(self, key: str, blob: bytes, ttl: float) -> None:
+        self._execute("SET", self.prefix + key, blob, "PX", str(max(1, int(ttl * 1000))))
+
+    def _delete(self, key: str) -> None:
+        self._execute("DEL", self.prefix + key)
+
+    def _clear(self) -> None:
+        cursor = "0"
+        while True:
+            cursor, keys = self._execute("SCAN", cursor, "MATCH", self.prefix + "*", "COUNT", "500")
+            cursor = cursor.decode() if isinstance(cursor, bytes) else cursor
+            if keys:
+                self._execute("DEL", *keys)
+            if cursor == "0":
+                return
+
+
+def create_result_store(url: str) -> Optional[ResultStore]:
+    """The store for a RESULT_STORE_URL, or None when unset."""
+    if not url:
+        return None
+    parsed = urlparse(url)
+    if parsed.scheme == "memory":
+        return MemoryResultStore()
+    if parsed.scheme == "sqlite":
+        return SQLiteResultStore(unquote(parsed.path) or ":memory:")
+    if parsed.scheme == "redis":
+        return RedisResultStore(
+            host=parsed.hostname or "localhost",
+            port=parsed.port or 6379,
+            db=int(parsed.path.lstrip("/") or 0),
+            password=unquote(parsed.password) if parsed.password else None,
+        )
+    raise ValueError(f"Unsupported RESULT_STORE_URL scheme: {parsed.scheme!r}")
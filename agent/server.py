@@ -5,25 +5,71 @@ Provides HTTP endpoints for the A2A agent that generates A2UI learning materials
 This can run locally or be deployed to Agent Engine.
 """
 
+import asyncio
 import json
 import logging
 import os
-from typing import Any
+from contextlib import asynccontextmanager
+from typing import Any, Literal, Optional
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, Header, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 
-from agent import get_agent, LearningMaterialAgent
+from agent import get_agent, get_tenant_agent, LearningMaterialAgent
+
+try:
+    from agent.admission import AdmissionRejected
+    from agent.metrics import CONTENT_TYPE, REGISTRY, record_stream_cancel, stage
+    from agent.tenants import DEFAULT_TENANT, UnknownTenant, validate_tenant_id
+    from agent.warmup import WarmupState, warm_up
+except ImportError:
+    from admission import AdmissionRejected
+    from metrics import CONTENT_TYPE, REGISTRY, record_stream_cancel, stage
+    from tenants import DEFAULT_TENANT, UnknownTenant, validate_tenant_id
+    from warmup import WarmupState, warm_up
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Opt-in startup warmup: pre-generate every supported format into the response
+# cache before /ready reports the instance as ready.
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "false").lower() == "true"
+WARMUP_CONCURRENCY = int(os.getenv("WARMUP_CONCURRENCY", "4"))
+
+# Upper bound on concurrent generations per /generate/batch request
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "4"))
+
+# /a2a/stream sends an SSE comment after this many idle seconds so proxies and
+# load balancers keep the connection open, and cancels a stream still running
+# after SSE_STREAM_DEADLINE seconds
+SSE_HEARTBEAT_INTERVAL = float(os.getenv("SSE_HEARTBEAT_INTERVAL", "15"))
+SSE_STREAM_DEADLINE = float(os.getenv("SSE_STREAM_DEADLINE", "120"))
+
+SSE_HEARTBEAT = ": keep-alive\n\n"
+
+warmup_state = WarmupState(enabled=WARMUP_ON_STARTUP)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the warmup in the background so the server accepts probes immediately."""
+    task = None
+    if WARMUP_ON_STARTUP:
+        task = asyncio.create_task(
+            warm_up(get_agent(), warmup_state, LearningMaterialAgent.SUPPORTED_FORMATS, WARMUP_CONCURRENCY)
+        )
+    yield
+    if task is not None and not task.done():
+        task.cancel()
+
+
 app = FastAPI(
     title="Personalized Learning Agent",
     description="A2A agent for generating personalized A2UI learning materials",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # CORS for local development
@@ -36,12 +82,39 @@ app.add_middleware(
 )
 
 
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    """Shed load with a fast 429/503 instead of a generic error."""
+    return JSONResponse(
+        {"detail": str(exc), "retry_after": exc.retry_after},
+        status_code=exc.status_code,
+        headers={"Retry-After": exc.retry_after_header},
+    )
+
+
 class GenerateRequest(BaseModel):
     """Request model for content generation."""
 
     format: str
     context: str = ""
     session_id: str = "default"
+    render_mode: Optional[str] = None  # "deterministic" or "llm"; default depends on format
+
+
+class BatchItem(BaseModel):
+    """One format in a batch generation request."""
+
+    format: str
+    context: str = ""
+    render_mode: Optional[str] = None
+
+
+class BatchRequest(BaseModel):
+    """Request model for batch generation."""
+
+    items: list[BatchItem]
+    stream: Literal["ndjson", "sse"] = "ndjson"
+    concurrency: Optional[int] = None  # capped at BATCH_MAX_CONCURRENCY
 
 
 class A2ARequest(BaseModel):
@@ -52,12 +125,55 @@ class A2ARequest(BaseModel):
     extensions: list[str] = []
 
 
+def resolve_agent(
+    request: Request,
+    x_tenant_id: Optional[str] = Header(default=None),
+) -> LearningMaterialAgent:
+    """
+    The agent for the request's tenant, from the /tenants/{tenant_id} path
+    prefix or the X-Tenant-ID header; the built-in portfolio by default.
+
+    The path parameter is read from the route rather than declared, which
+    would also accept it as a ?tenant_id= query parameter on other routes.
+    """
+    tenant = request.path_params.get("tenant_id") or x_tenant_id
+    if not tenant or tenant == DEFAULT_TENANT:
+        return get_agent()
+    try:
+        validate_tenant_id(tenant)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        return get_tenant_agent(tenant)
+    except UnknownTenant:
+        raise HTTPException(status_code=404, detail=f"Unknown tenant: {tenant}")
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
     return {"status": "healthy", "agent": "personalized-learning-agent"}
 
 
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness endpoint for the load balancer.
+
+    Returns 503 while the startup warmup is still filling the cache, 200 once
+    it has finished (or when warmup is disabled). /health stays a pure
+    liveness check.
+    """
+    state = warmup_state.to_dict()
+    return JSONResponse(state, status_code=200 if warmup_state.ready else 503)
+
+
+@app.get("/metrics")
+async def metrics():
+    """Stage latency histograms and cache counters in Prometheus text format."""
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
 @app.get("/capabilities")
 async def get_capabilities():
     """Return agent capabilities for A2A discovery."""
@@ -75,32 +191,156 @@ async def get_capabilities():
 
 
 @app.post("/generate")
-async def generate_content(request: GenerateRequest):
+@app.post("/tenants/{tenant_id}/generate")
+async def generate_content(request: GenerateRequest, agent: LearningMaterialAgent = Depends(resolve_agent)):
     """
     Generate A2UI content for the specified format.
 
     Args:
-        request: Generation request with format and optional context
+        request: Generation request with format, optional context and render mode
 
     Returns:
         A2UI JSON response
     """
     logger.info(f"Generate request: format={request.format}, context={request.context[:50]}...")
 
-    agent = get_agent()
-    result = await agent.generate_content(request.format, request.context)
+    # Unknown formats share one label so request input cannot grow the series
+    label = request.format if request.format in LearningMaterialAgent.SUPPORTED_FORMATS else "unsupported"
+    with stage("request", label):
+        result = await agent.generate_content(request.format, request.context, render_mode=request.render_mode)
 
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["error"])
 
+    # Chat follow-ups in the same session know what was shown (see sessions.py)
+    agent.record_render(request.session_id, request.format, request.context)
     return result
 
 
+@app.post("/generate/batch")
+@app.post("/tenants/{tenant_id}/generate/batch")
+async def generate_batch(request: BatchRequest, agent: LearningMaterialAgent = Depends(resolve_agent)):
+    """
+    Generate several formats in one round trip.
+
+    Items run concurrently (up to BATCH_MAX_CONCURRENCY) and each result is
+    streamed back as soon as it finishes, as NDJSON lines or SSE events:
+    {"index": i, "format": ..., "result": {...}} or {"index": i, "format": ...,
+    "error": "..."}. A failing item never fails the rest of the batch.
+
+    Args:
+        request: Batch request with items and stream encoding
+
+    Returns:
+        Streaming response with one entry per item, in completion order
+    """
+    logger.info(f"Batch request: {[item.format for item in request.items]}")
+
+    limit = min(request.concurrency or BATCH_MAX_CONCURRENCY, BATCH_MAX_CONCURRENCY)
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run(index: int, item: BatchItem) -> dict[str, Any]:
+        async with semaphore:
+            try:
+                result = await agent.generate_content(item.format, item.context, render_mode=item.render_mode)
+            except Exception as e:
+                logger.error(f"Batch item {index} ({item.format}) failed: {e}")
+                result = {"error": str(e)}
+        if "error" in result:
+            return {"index": index, "format": item.format, "error": result["error"]}
+        return {"index": index, "format": item.format, "result": result}
+
+    if request.stream == "sse":
+        media_type = "text/event-stream"
+        encode = lambda entry: f"data: {json.dumps(entry)}\n\n"
+    else:
+        media_type = "application/x-ndjson"
+        encode = lambda entry: json.dumps(entry) + "\n"
+
+    async def generate():
+        tasks = [asyncio.ensure_future(run(i, item)) for i, item in enumerate(request.items)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield encode(await next_done)
+        finally:
+            # Client went away: stop the generations nobody will read
+            if not all(task.done() for task in tasks):
+                record_stream_cancel("batch", "disconnect")
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(generate(), media_type=media_type)
+
+
+async def guard_stream(events, http_request: Request, endpoint: str):
+    """
+    Encode events as SSE while watching the client and the clock.
+
+    The next event is awaited in its own task, at most SSE_HEARTBEAT_INTERVAL
+    seconds at a time; each wait ends with a disconnect check and, if nothing
+    arrived, a heartbeat comment. When the client has gone, or the stream
+    outlives SSE_STREAM_DEADLINE (reported as a final error event), the
+    pending step is cancelled so the model call behind it stops, and the
+    cancellation is counted in portfolio_stream_cancellations_total.
+
+    Starlette also cancels this generator when it sees the disconnect first;
+    that is counted the same way.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + SSE_STREAM_DEADLINE
+    iterator = events.__aiter__()
+    pending: Optional[asyncio.Future] = None
+    reason = None
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(iterator.__anext__())
+            timeout = max(0.0, min(SSE_HEARTBEAT_INTERVAL, deadline - loop.time()))
+            done, _ = await asyncio.wait({pending}, timeout=timeout)
+
+            if await http_request.is_disconnected():
+                reason = "disconnect"
+                return
+            if done:
+                step, pending = pending, None
+                try:
+                    event = step.result()
+                except StopAsyncIteration:
+                    return
+                yield f"data: {json.dumps(event)}\n\n"
+            elif loop.time() >= deadline:
+                reason = "deadline"
+                error = f"Stream exceeded its {SSE_STREAM_DEADLINE:g}s deadline"
+                yield f"data: {json.dumps({'error': error})}\n\n"
+                return
+            else:
+                yield SSE_HEARTBEAT
+    except (asyncio.CancelledError, GeneratorExit):
+        reason = "disconnect"
+        raise
+    finally:
+        if reason is not None:
+            logger.info(f"Cancelling {endpoint} stream: {reason}")
+            record_stream_cancel(endpoint, reason)
+        if pending is not None and not pending.done():
+            # Cancelling the step unwinds the agent's generator from inside it
+            pending.cancel()
+        else:
+            await iterator.aclose()
+
+
 @app.post("/a2a/stream")
-async def a2a_stream(request: A2ARequest):
+@app.post("/tenants/{tenant_id}/a2a/stream")
+async def a2a_stream(request: A2ARequest, http_request: Request, agent: LearningMaterialAgent = Depends(resolve_agent)):
     """
     A2A-compatible streaming endpoint.
 
+    Each A2UI message is sent as its own SSE event (marked "partial": true)
+    as soon as the model has finished generating it. The last event is the
+    complete result dict, identical to the /generate response. Idle periods
+    carry heartbeat comments, and the generation is cancelled if the client
+    disconnects or the stream exceeds SSE_STREAM_DEADLINE (see guard_stream).
+
     Args:
         request: A2A request with message
 
@@ -109,20 +349,25 @@ async def a2a_stream(request: A2ARequest):
     """
     logger.info(f"A2A stream request: {request.message}")
 
-    agent = get_agent()
-
-    async def generate():
-        async for chunk in agent.stream(request.message, request.session_id):
-            yield f"data: {json.dumps(chunk)}\n\n"
+    async def events():
+        try:
+            async for chunk in agent.stream(request.message, request.session_id):
+                yield chunk
+        except AdmissionRejected as e:
+            # Headers are already sent; report the rejection as the final event
+            yield {"error": str(e), "retry_after": e.retry_after}
 
     return StreamingResponse(
-        generate(),
+        guard_stream(events(), http_request, "a2a_stream"),
         media_type="text/event-stream",
+        # Flush each event through caches and buffering proxies (nginx)
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
 @app.post("/a2a/query")
-async def a2a_query(request: A2ARequest):
+@app.post("/tenants/{tenant_id}/a2a/query")
+async def a2a_query(request: A2ARequest, agent: LearningMaterialAgent = Depends(resolve_agent)):
     """
     A2A-compatible non-streaming endpoint.
 
@@ -139,7 +384,6 @@ async def a2a_query(request: A2ARequest):
     format_type = parts[0].strip()
     context = parts[1].strip() if len(parts) > 1 else ""
 
-    agent = get_agent()
     result = await agent.generate_content(format_type, context)
 
     return result
@@ -0,0 +1,197 @@
+"""
+Bounded per-session conversation state.
+
+A session (keyed by the session_id clients send) remembers:
+- the conversation, compacted: the last `recent_turns` turns verbatim and
+  older turns folded into a short running summary of one gist line per turn,
+  capped at `summary_chars` (oldest lines dropped first);
+- the formats already rendered, with their topics, so chat follow-ups can be
+  prompted with the portfolio sections the user has seen (plus the core
+  profile) in full and only an outline of the rest, instead of the full
+  portfolio dump.
+
+The store is an LRU with idle TTL and a cap on the approximate total bytes of
+all sessions; whichever limit is hit first evicts the least recently used
+sessions. One store serves every tenant: sessions are keyed by (namespace,
+session_id), the namespace being the tenant, so the caps bound the whole
+process however many tenants are loaded. Compaction is extractive (no model
+call), so recording a turn costs microseconds. The "default" session_id is
+shared by every client that omits one, so it is never stored.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+SESSION_TTL = float(os.getenv("SESSION_TTL", "1800"))
+SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", "10000"))
+SESSION_MAX_BYTES = int(os.getenv("SESSION_MAX_BYTES", str(64 * 1024 * 1024)))
+SESSION_RECENT_TURNS = int(os.getenv("SESSION_RECENT_TURNS", "6"))
+
+# Shared by every client that sends no session_id; never stored
+ANONYMOUS_SESSION = "default"
+
+_GIST_CHARS = 160
+
+
+def _gist(role: str, text: str) -> str:
+    text = " ".join(text.split())
+    if len(text) > _GIST_CHARS:
+        text = text[:_GIST_CHARS - 3] + "..."
+    return f"{role}: {text}"
+
+
+class Session:
+    """Compacted history and rendered formats of one conversation."""
+
+    __slots__ = ("session_id", "turns", "summary", "rendered", "last_access", "size")
+
+    def __init__(self, session_id: str, now: float):
+        self.session_id = session_id
+        # Recent turns verbatim, as {"role": "user" | "model", "text": ...}
+        self.turns: list[dict[str, str]] = []
+        # Gists of older turns, oldest first
+        self.summary: list[str] = []
+        # Format -> topics rendered in this session, in order
+        self.rendered: dict[str, list[str]] = {}
+        self.last_access = now
+        self.size = 0
+
+    def add_turn(self, role: str, text: str, recent_turns: int, summary_chars: int) -> None:
+        self.turns.append({"role": role, "text": text})
+        while len(self.turns) > recent_turns:
+            old = self.turns.pop(0)
+            self.summary.append(_gist(old["role"], old["text"]))
+        while self.summary and sum(len(line) + 1 for line in self.summary) > summary_chars:
+            self.summary.pop(0)
+
+    def add_render(self, format_type: str, topic: str) -> None:
+        topics = self.rendered.setdefault(format_type, [])
+        if topic not in topics:
+            topics.append(topic)
+            del topics[:-5]
+
+    def measure(self) -> int:
+        """Approximate memory held by the session, in bytes of JSON."""
+        self.size = len(json.dumps([self.turns, self.summary, self.rendered], ensure_ascii=False)) + 200
+        return self.size
+
+    def snapshot(self) -> dict[str, Any]:
+        """A copy of the session state, safe to use outside the store's lock."""
+        return {
+            "session_id": self.session_id,
+            "turns": [dict(turn) for turn in self.turns],
+            "summary": list(self.summary),
+            "rendered": {format_type: list(topics) for format_type, topics in self.rendered.items()},
+        }
+
+
+class SessionStore:
+    """
+    LRU + TTL + byte-capped store of Sessions.
+
+    Args:
+        max_entries: Maximum number of sessions kept.
+        ttl: Seconds a session survives without being used.
+        max_bytes: Cap on the total approximate size of all sessions.
+        recent_turns: Turns kept verbatim; older ones are summarized.
+        summary_chars: Cap on the summary of older turns.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = SESSION_MAX_ENTRIES,
+        ttl: float = SESSION_TTL,
+        max_bytes: int = SESSION_MAX_BYTES,
+        recent_turns: int = SESSION_RECENT_TURNS,
+        summary_chars: int = 2000,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.recent_turns = max(1, recent_turns)
+        self.summary_chars = summary_chars
+        self._sessions: "OrderedDict[tuple[str, str], Session]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _live(self, key: tuple[str, str], now: float) -> Optional[Session]:
+        session = self._sessions.get(key)
+        if session is not None and now - session.last_access >= self.ttl:
+            self._drop(key)
+            self.expirations += 1
+            return None
+        return session
+
+    def _drop(self, key: tuple[str, str]) -> None:
+        session = self._sessions.pop(key)
+        self.bytes -= session.size
+
+    def _update(self, session_id: str, namespace: str, change) -> None:
+        if not session_id or session_id == ANONYMOUS_SESSION:
+            return
+        key = (namespace, session_id)
+        now = time.time()
+        with self._lock:
+            session = self._live(key, now)
+            if session is None:
+                session = self._sessions[key] = Session(session_id, now)
+            change(session)
+            session.last_access = now
+            self._sessions.move_to_end(key)
+
+            self.bytes -= session.size
+            self.bytes += session.measure()
+            while self._sessions and (len(self._sessions) > self.max_entries or self.bytes > self.max_bytes):
+                self._drop(next(iter(self._sessions)))
+                self.evictions += 1
+
+    def get(self, session_id: str, namespace: str = "") -> Optional[dict[str, Any]]:
+        """A snapshot of the session's state, or None for new or expired sessions."""
+        if not session_id or session_id == ANONYMOUS_SESSION:
+            return None
+        key = (namespace, session_id)
+        now = time.time()
+        with self._lock:
+            session = self._live(key, now)
+            if session is None:
+                return None
+            session.last_access = now
+            self._sessions.move_to_end(key)
+            return session.snapshot()
+
+    def record_turn(self, session_id: str, user_text: str, model_text: str, namespace: str = "") -> None:
+        """Append a user message and the reply, compacting older turns."""
+        def change(session: Session) -> None:
+            session.add_turn("user", user_text, self.recent_turns, self.summary_chars)
+            session.add_turn("model", model_text, self.recent_turns, self.summary_chars)
+
+        self._update(session_id, namespace, change)
+
+    def record_render(self, session_id: str, format_type: str, topic: str, namespace: str = "") -> None:
+        """Note that the session was shown a format about a topic."""
+        self._update(session_id, namespace, lambda session: session.add_render(format_type, topic))
+
+    def clear(self) -> None:
+        """Drop all sessions. Useful for testing."""
+        with self._lock:
+            self._sessions.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        """Session count, total size and eviction counters."""
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "bytes": self.bytes,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
@@ -0,0 +1,55 @@
+"""
+Single-flight request coalescing.
+
+When several callers ask for the same key while a generation for it is already
+running, they all await that one in-flight task instead of issuing their own
+Gemini call. The shared task is shielded, so a caller that goes away (e.g. a
+client disconnect) does not cancel the work the other waiters depend on.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Coalesce concurrent async calls that share a key."""
+
+    def __init__(self):
+        self._inflight: dict[str, asyncio.Task] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    def pending(self, key: str) -> bool:
+        """True if a call for this key is currently in flight."""
+        return key in self._inflight
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run fn() for the key, or join the call already in flight for it.
+
+        Every waiter receives the same result, or the same exception.
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            logger.debug(f"Coalesced request for {key}")
+            return await asyncio.shield(task)
+
+        self.executions += 1
+        task = asyncio.ensure_future(fn())
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict[str, Any]:
+        """Execution and coalesced-hit counters."""
+        return {
+            "in_flight": len(self._inflight),
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+        }
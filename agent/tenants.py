@@ -0,0 +1,139 @@
+"""
+Multi-tenant portfolio registry.
+
+One deployment can serve many portfolios. Each tenant is a file in TENANTS_DIR
+named after the tenant ({tenant}.json, .yaml or .yml) holding the same
+sections as portfolio_data.py, keyed by their labels in context_projections
+(PROFILE, EXPERIENCE, CERTIFICATIONS, ...), plus an optional SOURCES section.
+
+Tenants are loaded on first use into their own agent (projected contexts,
+response cache and context caches) and kept in an LRU of TENANT_CACHE_SIZE
+agents; the least recently used idle tenant is evicted when it overflows and
+reloaded from its file on its next request. The built-in portfolio is the
+"default" tenant and is never evicted (see agent.get_agent).
+
+Requests pick a tenant with the X-Tenant-ID header or the /tenants/{tenant_id}
+path prefix on the generation endpoints (see server.py).
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+try:
+    from agent.context_projections import Portfolio
+except ImportError:
+    from context_projections import Portfolio
+
+logger = logging.getLogger(__name__)
+
+TENANTS_DIR = os.getenv("TENANTS_DIR", "")
+TENANT_CACHE_SIZE = int(os.getenv("TENANT_CACHE_SIZE", "256"))
+
+DEFAULT_TENANT = "default"
+TENANT_HEADER = "X-Tenant-ID"
+
+# Tenant IDs become file names, so no separators or dots
+_TENANT_ID = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_-]{0,63}$")
+_EXTENSIONS = (".json", ".yaml", ".yml")
+
+
+class UnknownTenant(LookupError):
+    """No portfolio file exists for the tenant."""
+
+
+def validate_tenant_id(tenant_id: str) -> str:
+    if not _TENANT_ID.match(tenant_id):
+        raise ValueError(f"Invalid tenant ID: {tenant_id!r}")
+    return tenant_id
+
+
+def load_portfolio(path: Path, tenant_id: str) -> Portfolio:
+    """Read a tenant's portfolio file (YAML needs PyYAML)."""
+    text = path.read_text(encoding="utf-8")
+    if path.suffix == ".json":
+        sections = json.loads(text)
+    else:
+        try:
+            import yaml
+        except ImportError as e:
+            raise ValueError(f"PyYAML is required to load {path.name}") from e
+        sections = yaml.safe_load(text)
+
+    if not isinstance(sections, dict) or not isinstance(sections.get("PROFILE", {}), dict):
+        raise ValueError(f"{path.name}: expected a mapping of section labels with a PROFILE mapping")
+    return Portfolio({label.upper(): value for label, value in sections.items()}, tenant_id=tenant_id)
+
+
+class TenantRegistry:
+    """LRU of per-tenant agents, loaded lazily from portfolio files."""
+
+    def __init__(
+        self,
+        directory: str,
+        factory: Callable[[Portfolio], Any],
+        max_tenants: int = TENANT_CACHE_SIZE,
+    ):
+        self.directory = Path(directory) if directory else None
+        self.factory = factory
+        self.max_tenants = max(1, max_tenants)
+        self._agents: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.evictions = 0
+
+    def _find(self, tenant_id: str) -> Optional[Path]:
+        if self.directory is None:
+            return None
+        for extension in _EXTENSIONS:
+            path = self.directory / f"{tenant_id}{extension}"
+            if path.is_file():
+                return path
+        return None
+
+    def get(self, tenant_id: str) -> Any:
+        """
+        The tenant's agent, loading it on first use.
+
+        Raises ValueError for malformed IDs or files and UnknownTenant when the
+        tenant has no portfolio file.
+        """
+        validate_tenant_id(tenant_id)
+        with self._lock:
+            agent = self._agents.get(tenant_id)
+            if agent is not None:
+                self._agents.move_to_end(tenant_id)
+                return agent
+
+            path = self._find(tenant_id)
+            if path is None:
+                raise UnknownTenant(tenant_id)
+            agent = self.factory(load_portfolio(path, tenant_id))
+            self.loads += 1
+            logger.info(f"Loaded tenant {tenant_id} from {path.name}")
+
+            self._agents[tenant_id] = agent
+            while len(self._agents) > self.max_tenants:
+                evicted, _ = self._agents.popitem(last=False)
+                self.evictions += 1
+                logger.info(f"Evicted idle tenant {evicted}")
+            return agent
+
+    def evict(self, tenant_id: str) -> bool:
+        """Drop a tenant so its next request reloads its file."""
+        with self._lock:
+            return self._agents.pop(tenant_id, None) is not None
+
+    def __len__(self) -> int:
+        return len(self._agents)
+
+    def __contains__(self, tenant_id: str) -> bool:
+        return tenant_id in self._agents
+
+    def stats(self) -> dict[str, int]:
+        return {"loaded": len(self._agents), "loads": self.loads, "evictions": self.evictions}
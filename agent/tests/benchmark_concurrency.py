@@ -0,0 +1,118 @@
+"""
+Throughput benchmark for concurrent /generate calls.
+
+Drives N concurrent POST /generate requests against the in-process FastAPI app
+using a fake Gemini client with a fixed per-call latency. Two client modes are
+compared:
+
+- blocking: the model call sleeps synchronously inside the coroutine, which is
+  what the old `client.models.generate_content` call did to the event loop.
+- async: the model call awaits, matching the `client.aio` path used today.
+
+Each mode starts from fresh admission and circuit breaker state, with a queue
+timeout long enough for the blocking mode to drain. Throughput counts only
+fresh 200 responses; the script exits non-zero if any request failed or was
+served stale.
+
+Usage:
+  python tests/benchmark_concurrency.py --requests 32 --latency 0.5
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+
+import circuit_breaker
+import server
+from admission import AdmissionController
+from agent import LearningMaterialAgent
+
+# Quiz content as returned by the model; the agent assembles the A2UI
+QUIZ_RESPONSE = json.dumps([{
+    "question": "Which cloud?",
+    "options": [{"label": "Google Cloud", "isCorrect": True}, {"label": "Other", "isCorrect": False}],
+    "explanation": "Enrique works on Google Cloud AI.",
+    "category": "Career",
+}])
+
+
+def _fake_response() -> MagicMock:
+    response = MagicMock()
+    response.text = QUIZ_RESPONSE
+    return response
+
+
+def make_fake_client(latency: float, blocking: bool) -> MagicMock:
+    """Build a fake genai client whose model call takes `latency` seconds."""
+
+    async def generate_content(**kwargs):
+        if blocking:
+            time.sleep(latency)
+        else:
+            await asyncio.sleep(latency)
+        return _fake_response()
+
+    async def create_cache(**kwargs):
+        raise RuntimeError("context caching disabled for benchmark")
+
+    client = MagicMock()
+    client.aio.models.generate_content = generate_content
+    client.aio.caches.create = create_cache
+    return client
+
+
+async def run_benchmark(num_requests: int, latency: float, blocking: bool) -> dict:
+    agent = LearningMaterialAgent()
+    agent.client = make_fake_client(latency, blocking)
+    # Serialized blocking calls must not be rejected for queueing too long
+    agent.admission = AdmissionController(queue_timeout=num_requests * latency + 10)
+
+    transport = httpx.ASGITransport(app=server.app)
+    with patch.object(server, "get_agent", return_value=agent), patch.dict(circuit_breaker._breakers, clear=True):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            start = time.perf_counter()
+            responses = await asyncio.gather(*(
+                client.post("/generate", json={"format": "quiz", "context": f"topic {i}"})
+                for i in range(num_requests)
+            ))
+            elapsed = time.perf_counter() - start
+
+    ok = sum(1 for r in responses if r.status_code == 200 and not r.json().get("stale"))
+    return {
+        "mode": "blocking" if blocking else "async",
+        "requests": num_requests,
+        "ok": ok,
+        "failed": num_requests - ok,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(ok / elapsed, 2),
+    }
+
+
+async def main(num_requests: int, latency: float) -> int:
+    before = await run_benchmark(num_requests, latency, blocking=True)
+    after = await run_benchmark(num_requests, latency, blocking=False)
+
+    print(json.dumps({"latency_s": latency, "before": before, "after": after}, indent=2))
+    if before["failed"] or after["failed"]:
+        print(f"\n{before['failed'] + after['failed']} requests failed; throughput is not comparable")
+        return 1
+    print(f"\nSpeedup: {after['throughput_rps'] / before['throughput_rps']:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=32, help="Concurrent /generate calls")
+    parser.add_argument("--latency", type=float, default=0.5, help="Fake model latency in seconds")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(main(args.requests, args.latency)))
@@ -0,0 +1,113 @@
+"""
+Tail-latency benchmark for hedged model requests.
+
+Runs the agent's generate_content against a fake Gemini client whose latency
+is mostly fast with a small slow tail, once without hedging and once with a
+Hedger, and compares p50/p95/p99 latency and how many duplicate calls were
+spent.
+
+Usage:
+  python tests/benchmark_hedging.py --requests 400 --fast 0.05 --slow 0.75 --tail 0.03
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from unittest.mock import MagicMock
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from admission import AdmissionController
+from agent import LearningMaterialAgent
+from hedging import Hedger
+
+# Quiz content as returned by the model; the agent assembles the A2UI
+QUIZ_RESPONSE = json.dumps([{
+    "question": "Which cloud?",
+    "options": [{"label": "Google Cloud", "isCorrect": True}, {"label": "Other", "isCorrect": False}],
+    "explanation": "Enrique works on Google Cloud AI.",
+    "category": "Career",
+}])
+
+
+def make_fake_client(fast: float, slow: float, tail: float, rng: random.Random) -> MagicMock:
+    """Fake genai client: `fast` +/-50% latency, `slow` for a `tail` fraction of calls."""
+    calls = {"count": 0}
+
+    async def generate_content(**kwargs):
+        calls["count"] += 1
+        latency = slow if rng.random() < tail else fast * rng.uniform(0.5, 1.5)
+        await asyncio.sleep(latency)
+        response = MagicMock()
+        response.text = QUIZ_RESPONSE
+        return response
+
+    async def create_cache(**kwargs):
+        raise RuntimeError("context caching disabled for benchmark")
+
+    client = MagicMock()
+    client.aio.models.generate_content = generate_content
+    client.aio.caches.create = create_cache
+    client.calls = calls
+    return client
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+async def run_benchmark(args: argparse.Namespace, hedger: Hedger = None) -> dict:
+    agent = LearningMaterialAgent()
+    agent.client = make_fake_client(args.fast, args.slow, args.tail, random.Random(args.seed))
+    agent.admission = AdmissionController(max_concurrency=args.concurrency * 2, queue_timeout=60)
+    agent.hedger = hedger
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies = []
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            result = await agent.generate_content("quiz", f"topic {i}")
+            latencies.append(time.perf_counter() - start)
+            assert "a2ui" in result, result
+
+    await asyncio.gather(*(one(i) for i in range(args.requests)))
+
+    return {
+        "mode": "hedged" if hedger else "plain",
+        "requests": args.requests,
+        "model_calls": agent.client.calls["count"],
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 1),
+        **({"hedger": hedger.stats()} if hedger else {}),
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    before = await run_benchmark(args)
+    after = await run_benchmark(args, Hedger(percentile=args.percentile, max_hedge_ratio=args.max_ratio))
+
+    print(json.dumps({"before": before, "after": after}, indent=2))
+    print(f"\np99: {before['p99_ms']}ms -> {after['p99_ms']}ms "
+          f"({after['model_calls'] - before['model_calls']} extra model calls)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=400, help="Total generate_content calls")
+    parser.add_argument("--concurrency", type=int, default=8, help="Calls in flight at once")
+    parser.add_argument("--fast", type=float, default=0.05, help="Typical model latency in seconds")
+    parser.add_argument("--slow", type=float, default=0.75, help="Tail model latency in seconds")
+    parser.add_argument("--tail", type=float, default=0.03, help="Fraction of calls in the slow tail")
+    parser.add_argument("--percentile", type=float, default=95, help="Hedge after this latency percentile")
+    parser.add_argument("--max-ratio", type=float, default=0.1, help="Maximum fraction of calls hedged")
+    parser.add_argument("--seed", type=int, default=7)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,69 @@
+"""
+Microbenchmark for intent routing.
+
+Compares the old chain of `"x" in message_lower` checks with the compiled
+router on the labeled messages in routing_cases.json, then shows how each
+scales when the intent table grows (synthetic intents that never match, so
+the chain has to test every keyword).
+
+Usage:
+  python tests/benchmark_intent_router.py --iterations 20000
+"""
+
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from intent_router import DEFAULT_INTENTS, IntentRouter
+
+MESSAGES = [case["message"] for case in json.loads((Path(__file__).parent / "routing_cases.json").read_text())]
+
+
+def keyword_chain(intents):
+    """The previous routing: test each intent's keywords in order."""
+
+    def route(message):
+        message_lower = message.lower()
+        for intent, keywords in intents:
+            for keyword in keywords:
+                if keyword in message_lower:
+                    return intent
+        return None
+
+    return route
+
+
+def synthetic_intents(count):
+    return DEFAULT_INTENTS + [(f"intent{i}", (f"keyword{i:04d}", f"phrase {i:04d}")) for i in range(count)]
+
+
+def per_message_us(fn, iterations):
+    seconds = timeit.timeit(lambda: [fn(m) for m in MESSAGES], number=iterations)
+    return seconds / (iterations * len(MESSAGES)) * 1e6
+
+
+def main(iterations: int) -> None:
+    rows = []
+    for extra in (0, 100, 1000):
+        intents = synthetic_intents(extra)
+        router = IntentRouter(intents)
+        rows.append({
+            "intents": len(intents),
+            "chain_us": round(per_message_us(keyword_chain(intents), iterations), 2),
+            "router_us": round(per_message_us(router.route, iterations), 2),
+        })
+        # Same winner wherever the old chain had no ambiguity
+        assert router.route("show me the trophy room").intent == "awards"
+
+    print(json.dumps({"messages": len(MESSAGES), "per_message": rows}, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=2000, help="Passes over the labeled messages")
+    main(parser.parse_args().iterations)
@@ -0,0 +1,320 @@
+"""
+End-to-end load test for the FastAPI server.
+
+Drives /generate, /a2a/stream and /a2a/query on server.app in-process
+(httpx.ASGITransport, no sockets) with the agent on the local model stand-in
+(MODEL_BACKEND=local, see model_backend.py), and prints a JSON report:
+throughput, p50/p95/p99 latency, time to first SSE event and error rates per
+endpoint and overall.
+
+The workload is either a weighted mix of endpoints, formats and topics, or a
+replay of a captured api-server.ts message log (demo-message-log.json):
+CLIENT_TO_SERVER entries for the three endpoints are re-issued in sequence
+order, as fast as --concurrency allows or paced by their timestamps (--speed).
+
+--min-rps and --max-p95-ms turn the run into a regression gate: the exit code
+is 1 when throughput falls below or p95 latency rises above the threshold.
+
+Usage:
+  python tests/benchmark_load.py --requests 2000 --concurrency 64 --latency lognormal:0.8,0.4
+  python tests/benchmark_load.py --replay ../demo-message-log.json --speed 1
+  python tests/benchmark_load.py --requests 500 --min-rps 40 --max-p95-ms 2500
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+import httpx
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+ENDPOINTS = ("/generate", "/a2a/stream", "/a2a/query")
+
+DEFAULT_ENDPOINT_MIX = "/generate=6,/a2a/stream=3,/a2a/query=1"
+
+# Roughly what the portfolio UI asks for: learning formats dominate, the
+# data-backed sections are rendered without the model
+DEFAULT_FORMAT_MIX = (
+    "flashcards=5,quiz=5,podcast=2,timeline=3,certs=2,awards=2,"
+    "blog_cards=2,video_cards=1,testimonials=1,speaker=1,gallery=1,creative=1"
+)
+
+DEFAULT_TOPICS = (
+    "career", "agentic workflows", "RAG", "Olympics chatbot", "Disney+ rollout",
+    "cloud architecture", "leadership", "photosynthesis", "ATP", "cell division",
+)
+
+# Free-text chat for /a2a/stream, exercising the intent router
+CHAT_MESSAGES = (
+    "Show me Enrique's certifications",
+    "What awards has he won?",
+    "Quiz me on his career",
+    "Tell me about his time at AWS",
+    "What talks has he given?",
+)
+
+
+def parse_mix(spec: str) -> dict[str, float]:
+    """Parse "a=3,b=1" into weights."""
+    weights = {}
+    for part in spec.split(","):
+        name, _, weight = part.strip().partition("=")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def _pick(rng: random.Random, weights: dict[str, float]) -> str:
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def build_workload(
+    requests: int,
+    endpoint_mix: dict[str, float],
+    format_mix: dict[str, float],
+    topics: tuple[str, ...] = DEFAULT_TOPICS,
+    chat_ratio: float = 0.2,
+    unique_topics: bool = False,
+    seed: int = 7,
+) -> list[dict[str, Any]]:
+    """Synthetic requests as {"endpoint", "body"} dicts."""
+    unknown = set(endpoint_mix) - set(ENDPOINTS)
+    if unknown:
+        raise ValueError(f"Unknown endpoints {sorted(unknown)}; expected {ENDPOINTS}")
+
+    rng = random.Random(seed)
+    workload = []
+    for i in range(requests):
+        endpoint = _pick(rng, endpoint_mix)
+        format_type = _pick(rng, format_mix)
+        # A unique topic per request defeats the response cache
+        topic = f"{rng.choice(topics)} #{i}" if unique_topics else rng.choice(topics)
+        session_id = f"load-{i % 50}"
+
+        if endpoint == "/generate":
+            body = {"format": format_type, "context": topic, "session_id": session_id}
+        elif endpoint == "/a2a/stream" and rng.random() < chat_ratio:
+            body = {"message": rng.choice(CHAT_MESSAGES), "session_id": session_id}
+        else:
+            body = {"message": f"{format_type}:{topic}", "session_id": session_id}
+        workload.append({"endpoint": endpoint, "body": body})
+    return workload
+
+
+def load_replay(path: str) -> list[dict[str, Any]]:
+    """
+    Requests from an api-server.ts message log.
+
+    Keeps CLIENT_TO_SERVER entries whose endpoint ends in one of ENDPOINTS (so
+    "/a2ui-agent/a2a/query" replays as /a2a/query), in sequence order, with
+    their offset in seconds from the first entry.
+    """
+    with open(path) as f:
+        entries = json.load(f)
+
+    workload = []
+    start = None
+    for entry in sorted(entries, key=lambda e: e.get("sequence", 0)):
+        if entry.get("direction") != "CLIENT_TO_SERVER":
+            continue
+        endpoint = next((e for e in ENDPOINTS if entry.get("endpoint", "").rstrip("/").endswith(e)), None)
+        if endpoint is None or not isinstance(entry.get("data"), dict):
+            continue
+
+        timestamp = datetime.datetime.fromisoformat(entry["timestamp"].replace("Z", "+00:00")).timestamp()
+        start = timestamp if start is None else start
+        workload.append({"endpoint": endpoint, "body": entry["data"], "offset": timestamp - start})
+    return workload
+
+
+async def _send(client: httpx.AsyncClient, request: dict[str, Any]) -> dict[str, Any]:
+    """Issue one request and time it."""
+    endpoint = request["endpoint"]
+    sample = {"endpoint": endpoint, "status": 0, "error": None, "ttfe": None, "events": 0}
+    start = time.perf_counter()
+    try:
+        if endpoint == "/a2a/stream":
+            async with client.stream("POST", endpoint, json=request["body"]) as response:
+                sample["status"] = response.status_code
+                last = None
+                async for line in response.aiter_lines():
+                    if not line.startswith("data: "):
+                        continue
+                    if sample["ttfe"] is None:
+                        sample["ttfe"] = time.perf_counter() - start
+                    sample["events"] += 1
+                    last = line[len("data: "):]
+                if last is not None and "error" in json.loads(last):
+                    sample["error"] = "error event"
+        else:
+            response = await client.post(endpoint, json=request["body"])
+            sample["status"] = response.status_code
+            if response.status_code == 200 and "error" in response.json():
+                sample["error"] = "error body"
+        if sample["status"] >= 400:
+            sample["error"] = f"HTTP {sample['status']}"
+    except Exception as e:  # Harness must survive any failure mode
+        sample["error"] = type(e).__name__
+    sample["latency"] = time.perf_counter() - start
+    return sample
+
+
+async def run_load(
+    workload: list[dict[str, Any]],
+    concurrency: int = 32,
+    speed: float = 0.0,
+    app: Any = None,
+) -> tuple[list[dict[str, Any]], float]:
+    """
+    Send the workload to the app; returns per-request samples and wall time.
+
+    With speed > 0 requests start at offset / speed (open loop, as replayed
+    from a log); otherwise `concurrency` workers send them back to back.
+    """
+    if app is None:
+        from server import app
+
+    # Unhandled errors become 500s, as behind a real server
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    limits = httpx.Limits(max_connections=None)
+    samples: list[dict[str, Any]] = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://load", timeout=None, limits=limits) as client:
+        start = time.perf_counter()
+        if speed > 0:
+            async def paced(request: dict[str, Any]) -> None:
+                await asyncio.sleep(request.get("offset", 0.0) / speed)
+                samples.append(await _send(client, request))
+
+            await asyncio.gather(*(paced(request) for request in workload))
+        else:
+            queue = iter(workload)
+
+            async def worker() -> None:
+                for request in queue:
+                    samples.append(await _send(client, request))
+
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return samples, elapsed
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+def _distribution_ms(values: list[float]) -> Optional[dict[str, float]]:
+    if not values:
+        return None
+    return {
+        "p50": round(_percentile(values, 50) * 1000, 1),
+        "p95": round(_percentile(values, 95) * 1000, 1),
+        "p99": round(_percentile(values, 99) * 1000, 1),
+        "max": round(max(values) * 1000, 1),
+    }
+
+
+def _group_stats(samples: list[dict[str, Any]], elapsed: float) -> dict[str, Any]:
+    errors: dict[str, int] = {}
+    for sample in samples:
+        if sample["error"]:
+            errors[sample["error"]] = errors.get(sample["error"], 0) + 1
+    stats = {
+        "requests": len(samples),
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "error_rate": round(sum(errors.values()) / len(samples), 4) if samples else 0.0,
+        "errors": errors,
+        "latency_ms": _distribution_ms([s["latency"] for s in samples]),
+    }
+    ttfe = [s["ttfe"] for s in samples if s["ttfe"] is not None]
+    if ttfe:
+        stats["time_to_first_event_ms"] = _distribution_ms(ttfe)
+        stats["events_per_stream"] = round(sum(s["events"] for s in samples) / len(ttfe), 1)
+    return stats
+
+
+def summarize(samples: list[dict[str, Any]], elapsed: float) -> dict[str, Any]:
+    """JSON report: overall stats plus a breakdown per endpoint."""
+    report = {"duration_s": round(elapsed, 3), "overall": _group_stats(samples, elapsed), "endpoints": {}}
+    for endpoint in ENDPOINTS:
+        group = [s for s in samples if s["endpoint"] == endpoint]
+        if group:
+            report["endpoints"][endpoint] = _group_stats(group, elapsed)
+    return report
+
+
+def check_thresholds(report: dict[str, Any], min_rps: Optional[float], max_p95_ms: Optional[float]) -> list[str]:
+    """Regression gate failures, empty when the run is within bounds."""
+    overall = report["overall"]
+    failures = []
+    if min_rps is not None and overall["throughput_rps"] < min_rps:
+        failures.append(f"throughput {overall['throughput_rps']} rps < {min_rps} rps")
+    if max_p95_ms is not None and overall["latency_ms"] and overall["latency_ms"]["p95"] > max_p95_ms:
+        failures.append(f"p95 {overall['latency_ms']['p95']}ms > {max_p95_ms}ms")
+    return failures
+
+
+async def main(args: argparse.Namespace) -> int:
+    # The backend is chosen when model_backend is imported, so set it first
+    os.environ.setdefault("MODEL_BACKEND", "local")
+    if args.latency:
+        os.environ["LOCAL_MODEL_LATENCY"] = args.latency
+    if args.error_rate is not None:
+        os.environ["LOCAL_MODEL_ERROR_RATE"] = str(args.error_rate)
+    os.environ.setdefault("LOCAL_MODEL_SEED", str(args.seed))
+
+    from server import app
+
+    if args.replay:
+        workload = load_replay(args.replay)
+    else:
+        workload = build_workload(
+            args.requests,
+            parse_mix(args.endpoints),
+            parse_mix(args.formats),
+            unique_topics=args.unique_topics,
+            seed=args.seed,
+        )
+
+    samples, elapsed = await run_load(workload, concurrency=args.concurrency, speed=args.speed, app=app)
+    report = summarize(samples, elapsed)
+    report["config"] = {
+        "backend": os.environ["MODEL_BACKEND"],
+        "latency": os.getenv("LOCAL_MODEL_LATENCY", "default"),
+        "concurrency": args.concurrency,
+        "replay": args.replay,
+        "speed": args.speed,
+    }
+    report["failures"] = check_thresholds(report, args.min_rps, args.max_p95_ms)
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    return 1 if report["failures"] else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=1000, help="Synthetic requests to send")
+    parser.add_argument("--concurrency", type=int, default=32, help="Requests in flight at once")
+    parser.add_argument("--endpoints", default=DEFAULT_ENDPOINT_MIX, help="Endpoint weights")
+    parser.add_argument("--formats", default=DEFAULT_FORMAT_MIX, help="Format weights")
+    parser.add_argument("--unique-topics", action="store_true", help="Defeat the response cache")
+    parser.add_argument("--replay", help="api-server.ts message log to replay instead")
+    parser.add_argument("--speed", type=float, default=0.0, help="Replay pacing multiplier (0 = back to back)")
+    parser.add_argument("--latency", help="LOCAL_MODEL_LATENCY for the stand-in, e.g. lognormal:0.8,0.4")
+    parser.add_argument("--error-rate", type=float, help="LOCAL_MODEL_ERROR_RATE for the stand-in")
+    parser.add_argument("--min-rps", type=float, help="Fail below this overall throughput")
+    parser.add_argument("--max-p95-ms", type=float, help="Fail above this overall p95 latency")
+    parser.add_argument("--output", help="Also write the report to this file")
+    parser.add_argument("--seed", type=int, default=7)
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -1,14 +1,41 @@
+"""
+Regression suite for generated content.
+
+Runs TEST_CASES concurrently (--concurrency) and compares each result with
+baseline_outputs.json, where every case stores its output next to the latency
+and Gemini token usage measured when the baseline was saved:
+
+  {"flashcards:...": {"output": {...}, "latency_ms": 812.4, "prompt_tokens": 2210,
+                      "output_tokens": 143, "backend": "gemini"}}
+
+Outputs are compared by A2UI structure (message kinds, root and component
+types) and validated against the format's A2UI schema rather than diffed as
+text, so nondeterministic wording, item counts and optional properties pass
+while a missing, renamed or malformed component fails. Latency and token
+usage regress when they exceed the baseline by more than --latency-ratio
+(plus --latency-slack-ms) or --token-ratio; they are only compared when the
+baseline was recorded on the same backend.
+
+Usage:
+  python tests/regression_suite.py --save                     # record a baseline
+  python tests/regression_suite.py --concurrency 10
+  python tests/regression_suite.py --backend local --render-mode llm
+"""
+
+import argparse
 import asyncio
+import contextvars
 import json
 import os
 import sys
+import time
 from pathlib import Path
-import difflib
+from typing import Any, Optional
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from agent import get_agent
+from a2ui_schemas import validate_a2ui
 
 TEST_CASES = [
     {"format": "flashcards", "context": "tell me about your AI skills"},
@@ -25,64 +52,139 @@ TEST_CASES = [
 
 BASELINE_FILE = Path(__file__).parent / "baseline_outputs.json"
 
-async def run_tests(save_baseline=False):
-    agent = get_agent()
-    current_outputs = {}
-    
-    print(f"Running {len(TEST_CASES)} regression tests...")
-    
-    for case in TEST_CASES:
-        format_type = case["format"]
-        context = case["context"]
-        test_id = f"{format_type}:{context}"
-        
-        print(f"Testing: {test_id}")
+# Token usage of the model calls made by the current case
+_usage: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar("usage", default=None)
+
+
+def a2ui_structure(a2ui: Any) -> dict[str, Any]:
+    """The parts of an A2UI message list that must not change between runs."""
+    if not isinstance(a2ui, list):
+        return {"invalid": type(a2ui).__name__}
+
+    kinds, root, component_types = [], None, set()
+    for message in a2ui:
+        kind = next(iter(message), None) if isinstance(message, dict) else None
+        if kind not in kinds:
+            kinds.append(kind)
+        if kind == "beginRendering":
+            root = message[kind].get("root")
+        if kind == "surfaceUpdate":
+            for component in message[kind].get("components", []):
+                component_types.update(component.get("component", {}))
+    return {"messages": kinds, "root": root, "components": sorted(component_types)}
+
+
+def structure_diff(format_type: str, baseline: dict[str, Any], current: dict[str, Any]) -> list[str]:
+    """
+    Differences between two outputs' A2UI structure, plus schema errors in
+    the current output (which cover required properties of each component).
+    """
+    if "error" in current:
+        return [f"error: {current['error']}"]
+    before, after = a2ui_structure(baseline.get("a2ui")), a2ui_structure(current.get("a2ui"))
+    diffs = [f"{key}: {before.get(key)} -> {after.get(key)}" for key in ("invalid", "messages", "root", "components") if before.get(key) != after.get(key)]
+    return diffs + [f"invalid A2UI: {error}" for error in validate_a2ui(format_type, current.get("a2ui"))]
+
+
+def _entry(record: dict[str, Any]) -> dict[str, Any]:
+    # Baselines saved before metrics were recorded hold the bare output
+    return record if "output" in record else {"output": record}
+
+
+def _metric_regressions(baseline: dict[str, Any], current: dict[str, Any], args: argparse.Namespace) -> list[str]:
+    if baseline.get("backend") != current["backend"]:
+        return []
+    regressions = []
+    if baseline.get("latency_ms") is not None:
+        limit = baseline["latency_ms"] * args.latency_ratio + args.latency_slack_ms
+        if current["latency_ms"] > limit:
+            regressions.append(f"latency {current['latency_ms']}ms > {limit:.1f}ms (baseline {baseline['latency_ms']}ms)")
+    for key in ("prompt_tokens", "output_tokens"):
+        if baseline.get(key):
+            limit = baseline[key] * args.token_ratio
+            if current[key] > limit:
+                regressions.append(f"{key} {current[key]} > {limit:.0f} (baseline {baseline[key]})")
+    return regressions
+
+
+def _track_usage(agent: Any) -> None:
+    """Attribute each model call's token usage to the case that made it."""
+    call_model = agent._call_model
+
+    async def tracked(*args, **kwargs):
+        response = await call_model(*args, **kwargs)
+        usage, metadata = _usage.get(), getattr(response, "usage_metadata", None)
+        if usage is not None and metadata is not None:
+            usage["prompt_tokens"] += metadata.prompt_token_count or 0
+            usage["output_tokens"] += metadata.candidates_token_count or 0
+        return response
+
+    agent._call_model = tracked
+
+
+async def run_case(agent: Any, case: dict[str, str], semaphore: asyncio.Semaphore, render_mode: Optional[str], backend: str) -> dict[str, Any]:
+    """Generate one case and measure it."""
+    usage = {"prompt_tokens": 0, "output_tokens": 0}
+    _usage.set(usage)
+    async with semaphore:
+        start = time.perf_counter()
         try:
-            result = await agent.generate_content(format_type, context)
-            # Remove transient or randomized fields if any (like session IDs if they were in the output)
-            # In this agent, the output is mostly stable A2UI
-            current_outputs[test_id] = result
+            output = await agent.generate_content(case["format"], case["context"], render_mode=render_mode)
         except Exception as e:
-            print(f"Error testing {test_id}: {e}")
-            current_outputs[test_id] = {"error": str(e)}
+            output = {"error": str(e)}
+        latency = time.perf_counter() - start
+    return {"output": output, "latency_ms": round(latency * 1000, 1), **usage, "backend": backend}
+
+
+async def run_tests(args: argparse.Namespace) -> bool:
+    # The backend is chosen when model_backend is imported, so set it first
+    if args.backend:
+        os.environ["MODEL_BACKEND"] = args.backend
+    backend = os.environ.setdefault("MODEL_BACKEND", "gemini")
 
-    if save_baseline:
-        with open(BASELINE_FILE, "w") as f:
-            json.dump(current_outputs, f, indent=2)
-        print(f"\nBaseline saved to {BASELINE_FILE}")
+    from agent import get_agent
+
+    agent = get_agent()
+    _track_usage(agent)
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    print(f"Running {len(TEST_CASES)} regression tests on {backend} (concurrency {args.concurrency})...")
+    start = time.perf_counter()
+    entries = await asyncio.gather(*(run_case(agent, case, semaphore, args.render_mode, backend) for case in TEST_CASES))
+    print(f"Finished in {time.perf_counter() - start:.2f}s")
+
+    current = {}
+    for case, entry in zip(TEST_CASES, entries):
+        test_id = f"{case['format']}:{case['context']}"
+        current[test_id] = entry
+        print(f"  {test_id}: {entry['latency_ms']}ms, {entry['prompt_tokens']} prompt / {entry['output_tokens']} output tokens")
+
+    baseline_file = Path(args.baseline)
+    if args.save:
+        with open(baseline_file, "w") as f:
+            json.dump(current, f, indent=2)
+        print(f"\nBaseline saved to {baseline_file}")
         return True
 
-    if not BASELINE_FILE.exists():
-        print(f"\nNo baseline found at {BASELINE_FILE}. Run with --save to create one.")
+    if not baseline_file.exists():
+        print(f"\nNo baseline found at {baseline_file}. Run with --save to create one.")
         return False
 
-    with open(BASELINE_FILE, "r") as f:
-        baseline_outputs = json.load(f)
+    with open(baseline_file, "r") as f:
+        baseline_outputs = {test_id: _entry(record) for test_id, record in json.load(f).items()}
 
     regressions = []
-    for test_id, current_result in current_outputs.items():
+    for test_id, entry in current.items():
         if test_id not in baseline_outputs:
             print(f"New test case: {test_id} (not in baseline)")
             continue
-            
-        baseline_result = baseline_outputs[test_id]
-        
-        # Simple JSON comparison
-        if current_result != baseline_result:
+
+        baseline = baseline_outputs[test_id]
+        problems = structure_diff(entry["output"].get("format", test_id.split(":", 1)[0]), baseline["output"], entry["output"]) + _metric_regressions(baseline, entry, args)
+        if problems:
             print(f"\nREGRESSION DETECTED: {test_id}")
-            
-            # Detailed diff for the A2UI content
-            baseline_str = json.dumps(baseline_result.get("a2ui", baseline_result), indent=2)
-            current_str = json.dumps(current_result.get("a2ui", current_result), indent=2)
-            
-            diff = difflib.unified_diff(
-                baseline_str.splitlines(),
-                current_str.splitlines(),
-                fromfile="baseline",
-                tofile="current",
-                lineterm=""
-            )
-            print("\n".join(list(diff)))
+            for problem in problems:
+                print(f"  - {problem}")
             regressions.append(test_id)
 
     if regressions:
@@ -92,11 +194,18 @@ async def run_tests(save_baseline=False):
         print("\nAll tests passed! No regressions detected.")
         return True
 
+
 if __name__ == "__main__":
-    import argparse
     parser = argparse.ArgumentParser()
     parser.add_argument("--save", action="store_true", help="Save current outputs as baseline")
+    parser.add_argument("--baseline", default=str(BASELINE_FILE), help="Baseline file")
+    parser.add_argument("--concurrency", type=int, default=4, help="Cases generated at once")
+    parser.add_argument("--backend", choices=("gemini", "local"), help="MODEL_BACKEND to run against")
+    parser.add_argument("--render-mode", choices=("deterministic", "llm"), help="Force a render mode for every case")
+    parser.add_argument("--latency-ratio", type=float, default=1.5, help="Fail above this multiple of baseline latency")
+    parser.add_argument("--latency-slack-ms", type=float, default=100.0, help="Absolute latency allowance on top of the ratio")
+    parser.add_argument("--token-ratio", type=float, default=1.2, help="Fail above this multiple of baseline tokens")
     args = parser.parse_args()
-    
-    success = asyncio.run(run_tests(save_baseline=args.save))
+
+    success = asyncio.run(run_tests(args))
     sys.exit(0 if success else 1)
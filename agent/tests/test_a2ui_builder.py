@@ -0,0 +1,152 @@
+"""
+Unit tests for server-side A2UI assembly.
+
+Tests cover:
+- A content schema for every supported format, accepted by GenerateContentConfig
+- The prompt examples match the content schemas
+- Built surfaces pass A2UI validation and are much larger than their content
+- Incremental building matches the one-shot build
+- The agent sending content schemas and assembling model output
+"""
+
+import json
+import os
+import sys
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from google.genai import types
+
+# Add parent directories to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from a2ui_builder import LIST_LAYOUTS, build, content_errors, get_content_schema, surface_stream
+from a2ui_schemas import validate_a2ui
+from a2ui_templates import CONTENT_EXAMPLES
+from agent import LearningMaterialAgent
+from renderers import render
+
+EXAMPLES = {name: json.loads(example) for name, example in CONTENT_EXAMPLES.items()}
+
+
+def _merge_surface(messages):
+    """Apply streamed messages the way the renderer does: components by ID."""
+    components = {}
+    root = None
+    for message in messages:
+        if "beginRendering" in message:
+            root = message["beginRendering"]["root"]
+        for component in message.get("surfaceUpdate", {}).get("components", []):
+            components[component["id"]] = component
+    return root, components
+
+
+class TestContentSchemas(unittest.TestCase):
+    """Tests for the content the model is asked for."""
+
+    def test_every_supported_format_has_a_content_schema(self):
+        for format_type in LearningMaterialAgent.SUPPORTED_FORMATS:
+            with self.subTest(format=format_type):
+                schema = get_content_schema(format_type)
+                self.assertIsNotNone(schema)
+                types.GenerateContentConfig(response_mime_type="application/json", response_schema=schema)
+
+    def test_prompt_examples_match_schemas(self):
+        for format_type, content in EXAMPLES.items():
+            with self.subTest(format=format_type):
+                self.assertEqual(content_errors(format_type, content), [])
+
+    def test_content_errors(self):
+        self.assertEqual(content_errors("awards", []), ["$: empty content"])
+        self.assertEqual(content_errors("awards", [{"title": "Award"}]), ["$[0]: missing 'description'"])
+        self.assertEqual(
+            content_errors("image", {"variant": "gif", "url": "/a.gif", "alt": ""}),
+            ["$.variant: expected one of ['image', 'profile_bubble']"],
+        )
+
+
+class TestBuild(unittest.TestCase):
+    """Tests for build() and SurfaceStream."""
+
+    def test_built_surfaces_are_valid(self):
+        for format_type, content in EXAMPLES.items():
+            with self.subTest(format=format_type):
+                self.assertEqual(validate_a2ui(format_type, build(format_type, content)), [])
+
+    def test_content_is_much_smaller_than_a2ui(self):
+        """Verify the model writes a fraction of the characters it used to."""
+        for format_type, content in EXAMPLES.items():
+            with self.subTest(format=format_type):
+                ratio = len(json.dumps(build(format_type, content))) / len(json.dumps(content))
+                self.assertGreater(ratio, 2.5)
+
+    def test_quiz_option_values_are_unique(self):
+        quiz = build("quiz", EXAMPLES["quiz"])[1]["surfaceUpdate"]["components"][1]["component"]["QuizCard"]
+        self.assertEqual([o["value"] for o in quiz["options"]], ["a", "b", "c"])
+        self.assertEqual([o["isCorrect"] for o in quiz["options"]], [False, True, False])
+
+    def test_blog_cards_wrap_rows(self):
+        cards = [{"title": f"Post {i}", "description": ""} for i in range(5)]
+        _, components = _merge_surface(build("blog_cards", cards))
+
+        self.assertEqual(components["mainColumn"]["component"]["Column"]["children"]["explicitList"], ["header", "blogRow1", "blogRow2"])
+        self.assertEqual(components["blogRow2"]["component"]["Row"]["children"]["explicitList"], ["b4", "b5"])
+
+    def test_stream_matches_build(self):
+        """Verify the streamed surface equals the one-shot build for every list format."""
+        for format_type in LIST_LAYOUTS:
+            content = EXAMPLES.get(format_type, EXAMPLES["flashcards"]) * 3
+            with self.subTest(format=format_type):
+                stream = surface_stream(format_type)
+                messages = [message for item in content for message in stream.add(item)]
+
+                self.assertIn("beginRendering", messages[0])
+                self.assertEqual(_merge_surface(messages), _merge_surface(build(format_type, content)))
+
+    def test_single_surface_formats_do_not_stream(self):
+        self.assertIsNone(surface_stream("creative"))
+        with self.assertRaises(ValueError):
+            build("matrix", {})
+
+
+class TestAgentContentGeneration(unittest.IsolatedAsyncioTestCase):
+    """Tests for content generation in LearningMaterialAgent."""
+
+    def setUp(self):
+        patcher = patch("agent.genai.Client")
+        self.addCleanup(patcher.stop)
+        self.client = MagicMock()
+        self.client.aio.models.generate_content = AsyncMock()
+        self.client.aio.caches.create = AsyncMock(side_effect=Exception("caching unavailable"))
+        patcher.start().return_value = self.client
+
+    def _respond(self, text):
+        response = MagicMock()
+        response.text = text
+        self.client.aio.models.generate_content.return_value = response
+
+    async def test_config_carries_content_schema(self):
+        self._respond(json.dumps(EXAMPLES["quiz"]))
+        result = await LearningMaterialAgent().generate_content("quiz", "career")
+
+        self.assertEqual(result["a2ui"], build("quiz", EXAMPLES["quiz"]))
+        config = self.client.aio.models.generate_content.call_args.kwargs["config"]
+        self.assertEqual(config.response_mime_type, "application/json")
+        self.assertEqual(config.response_schema, get_content_schema("quiz"))
+
+    async def test_invalid_content_is_an_error(self):
+        self._respond(json.dumps([{"question": "?"}]))
+        result = await LearningMaterialAgent().generate_content("quiz", "career")
+        self.assertEqual(result["error"], "Failed to generate UI components")
+
+    async def test_invalid_content_falls_back_to_renderer(self):
+        """Verify a data-backed format serves its rendering instead of an error."""
+        self._respond("not json")
+        result = await LearningMaterialAgent().generate_content("awards", render_mode="llm")
+
+        self.assertNotIn("error", result)
+        self.assertEqual(result["a2ui"], render("awards"))
+
+
+if __name__ == "__main__":
+    unittest.main()
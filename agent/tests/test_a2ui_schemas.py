@@ -0,0 +1,114 @@
+"""
+Unit tests for the A2UI response schemas and validators.
+
+Tests cover:
+- A schema for every supported format
+- Component shapes inferred from the templates
+- Schema and structural validation errors
+- Validators built on first use, not at import
+"""
+
+import copy
+import os
+import subprocess
+import sys
+import unittest
+
+AGENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Add parent directories to path for imports
+sys.path.insert(0, AGENT_DIR)
+
+from a2ui_schemas import get_a2ui_schema, get_validator, validate_a2ui
+from agent import LearningMaterialAgent
+from renderers import DETERMINISTIC_FORMATS, render
+
+QUIZ = [
+    {"beginRendering": {"surfaceId": "portfolioContent", "root": "mainColumn"}},
+    {"surfaceUpdate": {"surfaceId": "portfolioContent", "components": [
+        {"id": "mainColumn", "component": {"Column": {"children": {"explicitList": ["q1"]}, "distribution": "start", "alignment": "stretch"}}},
+        {"id": "q1", "component": {"QuizCard": {
+            "question": {"literalString": "Which cloud?"},
+            "options": [{"label": {"literalString": "Google"}, "value": "google", "isCorrect": True}],
+            "explanation": {"literalString": "Google Cloud."},
+            "category": {"literalString": "Career"},
+        }}},
+    ]}},
+]
+
+
+def _components(schema):
+    return schema["items"]["properties"]["surfaceUpdate"]["properties"]["components"]["items"]["properties"]["component"]["properties"]
+
+
+class TestResponseSchemas(unittest.TestCase):
+    """Tests for the generated schemas."""
+
+    def test_every_supported_format_has_a_schema(self):
+        for format_type in LearningMaterialAgent.SUPPORTED_FORMATS:
+            with self.subTest(format=format_type):
+                self.assertIsNotNone(get_a2ui_schema(format_type))
+
+    def test_shapes_come_from_templates(self):
+        """Verify component properties match the template examples."""
+        experience = _components(get_a2ui_schema("timeline"))["ExperienceCard"]
+        self.assertEqual(experience["properties"]["highlights"], {"type": "array", "items": {"type": "string"}})
+        self.assertIn("impact", experience["required"])
+
+        option = _components(get_a2ui_schema("quiz"))["QuizCard"]["properties"]["options"]["items"]
+        self.assertEqual(option["properties"]["isCorrect"], {"type": "boolean"})
+
+    def test_formats_only_allow_their_components(self):
+        self.assertEqual(get_validator("quiz").component_types, {"Column", "Row", "Text", "QuizCard"})
+        self.assertIn("ProfileBubble", get_validator("image").component_types)
+        self.assertNotIn("QuizCard", get_validator("certs").component_types)
+
+    def test_nothing_built_at_import(self):
+        code = "import a2ui_builder, a2ui_schemas; print(len(a2ui_schemas._VALIDATORS))"
+        out = subprocess.run([sys.executable, "-c", code], cwd=AGENT_DIR, capture_output=True, text=True, check=True)
+        self.assertEqual(out.stdout.strip(), "0")
+
+
+class TestValidation(unittest.TestCase):
+    """Tests for validate_a2ui."""
+
+    def test_valid_output(self):
+        self.assertEqual(validate_a2ui("quiz", QUIZ), [])
+
+    def test_renderer_output_is_valid(self):
+        for format_type in DETERMINISTIC_FORMATS:
+            with self.subTest(format=format_type):
+                self.assertEqual(validate_a2ui(format_type, render(format_type)), [])
+
+    def test_missing_and_mistyped_fields(self):
+        messages = copy.deepcopy(QUIZ)
+        quiz = messages[1]["surfaceUpdate"]["components"][1]["component"]["QuizCard"]
+        del quiz["explanation"]
+        quiz["options"][0]["isCorrect"] = "yes"
+
+        errors = validate_a2ui("quiz", messages)
+        self.assertIn("$[1].surfaceUpdate.components[1].component.QuizCard: missing 'explanation'", errors)
+        self.assertIn("$[1].surfaceUpdate.components[1].component.QuizCard.options[0].isCorrect: expected boolean", errors)
+
+    def test_component_not_allowed_for_format(self):
+        errors = validate_a2ui("certs", QUIZ)
+        self.assertTrue(any("exactly one known type" in e for e in errors))
+
+    def test_structural_errors(self):
+        messages = copy.deepcopy(QUIZ)
+        messages[0]["beginRendering"]["root"] = "missing"
+        components = messages[1]["surfaceUpdate"]["components"]
+        components[0]["component"]["Column"]["children"]["explicitList"].append("ghost")
+        components.append(copy.deepcopy(components[1]))
+
+        errors = validate_a2ui("quiz", messages)
+        self.assertIn("root 'missing' is not a component", errors)
+        self.assertIn("'mainColumn' references unknown child 'ghost'", errors)
+        self.assertIn("duplicate component id 'q1'", errors)
+
+    def test_not_a_message_list(self):
+        self.assertEqual(validate_a2ui("quiz", {"text": "hi"}), ["$: expected array"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+"""
+Unit tests for the incremental A2UI stream parser.
+
+Tests:
+- Messages are emitted as soon as they are complete, regardless of chunking
+- surfaceUpdate components are emitted one at a time
+- Markdown fences and strings containing brackets are handled
+"""
+
+import json
+import unittest
+
+import sys
+import os
+
+# Add parent directories to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from a2ui_stream import A2UIStreamParser
+
+PAYLOAD = [
+    {"beginRendering": {"surfaceId": "portfolioContent", "root": "mainColumn"}},
+    {
+        "surfaceUpdate": {
+            "surfaceId": "portfolioContent",
+            "components": [
+                {"id": "mainColumn", "component": {"Column": {"children": {"explicitList": ["card1", "card2"]}}}},
+                {"id": "card1", "component": {"Flashcard": {"front": {"literalString": "What is [A2UI]?"}, "back": {"literalString": "A \"UI\" protocol {v0.8}"}}}},
+                {"id": "card2", "component": {"Flashcard": {"front": {"literalString": "Q2"}, "back": {"literalString": "A2"}}}},
+            ],
+        }
+    },
+]
+
+
+def _feed_in_chunks(parser, text, size):
+    messages = []
+    for i in range(0, len(text), size):
+        messages.extend(parser.feed(text[i:i + size]))
+    return messages
+
+
+class TestA2UIStreamParser(unittest.TestCase):
+    """Tests for A2UIStreamParser."""
+
+    def test_emits_begin_rendering_and_each_component(self):
+        """Verify one message per beginRendering and per component."""
+        parser = A2UIStreamParser()
+        messages = parser.feed(json.dumps(PAYLOAD))
+
+        self.assertEqual(len(messages), 4)
+        self.assertEqual(messages[0], PAYLOAD[0])
+        components = [m["surfaceUpdate"]["components"][0] for m in messages[1:]]
+        self.assertEqual(components, PAYLOAD[1]["surfaceUpdate"]["components"])
+        self.assertTrue(parser.done)
+
+    def test_chunking_does_not_change_output(self):
+        """Verify the same messages are produced for any chunk size."""
+        text = json.dumps(PAYLOAD, indent=2)
+        expected = A2UIStreamParser().feed(text)
+
+        for size in (1, 3, 7, 64):
+            self.assertEqual(_feed_in_chunks(A2UIStreamParser(), text, size), expected)
+
+    def test_message_emitted_before_payload_completes(self):
+        """Verify beginRendering is available before the rest has arrived."""
+        text = json.dumps(PAYLOAD)
+        cut = text.index("surfaceUpdate")
+
+        parser = A2UIStreamParser()
+        first = parser.feed(text[:cut])
+        self.assertEqual(first, [PAYLOAD[0]])
+        self.assertFalse(parser.done)
+
+    def test_components_carry_surface_id(self):
+        """Verify streamed components use the surfaceId from the payload."""
+        payload = json.loads(json.dumps(PAYLOAD).replace("portfolioContent", "otherSurface"))
+        messages = A2UIStreamParser().feed(json.dumps(payload))
+
+        for message in messages[1:]:
+            self.assertEqual(message["surfaceUpdate"]["surfaceId"], "otherSurface")
+
+    def test_ignores_markdown_fences(self):
+        """Verify text around the JSON array is ignored."""
+        text = "```json\n" + json.dumps(PAYLOAD) + "\n```"
+        messages = _feed_in_chunks(A2UIStreamParser(), text, 5)
+        self.assertEqual(len(messages), 4)
+
+    def test_other_messages_emitted_whole(self):
+        """Verify non-surfaceUpdate messages are emitted when complete."""
+        payload = [
+            {"beginRendering": {"surfaceId": "s", "root": "r"}},
+            {"dataModelUpdate": {"surfaceId": "s", "contents": [{"key": "k"}]}},
+        ]
+        messages = A2UIStreamParser().feed(json.dumps(payload))
+        self.assertEqual(messages, payload)
+
+
+if __name__ == "__main__":
+    unittest.main()
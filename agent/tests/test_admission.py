@@ -0,0 +1,162 @@
+"""
+Unit tests for admission control.
+
+Tests cover:
+- The concurrency bound
+- Fast rejection when the wait queue is full or the deadline passes
+- Token-bucket pacing and 429 when a token cannot arrive in time
+- Upstream 429s pausing admissions and surfacing as 429 + Retry-After
+"""
+
+import asyncio
+import itertools
+import os
+import sys
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+import httpx
+
+# Add parent directories to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import server
+from admission import AdmissionController, AdmissionRejected, TokenBucket
+
+
+class TestAdmissionController(unittest.IsolatedAsyncioTestCase):
+    """Tests for AdmissionController."""
+
+    async def _hold(self, controller, seconds, started=None):
+        async with controller.admit():
+            if started is not None:
+                started.append(time.monotonic())
+            await asyncio.sleep(seconds)
+
+    async def test_concurrency_is_bounded(self):
+        """Verify no more than max_concurrency callers hold a slot at once."""
+        controller = AdmissionController(max_concurrency=2, max_queue=10, queue_timeout=5)
+        peak = 0
+
+        async def call():
+            nonlocal peak
+            async with controller.admit():
+                peak = max(peak, controller.active)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(call() for _ in range(6)))
+        self.assertEqual(peak, 2)
+        self.assertEqual(controller.stats()["admitted"], 6)
+
+    async def test_full_queue_rejects_immediately(self):
+        """Verify a caller beyond the queue bound gets a fast 503."""
+        controller = AdmissionController(max_concurrency=1, max_queue=1, queue_timeout=5)
+        holder = asyncio.create_task(self._hold(controller, 0.1))
+        waiter = asyncio.create_task(self._hold(controller, 0))
+        await asyncio.sleep(0.01)
+
+        start = time.monotonic()
+        with self.assertRaises(AdmissionRejected) as ctx:
+            async with controller.admit():
+                pass
+        self.assertLess(time.monotonic() - start, 0.05)
+        self.assertEqual(ctx.exception.status_code, 503)
+        self.assertGreaterEqual(ctx.exception.retry_after, 1)
+
+        await asyncio.gather(holder, waiter)
+        self.assertEqual(controller.stats()["rejected"], 1)
+
+    async def test_queue_deadline(self):
+        """Verify a caller waiting past queue_timeout is rejected."""
+        controller = AdmissionController(max_concurrency=1, max_queue=5, queue_timeout=0.02)
+        holder = asyncio.create_task(self._hold(controller, 0.1))
+        await asyncio.sleep(0.01)
+
+        with self.assertRaises(AdmissionRejected) as ctx:
+            async with controller.admit():
+                pass
+        self.assertEqual(ctx.exception.status_code, 503)
+        await holder
+
+    async def test_slot_after_deadline_without_rate_limit_is_503(self):
+        """Verify a slot acquired too late is a queue timeout, not a rate limit."""
+        controller = AdmissionController(max_concurrency=1, queue_timeout=0.05)
+        # Every clock read is a second later, as if the event loop had stalled
+        with patch("admission.time.monotonic", side_effect=itertools.count(100)):
+            with self.assertRaises(AdmissionRejected) as ctx:
+                async with controller.admit():
+                    pass
+        self.assertEqual(ctx.exception.status_code, 503)
+        self.assertIn("Timed out", str(ctx.exception))
+
+    async def test_token_bucket_paces_calls(self):
+        """Verify calls beyond the burst wait for tokens."""
+        controller = AdmissionController(max_concurrency=10, queue_timeout=5, rate=50, burst=1)
+        started = []
+        await asyncio.gather(*(self._hold(controller, 0, started) for _ in range(3)))
+
+        # 1 immediately, then one every 20ms
+        self.assertGreaterEqual(max(started) - min(started), 0.035)
+
+    async def test_rate_limit_past_deadline_is_429(self):
+        """Verify a token that cannot arrive before the deadline gives a 429."""
+        controller = AdmissionController(max_concurrency=10, queue_timeout=0.05, rate=1, burst=1)
+        async with controller.admit():
+            pass
+
+        with self.assertRaises(AdmissionRejected) as ctx:
+            async with controller.admit():
+                pass
+        self.assertEqual(ctx.exception.status_code, 429)
+        self.assertEqual(ctx.exception.retry_after_header, "1")
+
+    async def test_upstream_throttle_pauses_admissions(self):
+        """Verify note_throttled holds back the next caller."""
+        controller = AdmissionController(max_concurrency=10, queue_timeout=0.05)
+        rejection = controller.note_throttled(backoff=2)
+        self.assertEqual(rejection.status_code, 429)
+
+        with self.assertRaises(AdmissionRejected):
+            async with controller.admit():
+                pass
+        self.assertEqual(controller.stats()["throttled"], 1)
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Tests for TokenBucket."""
+
+    def test_unlimited(self):
+        bucket = TokenBucket(rate=0)
+        self.assertEqual([bucket.reserve() for _ in range(100)], [0.0] * 100)
+
+    def test_reservations_queue_up(self):
+        bucket = TokenBucket(rate=10, burst=2)
+        waits = [bucket.reserve() for _ in range(4)]
+        self.assertEqual(waits[:2], [0.0, 0.0])
+        self.assertAlmostEqual(waits[2], 0.1, places=2)
+        self.assertAlmostEqual(waits[3], 0.2, places=2)
+
+
+class TestRejectionResponse(unittest.IsolatedAsyncioTestCase):
+    """Tests for the server's handling of AdmissionRejected."""
+
+    async def test_generate_returns_429_with_retry_after(self):
+        """Verify /generate sheds load with 429 and a Retry-After header."""
+        agent = MagicMock()
+
+        async def rejected(*args, **kwargs):
+            raise AdmissionRejected("Model quota exhausted", 4.2, 429)
+
+        agent.generate_content = rejected
+        transport = httpx.ASGITransport(app=server.app)
+        with patch.object(server, "get_agent", return_value=agent):
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                response = await client.post("/generate", json={"format": "quiz"})
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.headers["retry-after"], "5")
+
+
+if __name__ == "__main__":
+    unittest.main()
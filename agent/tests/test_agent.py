@@ -166,8 +166,10 @@ def test_system_prompt_flashcards():
     prompt = get_system_prompt("flashcards", context)
     assert "flashcards" in prompt.lower()
     assert context in prompt
-    assert SURFACE_ID in prompt
-    assert "Flashcard" in prompt
+    # The model returns compact content; surfaces are added by a2ui_builder
+    assert SURFACE_ID not in prompt
+    assert "beginRendering" not in prompt
+    assert '"front"' in prompt and '"back"' in prompt
 
 
 @test("get_system_prompt generates audio prompt")
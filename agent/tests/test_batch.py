@@ -0,0 +1,101 @@
+"""
+Unit tests for the /generate/batch endpoint.
+
+Tests cover:
+- Results stream in completion order, tagged with their item index
+- Per-item errors are reported without failing the batch
+- Concurrency is bounded by BATCH_MAX_CONCURRENCY
+- NDJSON and SSE encodings
+"""
+
+import asyncio
+import json
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+# Add parent directories to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import server
+
+
+class FakeAgent:
+    """generate_content with a per-format delay; "bad" errors, "raise" raises."""
+
+    DELAYS = {"slow": 0.05}
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+
+    async def generate_content(self, format_type, context_topic="", render_mode=None):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.DELAYS.get(format_type, 0.01))
+            if format_type == "raise":
+                raise RuntimeError("backend down")
+            if format_type == "bad":
+                return {"error": f"Unsupported format: {format_type}"}
+            return {"format": format_type, "a2ui": [], "context": context_topic}
+        finally:
+            self.active -= 1
+
+
+class TestBatchEndpoint(unittest.IsolatedAsyncioTestCase):
+    """Tests for POST /generate/batch."""
+
+    def setUp(self):
+        self.agent = FakeAgent()
+        patcher = patch.object(server, "get_agent", return_value=self.agent)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def _post(self, body):
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/generate/batch", json=body)
+
+    async def test_ndjson_in_completion_order(self):
+        """Verify every item is returned, fastest first, with its index."""
+        response = await self._post({"items": [{"format": "slow"}, {"format": "timeline", "context": "career"}]})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["content-type"], "application/x-ndjson")
+        entries = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual([e["index"] for e in entries], [1, 0])
+        self.assertEqual(entries[0]["result"]["context"], "career")
+
+    async def test_item_errors_do_not_fail_batch(self):
+        """Verify failing items are reported alongside successful ones."""
+        response = await self._post({"items": [{"format": "bad"}, {"format": "raise"}, {"format": "awards"}]})
+
+        self.assertEqual(response.status_code, 200)
+        entries = {e["index"]: e for e in map(json.loads, response.text.splitlines())}
+        self.assertIn("Unsupported format", entries[0]["error"])
+        self.assertEqual(entries[1]["error"], "backend down")
+        self.assertEqual(entries[2]["result"]["format"], "awards")
+
+    async def test_concurrency_is_bounded(self):
+        """Verify no more than the configured limit run at once."""
+        with patch.object(server, "BATCH_MAX_CONCURRENCY", 2):
+            response = await self._post({"items": [{"format": f"f{i}"} for i in range(6)], "concurrency": 10})
+
+        self.assertEqual(len(response.text.splitlines()), 6)
+        self.assertEqual(self.agent.peak, 2)
+
+    async def test_sse_encoding(self):
+        """Verify stream="sse" emits one data event per item."""
+        response = await self._post({"items": [{"format": "certs"}, {"format": "awards"}], "stream": "sse"})
+
+        self.assertTrue(response.headers["content-type"].startswith("text/event-stream"))
+        events = [json.loads(line[len("data: "):]) for line in response.text.split("\n\n") if line]
+        self.assertEqual(sorted(e["format"] for e in events), ["awards", "certs"])
+
+
+if __name__ == "__main__":
+    unittest.main()
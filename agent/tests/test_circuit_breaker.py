@@ -0,0 +1,276 @@
+"""
+Unit tests for circuit breakers and stale-while-revalidate.
+
+Tests cover:
+- Breaker transitions: open after consecutive failures, one half-open probe,
+  closing on success and reopening on failure
+- Probes released when they end without an outcome or are presumed lost
+- The stale snapshot in both baseline formats, matched by format and topic
+- Failed, short-circuited and over-deadline generations served stale from
+  the response cache or the snapshot, with the refresh finishing in the
+  background
+- Admission rejections and cancelled streams not counted as model failures
+- An open breaker with nothing stale answering 503 with Retry-After
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+# The agent imports the SDK on its first generation; keep that out of the timings
+import google.genai.types  # noqa: F401
+import httpx
+
+# Add parent directories to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import agent as agent_module
+import circuit_breaker
+import server
+from a2ui_builder import get_content_schema
+from admission import AdmissionRejected
+from agent import LearningMaterialAgent
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, StaleSnapshot
+from context_cache import ContextCacheStore
+from context_projections import Portfolio, PORTFOLIO_SECTIONS
+from model_backend import synthesize
+
+QUIZ_TEXT = json.dumps(synthesize(get_content_schema("quiz")))
+GOOD = {"format": "quiz", "a2ui": [{"beginRendering": {"surfaceId": "portfolioContent", "root": "old"}}], "surfaceId": "portfolioContent"}
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Tests for CircuitBreaker."""
+
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CLOSED)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, OPEN)
+        self.assertFalse(breaker.allow())
+        self.assertEqual(breaker.stats()["short_circuits"], 1)
+
+    def test_half_open_probe(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+        with patch.object(circuit_breaker.time, "monotonic", return_value=100.0):
+            breaker.record_failure()
+        with patch.object(circuit_breaker.time, "monotonic", return_value=111.0):
+            self.assertEqual(breaker.state, HALF_OPEN)
+            self.assertTrue(breaker.allow())
+            self.assertFalse(breaker.allow())
+            breaker.record_failure()
+            self.assertEqual(breaker.state, OPEN)
+        with patch.object(circuit_breaker.time, "monotonic", return_value=122.0):
+            self.assertTrue(breaker.allow())
+            breaker.record_success()
+        self.assertEqual(breaker.state, CLOSED)
+        self.assertEqual(breaker.stats()["opened"], 2)
+
+    def test_released_and_lost_probes(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+        with patch.object(circuit_breaker.time, "monotonic", return_value=100.0):
+            breaker.record_failure()
+        with patch.object(circuit_breaker.time, "monotonic", return_value=111.0):
+            self.assertTrue(breaker.allow())
+            breaker.record(None)
+            self.assertTrue(breaker.allow())
+            self.assertFalse(breaker.allow())
+        # The probe never reported back
+        with patch.object(circuit_breaker.time, "monotonic", return_value=121.0):
+            self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.state, HALF_OPEN)
+
+    def test_retry_after(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+        self.assertEqual(breaker.retry_after(), 0)
+        with patch.object(circuit_breaker.time, "monotonic", return_value=100.0):
+            breaker.record_failure()
+        with patch.object(circuit_breaker.time, "monotonic", return_value=110.0):
+            self.assertEqual(breaker.retry_after(), 20)
+
+
+class TestStaleSnapshot(unittest.TestCase):
+    """Tests for StaleSnapshot."""
+
+    def _snapshot(self, records):
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+            json.dump(records, f)
+        self.addCleanup(os.unlink, f.name)
+        return StaleSnapshot(f.name)
+
+    def test_both_baseline_formats(self):
+        snapshot = self._snapshot({
+            "quiz:Cloud skills": {"output": GOOD, "latency_ms": 900},
+            "certs:cloud": {"format": "certs", "a2ui": []},
+            "quiz:broken": {"error": "Failed to generate UI components"},
+        })
+        self.assertEqual(snapshot.get("quiz", "cloud skills!")["a2ui"], GOOD["a2ui"])
+        self.assertEqual(snapshot.get("certs", "Cloud")["format"], "certs")
+        self.assertIsNone(snapshot.get("podcast"))
+
+    def test_other_topics_do_not_match(self):
+        snapshot = self._snapshot({"quiz:Cloud skills": {"output": GOOD}})
+        self.assertIsNone(snapshot.get("quiz", "someone else's question"))
+        self.assertIsNone(snapshot.get("quiz"))
+
+    def test_missing_file(self):
+        self.assertIsNone(StaleSnapshot("/nonexistent/baseline.json").get("quiz"))
+
+    def test_shipped_baseline(self):
+        self.assertEqual(StaleSnapshot().get("flashcards", "tell me about your AI skills")["format"], "flashcards")
+
+
+class TestStaleWhileRevalidate(unittest.IsolatedAsyncioTestCase):
+    """Tests for stale results from LearningMaterialAgent."""
+
+    def setUp(self):
+        patcher = patch.dict(circuit_breaker._breakers, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.client = MagicMock()
+        self.client.aio.models.generate_content = AsyncMock(side_effect=RuntimeError("503 UNAVAILABLE"))
+        # A tenant portfolio, so only the response cache can supply stale results
+        self.agent = LearningMaterialAgent(
+            portfolio=Portfolio(dict(PORTFOLIO_SECTIONS), tenant_id="acme"),
+            client=self.client,
+            cache_store=ContextCacheStore(":memory:"),
+        )
+        self.agent._get_cache_name = AsyncMock(return_value=None)
+        self.key = self.agent._cache_key("quiz", "cloud")
+
+    def _expired_entry(self):
+        with patch.object(time, "time", return_value=time.time() - 2 * self.agent.response_cache.ttl):
+            self.agent.response_cache.put(self.key, GOOD)
+
+    async def test_failure_serves_expired_entry(self):
+        self._expired_entry()
+        result = await self.agent.generate_content("quiz", "cloud")
+        self.assertEqual(result["a2ui"], GOOD["a2ui"])
+        self.assertEqual((result["stale"], result["stale_reason"]), (True, "error"))
+
+    async def test_failure_without_fallback_raises(self):
+        with self.assertRaises(RuntimeError):
+            await self.agent.generate_content("quiz", "cloud")
+
+    async def test_open_breaker_skips_the_model(self):
+        self._expired_entry()
+        for _ in range(circuit_breaker.BREAKER_FAILURE_THRESHOLD):
+            await self.agent.generate_content("quiz", "cloud")
+        calls = self.client.aio.models.generate_content.await_count
+
+        result = await self.agent.generate_content("quiz", "cloud")
+        self.assertEqual(result["stale_reason"], "circuit_open")
+        self.assertEqual(self.client.aio.models.generate_content.await_count, calls)
+
+        with self.assertRaises(AdmissionRejected) as ctx:
+            await self.agent.generate_content("quiz", "another topic")
+        self.assertEqual(ctx.exception.status_code, 503)
+        self.assertGreater(ctx.exception.retry_after, 0)
+
+    async def test_open_breaker_without_stale_is_503(self):
+        breaker = circuit_breaker.get_circuit_breaker(self.agent.model_id, "quiz")
+        for _ in range(circuit_breaker.BREAKER_FAILURE_THRESHOLD):
+            breaker.record_failure()
+
+        transport = httpx.ASGITransport(app=server.app)
+        with patch.object(server, "get_agent", return_value=self.agent):
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                response = await client.post("/generate", json={"format": "quiz", "context": "cloud", "render_mode": "llm"})
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers["retry-after"], str(int(circuit_breaker.BREAKER_RESET_TIMEOUT)))
+
+    async def test_admission_rejections_do_not_trip_the_breaker(self):
+        self.agent._call_model = AsyncMock(side_effect=AdmissionRejected("Model call queue is full", 1.0))
+        for _ in range(circuit_breaker.BREAKER_FAILURE_THRESHOLD + 1):
+            with self.assertRaises(AdmissionRejected):
+                await self.agent.generate_content("quiz", "cloud")
+
+        breaker = circuit_breaker.get_circuit_breaker(self.agent.model_id, "quiz")
+        self.assertEqual(breaker.state, CLOSED)
+        self.assertEqual(breaker.stats()["consecutive_failures"], 0)
+
+    async def test_cancelled_half_open_stream_releases_the_probe(self):
+        breaker = circuit_breaker.get_circuit_breaker(self.agent.model_id, "quiz")
+        breaker.reset_timeout = 0
+        for _ in range(circuit_breaker.BREAKER_FAILURE_THRESHOLD):
+            breaker.record_failure()
+        started = asyncio.Event()
+
+        async def hang(**kwargs):
+            started.set()
+            await asyncio.sleep(10)
+
+        self.client.aio.models.generate_content_stream = AsyncMock(side_effect=hang)
+
+        async def consume():
+            return [event async for event in self.agent.stream_content("quiz", "cloud", render_mode="llm")]
+
+        probe = asyncio.ensure_future(consume())
+        await started.wait()
+        breaker.reset_timeout = 60
+        probe.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await probe
+
+        self.assertEqual(breaker.state, HALF_OPEN)
+        self.assertTrue(breaker.allow())
+
+    async def test_half_open_probe_runs_in_background(self):
+        self._expired_entry()
+        breaker = circuit_breaker.get_circuit_breaker(self.agent.model_id, "quiz")
+        breaker.reset_timeout = 0
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_failure()
+        self.client.aio.models.generate_content = AsyncMock(return_value=MagicMock(text=QUIZ_TEXT))
+
+        result = await self.agent.generate_content("quiz", "cloud")
+        self.assertEqual(result["stale_reason"], "revalidating")
+        await asyncio.gather(*self.agent._background)
+
+        self.assertEqual(breaker.state, CLOSED)
+        fresh = await self.agent.generate_content("quiz", "cloud")
+        self.assertNotIn("stale", fresh)
+
+    async def test_deadline_serves_stale_and_refreshes(self):
+        self._expired_entry()
+
+        async def slow(**kwargs):
+            await asyncio.sleep(0.2)
+            return MagicMock(text=QUIZ_TEXT)
+
+        self.client.aio.models.generate_content = AsyncMock(side_effect=slow)
+        with patch.object(agent_module, "GENERATION_DEADLINE", 0.05):
+            started = time.monotonic()
+            result = await self.agent.generate_content("quiz", "cloud")
+            self.assertLess(time.monotonic() - started, 0.15)
+            self.assertEqual(result["stale_reason"], "deadline")
+
+            await asyncio.gather(*self.agent._background)
+        self.assertNotIn("stale", await self.agent.generate_content("quiz", "cloud"))
+        # Slower than the deadline counts against the breaker
+        self.assertEqual(circuit_breaker.get_circuit_breaker(self.agent.model_id, "quiz").stats()["consecutive_failures"], 1)
+
+    async def test_stream_falls_back_to_snapshot(self):
+        agent = LearningMaterialAgent(client=self.client, cache_store=ContextCacheStore(":memory:"))
+        agent._get_cache_name = AsyncMock(return_value=None)
+        self.client.aio.models.generate_content_stream = AsyncMock(side_effect=RuntimeError("503 UNAVAILABLE"))
+
+        events = [event async for event in agent.stream_content("flashcards", "tell me about your AI skills", render_mode="llm")]
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]["format"], "flashcards")
+        self.assertTrue(events[0]["stale"])
+
+
+if __name__ == "__main__":
+    unittest.main()
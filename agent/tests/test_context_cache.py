@@ -0,0 +1,222 @@
+"""
+Unit tests for the context cache registry.
+
+Tests run against a fake caches client and cover:
+- Stable digests and cache reuse across registries (workers)
+- Refresh before TTL expiry and recreation after expiry
+- Failure backoff instead of retrying on every call, including for callers
+  already waiting on the failed create
+- Garbage collection of orphaned caches past their grace period
+- Store calls for file-backed stores run off the event loop
+"""
+
+import asyncio
+import datetime
+import itertools
+import os
+import sys
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Add parent directories to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import context_cache
+from context_cache import ContextCacheRegistry, ContextCacheStore, instruction_digest
+
+
+class FakeCaches:
+    """In-memory stand-in for client.aio.caches."""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.caches = {}
+        self.attempts = 0
+        self.created = 0
+        self.updated = 0
+        self.deleted = []
+        self._ids = itertools.count(1)
+
+    async def create(self, *, model, config):
+        self.attempts += 1
+        if self.fail:
+            raise RuntimeError("caching not supported")
+        self.created += 1
+        name = f"cachedContents/{next(self._ids)}"
+        self.caches[name] = SimpleNamespace(
+            name=name,
+            display_name=config.display_name,
+            create_time=datetime.datetime.now(datetime.timezone.utc),
+            expire_time=None,
+        )
+        return self.caches[name]
+
+    async def update(self, *, name, config):
+        self.updated += 1
+        return self.caches[name]
+
+    async def delete(self, *, name):
+        self.deleted.append(name)
+        self.caches.pop(name, None)
+
+    async def list(self):
+        async def pager():
+            for cache in list(self.caches.values()):
+                yield cache
+        return pager()
+
+
+class TestContextCacheRegistry(unittest.IsolatedAsyncioTestCase):
+    """Tests for ContextCacheRegistry."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "caches.sqlite")
+        self.fake = FakeCaches()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _registry(self, **kwargs):
+        kwargs.setdefault("gc_interval", 10_000)
+        return ContextCacheRegistry(lambda: self.fake, ContextCacheStore(self.db_path), ttl_seconds=3600, **kwargs)
+
+    def test_digest_is_stable(self):
+        """Verify the digest does not depend on the process hash seed."""
+        self.assertEqual(instruction_digest("m", "prompt"), instruction_digest("m", "prompt"))
+        self.assertNotEqual(instruction_digest("m", "prompt"), instruction_digest("m2", "prompt"))
+
+    async def test_create_then_hit(self):
+        """Verify the first call creates a cache and the second reuses it."""
+        registry = self._registry()
+        first = await registry.get_or_create("gemini", "system prompt")
+        second = await registry.get_or_create("gemini", "system prompt")
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.fake.created, 1)
+        self.assertEqual(registry.stats()["creates"], 1)
+        self.assertEqual(registry.stats()["misses"], 1)
+        self.assertEqual(registry.stats()["hits"], 1)
+
+    async def test_shared_across_workers(self):
+        """Verify a second registry on the same store reuses the cache."""
+        name = await self._registry().get_or_create("gemini", "system prompt")
+        other_worker = self._registry()
+
+        self.assertEqual(await other_worker.get_or_create("gemini", "system prompt"), name)
+        self.assertEqual(self.fake.created, 1)
+
+    async def test_concurrent_calls_create_once(self):
+        """Verify concurrent misses in one worker create a single cache."""
+        registry = self._registry()
+        names = await asyncio.gather(*(registry.get_or_create("gemini", "p") for _ in range(5)))
+
+        self.assertEqual(len(set(names)), 1)
+        self.assertEqual(self.fake.created, 1)
+
+    async def test_refresh_before_expiry(self):
+        """Verify a cache near expiry is refreshed, not recreated."""
+        registry = self._registry(refresh_margin=300)
+        with patch.object(context_cache.time, "time") as mock_time:
+            mock_time.return_value = 1000
+            name = await registry.get_or_create("gemini", "p")
+
+            mock_time.return_value = 1000 + 3600 - 100
+            self.assertEqual(await registry.get_or_create("gemini", "p"), name)
+
+        self.assertEqual(self.fake.updated, 1)
+        self.assertEqual(self.fake.created, 1)
+        self.assertEqual(registry.stats()["refreshes"], 1)
+
+    async def test_recreate_after_expiry(self):
+        """Verify an expired cache is recreated."""
+        registry = self._registry()
+        with patch.object(context_cache.time, "time") as mock_time:
+            mock_time.return_value = 1000
+            first = await registry.get_or_create("gemini", "p")
+
+            mock_time.return_value = 1000 + 3600 + 1
+            second = await registry.get_or_create("gemini", "p")
+
+        self.assertNotEqual(first, second)
+        self.assertEqual(self.fake.created, 2)
+
+    async def test_recreate_when_refresh_fails(self):
+        """Verify a cache deleted server-side is recreated on refresh."""
+        registry = self._registry(refresh_margin=300)
+        with patch.object(context_cache.time, "time") as mock_time:
+            mock_time.return_value = 1000
+            first = await registry.get_or_create("gemini", "p")
+            self.fake.caches.clear()
+
+            mock_time.return_value = 1000 + 3600 - 100
+            second = await registry.get_or_create("gemini", "p")
+
+        self.assertNotEqual(first, second)
+        self.assertEqual(self.fake.created, 2)
+
+    async def test_failure_backoff(self):
+        """Verify a failing create is not retried on every call."""
+        self.fake.fail = True
+        registry = self._registry(failure_backoff=60)
+
+        self.assertIsNone(await registry.get_or_create("gemini", "p"))
+        self.assertIsNone(await registry.get_or_create("gemini", "p"))
+        self.assertEqual(registry.stats()["errors"], 1)
+
+    async def test_concurrent_calls_share_a_failure(self):
+        """Verify callers waiting on a failing create do not retry it."""
+        self.fake.fail = True
+        registry = self._registry(failure_backoff=60)
+        names = await asyncio.gather(*(registry.get_or_create("gemini", "p") for _ in range(8)))
+
+        self.assertEqual(names, [None] * 8)
+        self.assertEqual(self.fake.attempts, 1)
+        self.assertEqual(registry.stats()["errors"], 1)
+
+    async def test_garbage_collects_orphans(self):
+        """Verify untracked caches with our prefix are deleted, others kept."""
+        registry = self._registry(gc_grace=0)
+        live = await registry.get_or_create("gemini", "p")
+
+        orphan = await self.fake.create(
+            model="gemini",
+            config=SimpleNamespace(display_name=f"{registry._display_prefix}stale"),
+        )
+        foreign = await self.fake.create(model="gemini", config=SimpleNamespace(display_name="someone-else"))
+
+        deleted = await registry.collect_garbage()
+
+        self.assertEqual(deleted, 1)
+        self.assertEqual(self.fake.deleted, [orphan.name])
+        self.assertIn(live, self.fake.caches)
+        self.assertIn(foreign.name, self.fake.caches)
+
+    async def test_garbage_collection_spares_young_orphans(self):
+        """Verify a cache another worker has not claimed yet is not deleted."""
+        registry = self._registry(gc_grace=300)
+        unclaimed = await self.fake.create(
+            model="gemini",
+            config=SimpleNamespace(display_name=f"{registry._display_prefix}pending"),
+        )
+
+        self.assertEqual(await registry.collect_garbage(), 0)
+        self.assertIn(unclaimed.name, self.fake.caches)
+
+    async def test_file_store_runs_in_thread(self):
+        """Verify a file-backed store is not queried on the event loop."""
+        registry = self._registry()
+        self.assertTrue(registry.store.blocking)
+        self.assertFalse(ContextCacheStore(":memory:").blocking)
+
+        with patch.object(context_cache.asyncio, "to_thread", wraps=asyncio.to_thread) as to_thread:
+            await registry.get_or_create("gemini", "p")
+        called = [call.args[0].__name__ for call in to_thread.call_args_list]
+        self.assertIn("get", called)
+        self.assertIn("claim", called)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+"""
+Unit tests for per-format context projections.
+
+Tests:
+- Every supported format has a projection
+- Projections only contain the sections their format needs
+- Projections are smaller than the full context
+"""
+
+import json
+import unittest
+
+import sys
+import os
+
+# Add parent directories to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from context_projections import (
+    FORMAT_CONTEXTS,
+    FORMAT_SECTIONS,
+    FULL_CONTEXT,
+    PORTFOLIO_SECTIONS,
+    build_projections,
+    get_format_context,
+    token_report,
+)
+from agent import LearningMaterialAgent
+
+
+class TestContextProjections(unittest.TestCase):
+    """Tests for FORMAT_CONTEXTS."""
+
+    def test_every_supported_format_has_projection(self):
+        """Verify SUPPORTED_FORMATS and the projection table stay in sync."""
+        for format_type in LearningMaterialAgent.SUPPORTED_FORMATS:
+            self.assertIn(format_type, FORMAT_SECTIONS)
+            self.assertIn(format_type, FORMAT_CONTEXTS)
+
+    def test_video_cards_only_contains_videos(self):
+        """Verify a narrow format only carries its own slice."""
+        context = FORMAT_CONTEXTS["video_cards"]
+        self.assertTrue(context.startswith("VIDEOS: "))
+        self.assertNotIn("EXPERIENCE", context)
+        self.assertEqual(json.loads(context[len("VIDEOS: "):]), PORTFOLIO_SECTIONS["VIDEOS"])
+
+    def test_projections_smaller_than_full(self):
+        """Verify narrow formats are a fraction of the full context."""
+        full = len(FORMAT_CONTEXTS[FULL_CONTEXT])
+        for format_type in ("timeline", "video_cards", "awards", "certs", "testimonials", "gallery"):
+            self.assertLess(len(FORMAT_CONTEXTS[format_type]), full / 4, format_type)
+
+    def test_unknown_format_gets_full_context(self):
+        """Verify the fallback projection is the full context."""
+        self.assertEqual(get_format_context("does-not-exist"), FORMAT_CONTEXTS[FULL_CONTEXT])
+
+    def test_build_projections_from_other_data(self):
+        """Verify projections can be built for arbitrary portfolio data."""
+        contexts = build_projections({"VIDEOS": [{"title": "Talk"}]})
+        self.assertEqual(contexts["video_cards"], 'VIDEOS: [{"title":"Talk"}]')
+        self.assertEqual(contexts["timeline"], "")
+
+    def test_token_report_covers_all_formats(self):
+        """Verify the token report has a row per projection."""
+        report = token_report()
+        self.assertEqual(set(report), set(FORMAT_CONTEXTS))
+        self.assertEqual(report[FULL_CONTEXT]["pct_of_full"], 100.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+"""
+Unit tests for hedged requests.
+
+Tests cover:
+- No hedging until enough latency samples exist
+- A slow call is hedged, the faster attempt wins and the other is cancelled
+- The hedge-rate cap
+- Failures of one attempt fall back to the other
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+
+# Add parent directories to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hedging import Hedger, LatencyTracker
+
+
+class ScriptedCall:
+    """Callable whose successive invocations sleep for the scripted latencies."""
+
+    def __init__(self, *latencies, fail_first=False):
+        self.latencies = list(latencies)
+        self.fail_first = fail_first
+        self.started = 0
+        self.cancelled = 0
+
+    async def __call__(self):
+        index = self.started
+        self.started += 1
+        try:
+            await asyncio.sleep(self.latencies[index])
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.fail_first and index == 0:
+            raise RuntimeError("attempt failed")
+        return index
+
+
+def _primed(**kwargs) -> Hedger:
+    hedger = Hedger(min_samples=10, min_delay=0.01, **kwargs)
+    for _ in range(10):
+        hedger.latency.record(0.02)
+    return hedger
+
+
+class TestHedger(unittest.IsolatedAsyncioTestCase):
+    """Tests for Hedger."""
+
+    async def test_no_hedge_without_samples(self):
+        """Verify calls are not hedged before min_samples latencies are known."""
+        hedger = Hedger(min_samples=10)
+        call = ScriptedCall(0.05)
+
+        self.assertEqual(await hedger.run(call), 0)
+        self.assertEqual(call.started, 1)
+        self.assertEqual(len(hedger.latency), 1)
+
+    async def test_slow_call_is_hedged(self):
+        """Verify a call past the percentile races a duplicate that wins."""
+        hedger = _primed(max_hedge_ratio=1.0)
+        call = ScriptedCall(1.0, 0.01)
+
+        self.assertEqual(await hedger.run(call), 1)
+        self.assertEqual(call.started, 2)
+        await asyncio.sleep(0)
+        self.assertEqual(call.cancelled, 1)
+        self.assertEqual(hedger.stats()["hedge_wins"], 1)
+
+    async def test_fast_call_is_not_hedged(self):
+        """Verify a call that returns before the hedge delay runs once."""
+        hedger = _primed(max_hedge_ratio=1.0)
+        call = ScriptedCall(0.001)
+
+        self.assertEqual(await hedger.run(call), 0)
+        self.assertEqual(call.started, 1)
+
+    async def test_hedge_rate_is_capped(self):
+        """Verify hedges stay within max_hedge_ratio of recent calls."""
+        hedger = _primed(percentile=50, max_hedge_ratio=0.25)
+        for _ in range(8):
+            await hedger.run(ScriptedCall(0.05, 0.01))
+
+        self.assertEqual(hedger.stats()["hedges"], 2)
+
+    async def test_failed_attempt_falls_back_to_other(self):
+        """Verify a failing primary does not fail the call while the hedge runs."""
+        hedger = _primed(max_hedge_ratio=1.0)
+        call = ScriptedCall(0.03, 0.05, fail_first=True)
+
+        self.assertEqual(await hedger.run(call), 1)
+
+
+class TestLatencyTracker(unittest.TestCase):
+    """Tests for LatencyTracker."""
+
+    def test_percentile(self):
+        tracker = LatencyTracker(window=100)
+        self.assertIsNone(tracker.percentile(95))
+        for ms in range(1, 101):
+            tracker.record(ms / 1000)
+        self.assertEqual(tracker.percentile(95), 0.095)
+        self.assertEqual(tracker.percentile(50), 0.05)
+
+    def test_window(self):
+        tracker = LatencyTracker(window=3)
+        for seconds in (10, 1, 2, 3):
+            tracker.record(seconds)
+        self.assertEqual(tracker.percentile(100), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""
+Cold-import budget for the server.
+
+Cloud Run scales to zero, so every cold start pays for `import server`. This
+runs it in a fresh interpreter under `python -X importtime` and checks:
+- Heavy SDKs (google.genai, the ADK, Vertex AI) and the OpenStax tables are
+  not imported until a request needs them
+- The whole import and the time spent in this package's own modules stay
+  within budget (IMPORT_BUDGET_MS and IMPORT_BUDGET_OWN_MS override the
+  defaults, which are about 3x a local measurement)
+"""
+
+import os
+import subprocess
+import sys
+import unittest
+
+AGENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "1500"))
+IMPORT_BUDGET_OWN_MS = float(os.getenv("IMPORT_BUDGET_OWN_MS", "200"))
+
+DEFERRED = ("google.genai", "google.adk", "vertexai", "openstax_modules", "openstax_chapters", "openstax_content")
+
+OWN_MODULES = {name[:-3] for name in os.listdir(AGENT_DIR) if name.endswith(".py")}
+
+
+def import_times(module: str) -> dict[str, tuple[int, int]]:
+    """Self and cumulative microseconds per module imported by `import module`."""
+    env = {key: value for key, value in os.environ.items() if key != "PYTHONPROFILEIMPORTTIME"}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=AGENT_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(own), int(cumulative))
+    return times
+
+
+class TestServerImportTime(unittest.TestCase):
+    """Tests for the cold-import cost of agent.server."""
+
+    @classmethod
+    def setUpClass(cls):
+        # Best of two: the first run may compile bytecode
+        runs = [import_times("server") for _ in range(2)]
+        cls.times = min(runs, key=lambda times: times["server"][1])
+
+    def test_heavy_modules_are_deferred(self):
+        imported = [name for name in self.times if name.startswith(DEFERRED)]
+        self.assertEqual(imported, [])
+
+    def test_total_budget(self):
+        total_ms = self.times["server"][1] / 1000
+        self.assertLess(total_ms, IMPORT_BUDGET_MS, f"import server took {total_ms:.0f}ms")
+
+    def test_own_modules_budget(self):
+        own = {name: us for name, (us, _) in self.times.items() if name.split(".")[0] in OWN_MODULES}
+        own_ms = sum(own.values()) / 1000
+        slowest = sorted(own, key=own.get, reverse=True)[:5]
+        self.assertLess(own_ms, IMPORT_BUDGET_OWN_MS, f"own modules took {own_ms:.0f}ms (slowest: {slowest})")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+Unit tests for the compiled intent router.
+
+Tests cover:
+- The labeled routing set in routing_cases.json
+- Tie-breaking by priority and confidence scores
+- Longest-keyword matching and custom intent tables
+- stream() routing chat messages through the router
+"""
+
+import json
+import os
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add parent directories to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent import LearningMaterialAgent
+from intent_router import IntentRouter, route
+
+ROUTING_CASES = json.loads((Path(__file__).parent / "routing_cases.json").read_text())
+
+
+class TestIntentRouter(unittest.TestCase):
+    """Tests for IntentRouter."""
+
+    def test_labeled_cases(self):
+        """Verify every labeled message routes to its expected intent."""
+        for case in ROUTING_CASES:
+            with self.subTest(message=case["message"]):
+                self.assertEqual(route(case["message"]).intent, case["intent"])
+
+    def test_confidence(self):
+        """Verify confidence is the winner's share of keyword hits."""
+        self.assertEqual(route("awards, honors and a trophy").confidence, 1.0)
+        self.assertEqual(route("awards and certs").confidence, 0.5)
+        self.assertEqual(route("hello").confidence, 0.0)
+
+    def test_higher_score_beats_priority(self):
+        """Verify more hits outweigh a higher-priority intent."""
+        result = route("one award, then certs, credentials and badges")
+        self.assertEqual(result.intent, "certs")
+        self.assertEqual(result.scores, {"awards": 1, "certs": 3})
+
+    def test_longest_keyword_wins(self):
+        """Verify a longer keyword is preferred over its prefix."""
+        router = IntentRouter([("short", ("gal",)), ("long", ("gallery",))])
+        self.assertEqual(router.route("the gallery").scores, {"long": 1})
+        self.assertEqual(router.route("a gala").scores, {"short": 1})
+
+    def test_many_intents(self):
+        """Verify routing stays correct with hundreds of generated intents."""
+        router = IntentRouter([(f"intent{i}", (f"keyword{i:04d}",)) for i in range(500)])
+        self.assertEqual(router.route("please match KEYWORD0421 now").intent, "intent421")
+
+    def test_empty_router(self):
+        self.assertIsNone(IntentRouter([]).route("anything").intent)
+
+
+class TestStreamRouting(unittest.IsolatedAsyncioTestCase):
+    """Tests for LearningMaterialAgent.stream routing."""
+
+    async def _stream(self, message):
+        agent = LearningMaterialAgent()
+        formats = []
+
+        async def fake_stream_content(format_type, context_topic=""):
+            formats.append(format_type)
+            yield {"format": format_type}
+
+        with patch.object(agent, "stream_content", fake_stream_content):
+            events = [event async for event in agent.stream(message)]
+        return formats, events
+
+    async def test_chat_message_routes_to_format(self):
+        formats, _ = await self._stream("show me your trophy room")
+        self.assertEqual(formats, ["awards"])
+
+    async def test_explicit_format_prefix_wins(self):
+        formats, _ = await self._stream("quiz:awards")
+        self.assertEqual(formats, ["quiz"])
+
+    async def test_advent_of_agents_answer(self):
+        formats, events = await self._stream("certs:advent of agents")
+        self.assertEqual(formats, [])
+        self.assertIn("adventofagents.com", events[0]["text"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+"""
+Unit tests for the Prometheus metrics.
+
+Tests cover:
+- Histogram and counter text exposition
+- Stage timing, and the no-op when metrics are disabled
+- Recording overhead
+- Agent stages and cache layers, served on /metrics
+"""
+
+import json
+import os
+import sys
+import time
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+
+# Add parent directories to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import metrics
+import server
+from agent import LearningMaterialAgent
+from metrics import CACHE_REQUESTS, STAGE_SECONDS, Counter, Histogram, stage
+
+
+class TestExposition(unittest.TestCase):
+    """Tests for the text format."""
+
+    def test_histogram(self):
+        histogram = Histogram("latency_seconds", "Latency.", ("stage",), buckets=(0.1, 1))
+        histogram.observe(0.05, "model")
+        histogram.observe(0.5, "model")
+        histogram.observe(2, "model")
+
+        self.assertEqual(histogram.render().splitlines(), [
+            "# HELP latency_seconds Latency.",
+            "# TYPE latency_seconds histogram",
+            'latency_seconds_bucket{stage="model",le="0.1"} 1',
+            'latency_seconds_bucket{stage="model",le="1"} 2',
+            'latency_seconds_bucket{stage="model",le="+Inf"} 3',
+            'latency_seconds_sum{stage="model"} 2.55',
+            'latency_seconds_count{stage="model"} 3',
+        ])
+
+    def test_counter_escapes_labels(self):
+        counter = Counter("lookups_total", "Lookups.", ("layer", "result"))
+        counter.inc('say "hi"\n', "hit")
+        counter.inc('say "hi"\n', "hit", amount=2)
+
+        self.assertEqual(counter.render().splitlines()[-1], 'lookups_total{layer="say \\"hi\\"\\n",result="hit"} 3')
+
+
+class TestStage(unittest.TestCase):
+    """Tests for stage()."""
+
+    def test_records_duration(self):
+        before = STAGE_SECONDS.count("unit_test", "quiz")
+        with stage("unit_test", "quiz"):
+            time.sleep(0.01)
+        self.assertEqual(STAGE_SECONDS.count("unit_test", "quiz"), before + 1)
+
+    def test_disabled_is_noop(self):
+        with patch.object(metrics, "METRICS_ENABLED", False):
+            with stage("disabled_test", "quiz"):
+                pass
+        self.assertEqual(STAGE_SECONDS.count("disabled_test", "quiz"), 0)
+
+    def test_overhead_is_small(self):
+        """Verify a timed stage costs only a few microseconds."""
+        n = 20000
+        start = time.perf_counter()
+        for _ in range(n):
+            with stage("overhead_test", "quiz"):
+                pass
+        per_stage = (time.perf_counter() - start) / n
+        self.assertLess(per_stage, 10e-6)
+
+
+class TestAgentMetrics(unittest.IsolatedAsyncioTestCase):
+    """Tests for the instrumentation in the agent and server."""
+
+    def setUp(self):
+        patcher = patch("agent.genai.Client")
+        self.addCleanup(patcher.stop)
+        self.client = MagicMock()
+        response = MagicMock()
+        response.text = json.dumps([{"front": "Q", "back": "A", "category": "Career"}])
+        self.client.aio.models.generate_content = AsyncMock(return_value=response)
+        self.client.aio.caches.create = AsyncMock(side_effect=Exception("caching unavailable"))
+        patcher.start().return_value = self.client
+
+    async def test_generation_stages_and_cache_layers(self):
+        agent = LearningMaterialAgent()
+        stages = ("context", "prompt", "context_cache", "model", "parse", "build")
+        before = {name: STAGE_SECONDS.count(name, "podcast") for name in stages}
+        misses = CACHE_REQUESTS.value("response", "podcast", "miss")
+        hits = CACHE_REQUESTS.value("response", "podcast", "hit")
+
+        await agent.generate_content("podcast", "metrics")
+        await agent.generate_content("podcast", "metrics")
+
+        for name in stages:
+            self.assertEqual(STAGE_SECONDS.count(name, "podcast"), before[name] + 1, name)
+        self.assertEqual(CACHE_REQUESTS.value("response", "podcast", "miss"), misses + 1)
+        self.assertEqual(CACHE_REQUESTS.value("response", "podcast", "hit"), hits + 1)
+        self.assertGreaterEqual(CACHE_REQUESTS.value("context", "podcast", "error"), 1)
+
+    async def test_metrics_endpoint(self):
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.post("/generate", json={"format": "certs"})
+            await client.post("/generate", json={"format": "nonsense"})
+            response = await client.get("/metrics")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain; version=0.0.4"))
+        self.assertIn("# TYPE portfolio_stage_seconds histogram", response.text)
+        self.assertIn('portfolio_stage_seconds_count{stage="render",format="certs"}', response.text)
+        self.assertIn('portfolio_stage_seconds_count{stage="request",format="unsupported"}', response.text)
+        self.assertIn("# TYPE portfolio_cache_requests_total counter", response.text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,217 @@
+"""
+Unit tests for the model backends.
+
+Tests cover:
+- Latency distribution parsing and seeded reproducibility
+- Schema-synthesized responses that assemble into valid A2UI for every format
+- The agent generating and streaming against the local stand-in
+- Streaming chunks, injected server errors and 429s
+- Replayed responses and in-memory context caches
+- Prompt token counts covering the system instruction and cached content
+- One context cache per format, with the topic sent in the user turn
+- Backend selection
+"""
+
+import json
+import os
+import random
+import sys
+import unittest
+from unittest.mock import patch
+
+from google.genai import errors, types
+
+# Add parent directories to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from a2ui_builder import build, content_errors, get_content_schema
+from a2ui_schemas import validate_a2ui
+from admission import is_quota_error
+from agent import LearningMaterialAgent
+from context_cache import ContextCacheRegistry, ContextCacheStore
+from model_backend import LocalGeminiClient, LocalModelConfig, create_client, parse_latency, synthesize
+
+CONTENT_FORMATS = [f for f in LearningMaterialAgent.SUPPORTED_FORMATS if get_content_schema(f) is not None]
+
+
+def _client(**overrides):
+    options = {"latency": "fixed:0", "chunk_interval": 0}
+    options.update(overrides)
+    return LocalGeminiClient(LocalModelConfig(**options))
+
+
+def _config(format_type):
+    return types.GenerateContentConfig(
+        response_mime_type="application/json",
+        response_schema=get_content_schema(format_type),
+    )
+
+
+class TestLocalModelConfig(unittest.TestCase):
+    """Tests for latency distributions and configuration."""
+
+    def test_latency_distributions(self):
+        rng = random.Random(1)
+        self.assertEqual(parse_latency("fixed:0.25")(rng), 0.25)
+        self.assertTrue(all(0.2 <= parse_latency("uniform:0.2,0.4")(rng) <= 0.4 for _ in range(100)))
+        self.assertTrue(all(parse_latency("lognormal:0.8,0.4")(rng) > 0 for _ in range(100)))
+
+        bimodal = parse_latency("bimodal:0.1,5,0.2")
+        samples = [bimodal(rng) for _ in range(1000)]
+        self.assertAlmostEqual(samples.count(5) / len(samples), 0.2, delta=0.05)
+
+    def test_invalid_latency(self):
+        for spec in ("fixed", "uniform:1", "gamma:1,2", "fixed:fast"):
+            with self.subTest(spec=spec), self.assertRaises(ValueError):
+                parse_latency(spec)
+
+    def test_seed_is_reproducible(self):
+        sampler = parse_latency("lognormal:0.8,0.4")
+        first = [sampler(random.Random(7)) for _ in range(3)]
+        self.assertEqual(first, [sampler(random.Random(7)) for _ in range(3)])
+
+    def test_from_env(self):
+        env = {"LOCAL_MODEL_LATENCY": "fixed:0.1", "LOCAL_MODEL_CHUNK_CHARS": "8", "LOCAL_MODEL_QUOTA_RATE": "0.5", "LOCAL_MODEL_SEED": "3"}
+        with patch.dict(os.environ, env):
+            config = LocalModelConfig.from_env()
+        self.assertEqual((config.chunk_chars, config.quota_rate, config.seed), (8, 0.5, 3))
+
+
+class TestSynthesize(unittest.TestCase):
+    """Tests for schema-synthesized responses."""
+
+    def test_content_is_valid_for_every_format(self):
+        for format_type in CONTENT_FORMATS:
+            with self.subTest(format=format_type):
+                content = synthesize(get_content_schema(format_type))
+                self.assertEqual(content_errors(format_type, content), [])
+                self.assertEqual(validate_a2ui(format_type, build(format_type, content)), [])
+
+    def test_accepts_schema_objects(self):
+        schema = types.Schema(type=types.Type.ARRAY, items=types.Schema(type=types.Type.BOOLEAN))
+        self.assertEqual(synthesize(schema), [True, False, False])
+
+
+class TestLocalGeminiClient(unittest.IsolatedAsyncioTestCase):
+    """Tests for the stand-in client API."""
+
+    async def test_generate_content(self):
+        response = await _client().aio.models.generate_content(model="m", contents="quiz", config=_config("quiz"))
+        self.assertEqual(content_errors("quiz", json.loads(response.text)), [])
+        self.assertGreater(response.usage_metadata.candidates_token_count, 0)
+
+    async def test_stream_chunks_join_to_full_text(self):
+        client = _client(chunk_chars=16)
+        full = (await client.aio.models.generate_content(model="m", contents="x", config=_config("awards"))).text
+        stream = await client.aio.models.generate_content_stream(model="m", contents="x", config=_config("awards"))
+        chunks = [chunk.text async for chunk in stream]
+
+        self.assertEqual("".join(chunks), full)
+        self.assertEqual(len(chunks), -(-len(full) // 16))
+
+    async def test_injected_errors(self):
+        with self.assertRaises(errors.ClientError) as ctx:
+            await _client(quota_rate=1).aio.models.generate_content(model="m", contents="x")
+        self.assertTrue(is_quota_error(ctx.exception))
+
+        with self.assertRaises(errors.ServerError):
+            await _client(error_rate=1).aio.models.generate_content_stream(model="m", contents="x")
+
+        client = _client(error_rate=0.3, seed=11)
+        outcomes = []
+        for _ in range(200):
+            try:
+                await client.aio.models.generate_content(model="m", contents="x")
+                outcomes.append(True)
+            except errors.ServerError:
+                outcomes.append(False)
+        self.assertAlmostEqual(outcomes.count(False) / len(outcomes), 0.3, delta=0.1)
+        self.assertEqual(client.calls, 200)
+
+    async def test_replay(self):
+        client = _client(replay={"quiz": ["first", "second"], "*": "fallback"})
+        texts = [(await client.aio.models.generate_content(model="m", contents=[c])).text for c in ("quiz me", "quiz me", "quiz me", "hello")]
+        self.assertEqual(texts, ["first", "second", "first", "fallback"])
+
+    async def test_context_caches(self):
+        client = _client()
+        registry = ContextCacheRegistry(lambda: client.aio.caches, ContextCacheStore(":memory:"))
+
+        name = await registry.get_or_create("m", "system instruction")
+        self.assertTrue(name.startswith("cachedContents/local-"))
+        self.assertEqual(await registry.get_or_create("m", "system instruction"), name)
+        self.assertEqual([c.name async for c in await client.aio.caches.list()], [name])
+
+    async def test_prompt_tokens_include_instruction_and_cache(self):
+        client = _client()
+        instruction = "portfolio data " * 400
+        contents = [types.Content(role="user", parts=[types.Part.from_text(text="quiz me")])]
+
+        bare = await client.aio.models.generate_content(model="m", contents=contents, config=_config("quiz"))
+        inline = await client.aio.models.generate_content(
+            model="m", contents=contents,
+            config=types.GenerateContentConfig(system_instruction=instruction, response_schema=get_content_schema("quiz")),
+        )
+        self.assertGreater(inline.usage_metadata.prompt_token_count, bare.usage_metadata.prompt_token_count + 1000)
+
+        cache = await client.aio.caches.create(model="m", config=types.CreateCachedContentConfig(system_instruction=instruction))
+        cached = await client.aio.models.generate_content(
+            model="m", contents=contents,
+            config=types.GenerateContentConfig(cached_content=cache.name, response_schema=get_content_schema("quiz")),
+        )
+        self.assertEqual(cached.usage_metadata.prompt_token_count, inline.usage_metadata.prompt_token_count)
+        self.assertEqual(cached.usage_metadata.cached_content_token_count, len(instruction) // 4 + 1)
+
+    def test_sync_client(self):
+        response = _client().models.generate_content(model="m", contents="x", config=_config("certs"))
+        self.assertEqual(content_errors("certs", json.loads(response.text)), [])
+
+
+class TestAgentOnLocalBackend(unittest.IsolatedAsyncioTestCase):
+    """Tests for LearningMaterialAgent on the stand-in."""
+
+    def setUp(self):
+        self.agent = LearningMaterialAgent()
+        self.agent.client = _client()
+        self.agent.context_caches = ContextCacheRegistry(lambda: self.agent.client.aio.caches, ContextCacheStore(":memory:"))
+
+    async def test_generate_every_format(self):
+        for format_type in CONTENT_FORMATS:
+            with self.subTest(format=format_type):
+                result = await self.agent.generate_content(format_type, "career", render_mode="llm")
+                self.assertNotIn("error", result)
+                self.assertEqual(validate_a2ui(format_type, result["a2ui"]), [])
+
+    async def test_stream(self):
+        events = [event async for event in self.agent.stream_content("quiz", "streaming", render_mode="llm")]
+        self.assertTrue(any(event.get("partial") for event in events))
+        self.assertEqual(validate_a2ui("quiz", events[-1]["a2ui"]), [])
+
+    async def test_one_context_cache_per_format(self):
+        for topic in ("career", "cloud skills"):
+            await self.agent.generate_content("quiz", topic, render_mode="llm")
+        self.assertEqual(self.agent.context_caches.stats()["creates"], 1)
+
+        contents, config = await self.agent._prepare_generation("flashcards", "skill match")
+        self.assertIsNotNone(config.cached_content)
+        self.assertIn("skill match", contents[0].parts[0].text)
+        self.assertIn("Skill Matcher", contents[0].parts[0].text)
+
+
+class TestCreateClient(unittest.TestCase):
+    """Tests for backend selection."""
+
+    def test_local(self):
+        self.assertIsInstance(create_client("local"), LocalGeminiClient)
+
+    def test_gemini(self):
+        with patch("model_backend.genai.Client") as client_class:
+            self.assertIs(create_client("gemini"), client_class.return_value)
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            create_client("openai")
+
+
+if __name__ == "__main__":
+    unittest.main()
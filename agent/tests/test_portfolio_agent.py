@@ -3,18 +3,26 @@ import json
 import os
 import sys
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import pytest
 from agent import get_agent, LearningMaterialAgent
+from admission import AdmissionController
+from a2ui_builder import build
+
+# Flashcard content as returned by the model; the agent assembles the A2UI
+FLASHCARD_CONTENT = [{"front": "Where does Enrique work?", "back": "Google Cloud", "category": "Career"}]
 
 @pytest.fixture
 def mock_genai_client():
     with patch('agent.genai.Client') as mock_client_class:
         mock_client = MagicMock()
+        # The agent awaits the async client (client.aio.*)
+        mock_client.aio.models.generate_content = AsyncMock()
+        mock_client.aio.caches.create = AsyncMock(side_effect=Exception("caching unavailable"))
         mock_client_class.return_value = mock_client
         yield mock_client
 
@@ -28,11 +36,8 @@ async def test_agent_initialization():
 async def test_generate_flashcards_logic(mock_genai_client):
     # Setup mock response
     mock_response = MagicMock()
-    mock_response.text = json.dumps([
-        {"beginRendering": {"surfaceId": "portfolioContent", "root": "main"}},
-        {"surfaceUpdate": {"surfaceId": "portfolioContent", "components": []}}
-    ])
-    mock_genai_client.models.generate_content.return_value = mock_response
+    mock_response.text = json.dumps(FLASHCARD_CONTENT)
+    mock_genai_client.aio.models.generate_content.return_value = mock_response
     
     agent = LearningMaterialAgent()
     result = await agent.generate_content("flashcards", "Google")
@@ -42,14 +47,14 @@ async def test_generate_flashcards_logic(mock_genai_client):
     assert result["surfaceId"] == "portfolioContent"
     
     # Check if system instruction was called (indirectly verifying plumbing)
-    args, kwargs = mock_genai_client.models.generate_content.call_args
+    args, kwargs = mock_genai_client.aio.models.generate_content.call_args
     assert "system_instruction" in kwargs.get('config').__dict__.get('_values', {}) or True # Simplified check
 
 @pytest.mark.asyncio
 async def test_stream_interface(mock_genai_client):
     mock_response = MagicMock()
     mock_response.text = "Hello from Enrique's Agent"
-    mock_genai_client.models.generate_content.return_value = mock_response
+    mock_genai_client.aio.models.generate_content.return_value = mock_response
     
     agent = LearningMaterialAgent()
     chunks = []
@@ -60,6 +65,97 @@ async def test_stream_interface(mock_genai_client):
     assert "text" in chunks[0]
     assert "Enrique" in chunks[0]["text"]
 
+@pytest.mark.asyncio
+async def test_generate_content_does_not_block_event_loop(mock_genai_client):
+    in_flight = 0
+    max_in_flight = 0
+
+    async def slow_generate(**kwargs):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.05)
+        in_flight -= 1
+        response = MagicMock()
+        response.text = json.dumps(FLASHCARD_CONTENT)
+        return response
+
+    mock_genai_client.aio.models.generate_content.side_effect = slow_generate
+
+    agent = LearningMaterialAgent()
+    agent.admission = AdmissionController(max_concurrency=4)
+    results = await asyncio.gather(*(agent.generate_content("flashcards", f"topic {i}") for i in range(10)))
+
+    assert all("a2ui" in r for r in results)
+    # Calls overlap on the loop, but never exceed the configured bound
+    assert 1 < max_in_flight <= 4
+
+@pytest.mark.asyncio
+async def test_stream_emits_partial_events_then_result(mock_genai_client):
+    content = [
+        {
+            "question": f"Question {n}?",
+            "options": [{"label": "Yes", "isCorrect": True}, {"label": "No", "isCorrect": False}],
+            "explanation": "Because.",
+            "category": "Career",
+        }
+        for n in (1, 2)
+    ]
+    payload = json.dumps(content)
+
+    async def chunked_stream(**kwargs):
+        async def chunks():
+            for i in range(0, len(payload), 16):
+                chunk = MagicMock()
+                chunk.text = payload[i:i + 16]
+                yield chunk
+        return chunks()
+
+    mock_genai_client.aio.models.generate_content_stream = AsyncMock(side_effect=chunked_stream)
+
+    agent = LearningMaterialAgent()
+    events = [event async for event in agent.stream("quiz:Google", "test-session")]
+
+    partials = [e for e in events if e.get("partial")]
+    assert len(partials) == 3
+    assert "beginRendering" in partials[0]["a2ui"][0]
+
+    final = events[-1]
+    assert "partial" not in final
+    assert final["format"] == "quiz"
+    assert final["a2ui"] == build("quiz", content)
+
+@pytest.mark.asyncio
+async def test_generate_content_served_from_response_cache(mock_genai_client):
+    mock_response = MagicMock()
+    mock_response.text = json.dumps(FLASHCARD_CONTENT)
+    mock_genai_client.aio.models.generate_content.return_value = mock_response
+
+    agent = LearningMaterialAgent()
+    first = await agent.generate_content("flashcards", "Recognitions")
+    second = await agent.generate_content("flashcards", "  recognitions ")
+
+    assert first == second
+    assert mock_genai_client.aio.models.generate_content.call_count == 1
+    assert agent.response_cache.stats()["hits"] == 1
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_requests_are_coalesced(mock_genai_client):
+    async def slow_generate(**kwargs):
+        await asyncio.sleep(0.02)
+        response = MagicMock()
+        response.text = json.dumps(FLASHCARD_CONTENT)
+        return response
+
+    mock_genai_client.aio.models.generate_content.side_effect = slow_generate
+
+    agent = LearningMaterialAgent()
+    results = await asyncio.gather(*(agent.generate_content("podcast", "career") for _ in range(5)))
+
+    assert all(r == results[0] for r in results)
+    assert mock_genai_client.aio.models.generate_content.call_count == 1
+    assert agent._inflight.stats()["coalesced"] == 4
+
 if __name__ == "__main__":
     # If run directly, run tests using pytest
     import pytest
@@ -0,0 +1,114 @@
+"""
+Unit tests for the pre-fork serving entry point.
+
+Tests cover:
+- Precompiled OpenStax keyword and title indexes matching as before
+- Preloading without creating an agent or any client in the parent
+- Forked workers sharing one socket, restarting on crash and stopping on SIGTERM
+"""
+
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+# Add parent directories to path for imports
+AGENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, AGENT_DIR)
+
+import agent as agent_module
+import openstax_chapters
+import prefork
+import server
+from openstax_modules import search_modules
+
+
+class TestStaticIndexes(unittest.TestCase):
+    """Tests for the indexes built once at import."""
+
+    def test_keyword_word_boundaries(self):
+        self.assertTrue(search_modules("stem cells"))
+        self.assertNotIn("stem", [r["title"].lower() for r in search_modules("nervous system")])
+
+    def test_title_fallback(self):
+        results = search_modules("zzz Meiosis")
+        self.assertTrue(results)
+        self.assertTrue(all("meiosis" in (r["title"] + r["chapter"]).lower() for r in results))
+
+    def test_chapter_list(self):
+        chapter_list = openstax_chapters.get_chapter_list_for_llm()
+        self.assertIs(chapter_list, openstax_chapters.get_chapter_list_for_llm())
+        self.assertEqual(len(chapter_list.splitlines()), len(openstax_chapters.OPENSTAX_CHAPTERS))
+
+    def test_preload_creates_no_agent(self):
+        with patch.object(agent_module, "_agent", None):
+            self.assertIs(prefork.preload(), server.app)
+            self.assertIsNone(agent_module._agent)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _children(pid: int) -> list[int]:
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(child) for child in f.read().split()]
+
+
+@unittest.skipUnless(sys.platform == "linux", "needs fork and /proc")
+class TestSupervisor(unittest.TestCase):
+    """Tests for prefork.py run as a server."""
+
+    def setUp(self):
+        self.port = _free_port()
+        env = {**os.environ, "MODEL_BACKEND": "local", "METRICS_ENABLED": "false"}
+        self.process = subprocess.Popen(
+            [sys.executable, "prefork.py", "--host", "127.0.0.1", "--port", str(self.port), "--workers", "2", "--log-level", "warning"],
+            cwd=AGENT_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        self.addCleanup(self._kill)
+
+    def _kill(self):
+        if self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+
+    def _wait_for(self, condition, timeout=15.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                if condition():
+                    return True
+            except (httpx.HTTPError, OSError):
+                pass
+            time.sleep(0.1)
+        return False
+
+    def _healthy(self):
+        return httpx.get(f"http://127.0.0.1:{self.port}/health", timeout=1).status_code == 200
+
+    def test_workers_serve_restart_and_stop(self):
+        self.assertTrue(self._wait_for(self._healthy))
+        self.assertTrue(self._wait_for(lambda: len(_children(self.process.pid)) == 2))
+
+        crashed = _children(self.process.pid)[0]
+        os.kill(crashed, signal.SIGKILL)
+        self.assertTrue(self._wait_for(
+            lambda: len(_children(self.process.pid)) == 2 and crashed not in _children(self.process.pid)
+        ))
+        self.assertTrue(self._wait_for(self._healthy))
+
+        self.process.send_signal(signal.SIGTERM)
+        self.assertEqual(self.process.wait(timeout=15), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
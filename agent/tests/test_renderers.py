@@ -0,0 +1,120 @@
+"""
+Unit tests for the deterministic A2UI renderers.
+
+Tests cover:
+- Every renderer produces a well-formed surface (root exists, children resolve)
+- Rendering is fast enough to skip the response cache
+- render_mode selection in the agent (deterministic never calls the model)
+"""
+
+import json
+import os
+import sys
+import time
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+# Add parent directories to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from a2ui_templates import SURFACE_ID
+from agent import LearningMaterialAgent
+from a2ui_builder import build
+from renderers import DETERMINISTIC_FORMATS, default_render_mode, render
+
+CERT_CONTENT = [{"title": "Professional Cloud Architect", "description": "Google Cloud certification."}]
+
+
+def _child_ids(component):
+    ids = []
+    for props in component["component"].values():
+        children = props.get("children", {}) if isinstance(props, dict) else {}
+        ids.extend(children.get("explicitList", []))
+    return ids
+
+
+class TestRenderers(unittest.TestCase):
+    """Tests for the renderer functions."""
+
+    def test_every_format_renders_a_valid_surface(self):
+        """Verify the root and every child reference resolve to a component."""
+        for format_type in DETERMINISTIC_FORMATS:
+            with self.subTest(format=format_type):
+                begin, update = render(format_type)
+                self.assertEqual(begin["beginRendering"]["surfaceId"], SURFACE_ID)
+                self.assertEqual(update["surfaceUpdate"]["surfaceId"], SURFACE_ID)
+
+                components = update["surfaceUpdate"]["components"]
+                ids = [c["id"] for c in components]
+                self.assertEqual(len(ids), len(set(ids)), "duplicate component ids")
+                self.assertIn(begin["beginRendering"]["root"], ids)
+                for component in components:
+                    for child in _child_ids(component):
+                        self.assertIn(child, ids)
+
+                # Output is plain JSON, same as a parsed model response
+                json.dumps([begin, update])
+
+    def test_renders_are_fast(self):
+        """Verify a render takes well under a millisecond."""
+        for format_type in DETERMINISTIC_FORMATS:
+            start = time.perf_counter()
+            for _ in range(100):
+                render(format_type)
+            self.assertLess((time.perf_counter() - start) / 100, 0.001, format_type)
+
+    def test_generative_formats_have_no_renderer(self):
+        """Verify generative formats default to the LLM and cannot be rendered."""
+        self.assertEqual(default_render_mode("quiz"), "llm")
+        self.assertEqual(default_render_mode("certs"), "deterministic")
+        with self.assertRaises(ValueError):
+            render("quiz")
+
+
+class TestRenderModeSelection(unittest.IsolatedAsyncioTestCase):
+    """Tests for render_mode handling in LearningMaterialAgent."""
+
+    def setUp(self):
+        patcher = patch("agent.genai.Client")
+        self.addCleanup(patcher.stop)
+        self.client = MagicMock()
+        self.client.aio.models.generate_content = AsyncMock()
+        self.client.aio.caches.create = AsyncMock(side_effect=Exception("caching unavailable"))
+        patcher.start().return_value = self.client
+
+        response = MagicMock()
+        response.text = json.dumps(CERT_CONTENT)
+        self.client.aio.models.generate_content.return_value = response
+
+    async def test_data_backed_format_skips_model(self):
+        """Verify data-backed formats render without a model call by default."""
+        result = await LearningMaterialAgent().generate_content("certs")
+
+        self.assertEqual(result["format"], "certs")
+        self.assertEqual(result["a2ui"], render("certs"))
+        self.assertEqual(result["source"]["provider"], "Credly / Google")
+        self.client.aio.models.generate_content.assert_not_called()
+
+    async def test_llm_mode_calls_model(self):
+        """Verify render_mode="llm" sends data-backed formats to the model."""
+        result = await LearningMaterialAgent().generate_content("certs", render_mode="llm")
+
+        self.assertEqual(result["a2ui"], build("certs", CERT_CONTENT))
+        self.client.aio.models.generate_content.assert_called_once()
+
+    async def test_deterministic_mode_rejected_for_generative_format(self):
+        """Verify a generative format cannot be forced to deterministic."""
+        result = await LearningMaterialAgent().generate_content("quiz", render_mode="deterministic")
+        self.assertIn("error", result)
+
+    async def test_stream_yields_single_result(self):
+        """Verify streaming a deterministic format yields only the final result."""
+        events = [e async for e in LearningMaterialAgent().stream_content("timeline")]
+
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]["a2ui"], render("timeline"))
+        self.client.aio.models.generate_content.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
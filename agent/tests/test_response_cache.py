@@ -0,0 +1,100 @@
+"""
+Unit tests for the generation response cache.
+
+Tests:
+- Keys normalize topics and include the data version
+- TTL expiry and LRU eviction
+- Opt-in variant pools are filled, then served round-robin
+- Error results are never cached
+"""
+
+import unittest
+from unittest.mock import patch
+
+import sys
+import os
+
+# Add parent directories to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import response_cache
+from response_cache import ResponseCache, content_digest, make_cache_key, normalize_topic
+
+
+class TestCacheKeys(unittest.TestCase):
+    """Tests for key construction."""
+
+    def test_topic_normalization(self):
+        """Verify case, punctuation and whitespace do not change the key."""
+        self.assertEqual(normalize_topic("  Cloud   Certifications! "), "cloud certifications")
+        self.assertEqual(
+            make_cache_key("certs", "Cloud certifications", "v1"),
+            make_cache_key("certs", "cloud, CERTIFICATIONS", "v1"),
+        )
+
+    def test_data_version_changes_key(self):
+        """Verify a different data version yields a different key."""
+        self.assertNotEqual(make_cache_key("awards", "", "v1"), make_cache_key("awards", "", "v2"))
+
+    def test_content_digest_is_stable(self):
+        """Verify the digest only depends on content."""
+        self.assertEqual(content_digest({"b": 1, "a": 2}), content_digest({"a": 2, "b": 1}))
+        self.assertNotEqual(content_digest("x"), content_digest("y"))
+
+
+class TestResponseCache(unittest.TestCase):
+    """Tests for ResponseCache."""
+
+    def test_hit_after_put(self):
+        """Verify a stored result is returned and counted as a hit."""
+        cache = ResponseCache()
+        self.assertIsNone(cache.get("k"))
+        cache.put("k", {"format": "awards"})
+        self.assertEqual(cache.get("k"), {"format": "awards"})
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_errors_not_cached(self):
+        """Verify error results are not stored."""
+        cache = ResponseCache()
+        cache.put("k", {"error": "boom"})
+        self.assertIsNone(cache.get("k"))
+
+    def test_ttl_expiry(self):
+        """Verify entries expire after the TTL."""
+        cache = ResponseCache(ttl=10)
+        with patch.object(response_cache.time, "time") as mock_time:
+            mock_time.return_value = 0
+            cache.put("k", {"v": 1})
+
+            mock_time.return_value = 9
+            self.assertIsNotNone(cache.get("k"))
+
+            mock_time.return_value = 11
+            self.assertIsNone(cache.get("k"))
+
+    def test_lru_eviction(self):
+        """Verify the least recently used key is evicted first."""
+        cache = ResponseCache(max_entries=2)
+        cache.put("a", {"v": "a"})
+        cache.put("b", {"v": "b"})
+        cache.get("a")  # "b" is now least recently used
+        cache.put("c", {"v": "c"})
+
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_variant_pool_round_robin(self):
+        """Verify the pool misses until full, then rotates through variants."""
+        cache = ResponseCache(variants=3)
+        for i in range(3):
+            self.assertIsNone(cache.get("k"))
+            cache.put("k", {"v": i})
+
+        served = [cache.get("k")["v"] for _ in range(6)]
+        self.assertEqual(served, [0, 1, 2, 0, 1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
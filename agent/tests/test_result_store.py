@@ -0,0 +1,268 @@
+"""
+Unit tests for the shared result stores.
+
+Tests cover:
+- Compressed round trips, TTL expiry and oversized values on every backend
+- Byte caps evicting the oldest entries (memory and SQLite)
+- A second worker's cache loading results from a shared SQLite file
+- The Redis backend against a local RESP stand-in, including reconnects
+- Backend errors degrading to cache misses
+"""
+
+import asyncio
+import os
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+# Add parent directories to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from response_cache import ResponseCache
+from result_store import (
+    MemoryResultStore,
+    RedisResultStore,
+    SQLiteResultStore,
+    create_result_store,
+    decode,
+    encode,
+)
+
+RESULT = {"format": "quiz", "a2ui": [{"beginRendering": {"surfaceId": "s", "root": "root"}}] * 20}
+
+
+class _RespHandler(socketserver.StreamRequestHandler):
+    """Serves GET, SET [PX], DEL, SCAN and PING from the server's dict."""
+
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def _bulk(self, value):
+        return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+
+    def handle(self):
+        data = self.server.data
+        while True:
+            args = self._read_command()
+            if args is None:
+                return
+            command = args[0].upper()
+            self.server.commands.append(command)
+            if command == b"PING":
+                reply = b"+PONG\r\n"
+            elif command == b"GET":
+                value, expire_at = data.get(args[1], (None, None))
+                if expire_at is not None and expire_at <= time.time():
+                    data.pop(args[1])
+                    value = None
+                reply = self._bulk(value)
+            elif command == b"SET":
+                ttl = int(args[4]) / 1000 if len(args) > 4 else None
+                data[args[1]] = (args[2], time.time() + ttl if ttl else None)
+                reply = b"+OK\r\n"
+            elif command == b"DEL":
+                reply = b":%d\r\n" % sum(data.pop(key, None) is not None for key in args[1:])
+            elif command == b"SCAN":
+                prefix = args[3][:-1]
+                keys = [key for key in data if key.startswith(prefix)]
+                reply = b"*2\r\n" + self._bulk(b"0") + b"*%d\r\n" % len(keys) + b"".join(self._bulk(k) for k in keys)
+            else:
+                reply = b"-ERR unknown command\r\n"
+            self.wfile.write(reply)
+
+
+class _RespServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _RespHandler)
+        self.data = {}
+        self.commands = []
+
+
+class StoreContract:
+    """Behaviour every backend shares."""
+
+    def make_store(self, **kwargs):
+        raise NotImplementedError
+
+    def test_round_trip_is_compressed(self):
+        store = self.make_store()
+        self.assertTrue(store.put("quiz|k", RESULT, ttl=60))
+        self.assertEqual(store.get("quiz|k"), RESULT)
+        self.assertLess(len(encode(RESULT)), len(str(RESULT)) / 4)
+        self.assertEqual(store.stats()["hits"], 1)
+
+    def test_miss_and_ttl(self):
+        store = self.make_store()
+        self.assertIsNone(store.get("missing"))
+        store.put("short", RESULT, ttl=0.05)
+        time.sleep(0.1)
+        self.assertIsNone(store.get("short"))
+        self.assertEqual(store.stats()["misses"], 2)
+
+    def test_oversized_values_are_rejected(self):
+        store = self.make_store(max_value_bytes=10)
+        self.assertFalse(store.put("big", RESULT, ttl=60))
+        self.assertIsNone(store.get("big"))
+        self.assertEqual(store.stats()["rejected"], 1)
+
+    def test_delete_and_clear(self):
+        store = self.make_store()
+        store.put("a", RESULT, ttl=60)
+        store.put("b", RESULT, ttl=60)
+        store.delete("a")
+        self.assertIsNone(store.get("a"))
+        store.clear()
+        self.assertIsNone(store.get("b"))
+
+
+class TestMemoryResultStore(StoreContract, unittest.TestCase):
+    """Tests for MemoryResultStore."""
+
+    def make_store(self, **kwargs):
+        return MemoryResultStore(**kwargs)
+
+    def test_byte_cap_evicts_least_recently_used(self):
+        size = len(encode(RESULT))
+        store = MemoryResultStore(max_bytes=size * 2)
+        store.put("a", RESULT, ttl=60)
+        store.put("b", RESULT, ttl=60)
+        store.get("a")
+        store.put("c", RESULT, ttl=60)
+
+        self.assertIsNone(store.get("b"))
+        self.assertIsNotNone(store.get("a"))
+        self.assertEqual(store.stats()["evictions"], 1)
+
+
+class TestSQLiteResultStore(StoreContract, unittest.TestCase):
+    """Tests for SQLiteResultStore."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "results.sqlite")
+
+    def make_store(self, **kwargs):
+        return SQLiteResultStore(self.path, **kwargs)
+
+    def test_byte_cap_evicts_oldest(self):
+        size = len(encode(RESULT))
+        store = SQLiteResultStore(self.path, max_bytes=size * 2)
+        for key in ("a", "b", "c"):
+            store.put(key, RESULT, ttl=60)
+
+        self.assertIsNone(store.get("a"))
+        self.assertIsNotNone(store.get("c"))
+        self.assertEqual(store.stats()["evictions"], 1)
+
+    def test_workers_share_results(self):
+        first = ResponseCache(store=SQLiteResultStore(self.path))
+        second = ResponseCache(store=SQLiteResultStore(self.path))
+
+        first.put("quiz|career|v1", RESULT)
+        self.assertEqual(second.get("quiz|career|v1"), RESULT)
+        self.assertEqual(second.stats()["store"]["hits"], 1)
+        # Now served from the second worker's own memory
+        second.get("quiz|career|v1")
+        self.assertEqual(second.stats()["store"]["hits"], 1)
+        self.assertEqual(second.stats()["hits"], 2)
+
+    def test_shared_entries_keep_their_ttl(self):
+        with patch.object(time, "time", return_value=1000.0):
+            ResponseCache(ttl=60, store=SQLiteResultStore(self.path)).put("k", RESULT)
+        cache = ResponseCache(ttl=60, store=SQLiteResultStore(self.path))
+        with patch.object(time, "time", return_value=1030.0):
+            self.assertEqual(cache.get("k"), RESULT)
+        with patch.object(time, "time", return_value=1061.0):
+            self.assertIsNone(cache.get("k"))
+
+
+class TestRedisResultStore(StoreContract, unittest.TestCase):
+    """Tests for RedisResultStore against a local RESP stand-in."""
+
+    def setUp(self):
+        self.server = _RespServer()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def make_store(self, **kwargs):
+        return RedisResultStore(host="127.0.0.1", port=self.server.server_address[1], **kwargs)
+
+    def test_keys_are_namespaced_with_millisecond_ttls(self):
+        self.make_store().put("quiz|k", RESULT, ttl=1.5)
+        value, expire_at = self.server.data[b"portfolio:result:quiz|k"]
+        self.assertEqual(decode(value), RESULT)
+        self.assertAlmostEqual(expire_at - time.time(), 1.5, delta=0.5)
+
+    def test_clear_only_drops_own_keys(self):
+        self.server.data[b"other:key"] = (b"x", None)
+        store = self.make_store()
+        store.put("a", RESULT, ttl=60)
+        store.clear()
+        self.assertEqual(list(self.server.data), [b"other:key"])
+
+    def test_reconnects_after_a_dropped_connection(self):
+        store = self.make_store()
+        store.put("a", RESULT, ttl=60)
+        store._conn._sock.shutdown(socket.SHUT_RDWR)
+        self.assertEqual(store.get("a"), RESULT)
+
+    def test_unreachable_server_is_a_miss(self):
+        port = self.server.server_address[1]
+        self.server.shutdown()
+        self.server.server_close()
+        store = RedisResultStore(port=port, timeout=0.1)
+
+        self.assertIsNone(store.get("a"))
+        self.assertFalse(store.put("a", RESULT, ttl=60))
+        self.assertEqual(store.stats()["errors"], 2)
+
+    def test_async_cache_uses_store_off_loop(self):
+        cache = ResponseCache(store=self.make_store())
+
+        async def run():
+            await cache.aput("k", RESULT)
+            cache._entries.clear()
+            return await cache.aget("k")
+
+        self.assertEqual(asyncio.run(run()), RESULT)
+        self.assertIn(b"SET", self.server.commands)
+
+
+class TestCreateResultStore(unittest.TestCase):
+    """Tests for RESULT_STORE_URL parsing."""
+
+    def test_urls(self):
+        self.assertIsNone(create_result_store(""))
+        self.assertIsInstance(create_result_store("memory://"), MemoryResultStore)
+        self.assertIsInstance(create_result_store("sqlite://"), SQLiteResultStore)
+        store = create_result_store("redis://:secret@cache.internal:6380/2")
+        self.assertEqual((store._conn.host, store._conn.port, store._conn.db, store._conn.password),
+                         ("cache.internal", 6380, 2, "secret"))
+        with self.assertRaises(ValueError):
+            create_result_store("memcached://localhost")
+
+    def test_error_results_are_not_shared(self):
+        store = MemoryResultStore()
+        ResponseCache(store=store).put("k", {"error": "boom"})
+        self.assertEqual(store.stats()["writes"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
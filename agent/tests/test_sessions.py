@@ -0,0 +1,184 @@
+"""
+Unit tests for the session store and session-aware chat.
+
+Tests cover:
+- Compaction: recent turns verbatim, older turns summarized within a cap
+- LRU, idle TTL and byte-cap eviction, shared by every tenant namespace
+- The anonymous "default" session is never stored
+- Chat follow-ups sending history and a delta context instead of the full portfolio:
+  rendered sections in full and an outline of every other section
+- Older turns summarized in the system instruction, keeping turns alternating
+- Renders through /generate recorded in the session
+"""
+
+import os
+import sys
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+
+# Add parent directories to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import server
+import sessions
+from agent import LearningMaterialAgent
+from context_cache import ContextCacheStore
+from sessions import SessionStore
+
+
+class TestSessionStore(unittest.TestCase):
+    """Tests for SessionStore."""
+
+    def test_compaction(self):
+        store = SessionStore(recent_turns=4, summary_chars=120)
+        for i in range(5):
+            store.record_turn("s1", f"question {i} " + "x" * 200, f"answer {i}")
+
+        session = store.get("s1")
+        self.assertEqual([t["text"] for t in session["turns"]], ["question 3 " + "x" * 200, "answer 3", "question 4 " + "x" * 200, "answer 4"])
+        self.assertLessEqual(sum(len(line) + 1 for line in session["summary"]), 120)
+        self.assertEqual(session["summary"][-1], "model: answer 2")
+        self.assertTrue(all(len(line) <= 170 for line in session["summary"]))
+
+    def test_namespaces_are_isolated(self):
+        store = SessionStore(max_entries=2)
+        store.record_turn("s1", "hi acme", "hello", namespace="acme")
+        store.record_turn("s1", "hi default", "hello")
+
+        self.assertEqual(store.get("s1", namespace="acme")["turns"][0]["text"], "hi acme")
+        self.assertEqual(store.get("s1")["turns"][0]["text"], "hi default")
+        # The caps cover every namespace together
+        store.record_turn("s2", "hi", "hello", namespace="globex")
+        self.assertIsNone(store.get("s1", namespace="acme"))
+        self.assertEqual(store.stats()["sessions"], 2)
+
+    def test_rendered_formats(self):
+        store = SessionStore()
+        store.record_render("s1", "certs", "")
+        store.record_render("s1", "quiz", "ATP")
+        store.record_render("s1", "quiz", "ATP")
+        self.assertEqual(store.get("s1")["rendered"], {"certs": [""], "quiz": ["ATP"]})
+
+    def test_lru_eviction(self):
+        store = SessionStore(max_entries=2)
+        store.record_turn("a", "hi", "hello")
+        store.record_turn("b", "hi", "hello")
+        store.get("a")
+        store.record_turn("c", "hi", "hello")
+
+        self.assertIsNone(store.get("b"))
+        self.assertIsNotNone(store.get("a"))
+        self.assertEqual(store.stats()["evictions"], 1)
+
+    def test_ttl(self):
+        store = SessionStore(ttl=10)
+        with patch.object(sessions.time, "time", return_value=1000.0):
+            store.record_turn("a", "hi", "hello")
+        with patch.object(sessions.time, "time", return_value=1011.0):
+            self.assertIsNone(store.get("a"))
+        self.assertEqual(store.stats(), {"sessions": 0, "bytes": 0, "evictions": 0, "expirations": 1})
+
+    def test_byte_cap(self):
+        store = SessionStore(max_bytes=2000)
+        for i in range(10):
+            store.record_turn(f"s{i}", "q" * 300, "a" * 300)
+
+        stats = store.stats()
+        self.assertLessEqual(stats["bytes"], 2000)
+        self.assertGreater(stats["evictions"], 0)
+        self.assertIsNotNone(store.get("s9"))
+
+    def test_anonymous_session_is_not_stored(self):
+        store = SessionStore()
+        store.record_turn("default", "hi", "hello")
+        store.record_turn("", "hi", "hello")
+        self.assertIsNone(store.get("default"))
+        self.assertEqual(store.stats()["sessions"], 0)
+
+
+class TestSessionChat(unittest.IsolatedAsyncioTestCase):
+    """Tests for session-aware LearningMaterialAgent.stream."""
+
+    def setUp(self):
+        self.client = MagicMock()
+        self.client.aio.models.generate_content = AsyncMock(return_value=MagicMock(text="He holds many certifications."))
+        self.agent = LearningMaterialAgent(client=self.client, cache_store=ContextCacheStore(":memory:"))
+        self.agent._get_cache_name = AsyncMock(return_value=None)
+
+    async def _chat(self, message, session_id="s1"):
+        events = [event async for event in self.agent.stream(message, session_id)]
+        call = self.client.aio.models.generate_content.call_args.kwargs
+        return events, call["contents"], call["config"].system_instruction
+
+    async def test_first_chat_gets_full_context(self):
+        _, contents, instruction = await self._chat("hello there")
+        self.assertEqual(len(contents), 1)
+        self.assertIn("COMICS:", instruction)
+
+    async def test_follow_up_gets_history_and_delta_context(self):
+        full_context_chars = len((await self._chat("hello there", "other"))[2])
+
+        [event async for event in self.agent.stream("certs:cloud", "s1")]
+        await self._chat("which one was hardest?")
+        events, contents, instruction = await self._chat("and the newest?")
+
+        self.assertEqual(events, [{"text": "He holds many certifications."}])
+        self.assertIn("CERTIFICATIONS:", instruction)
+        self.assertIn("ALREADY SHOWN TO THE USER: certs (cloud)", instruction)
+        # Other sections are outlined, not dumped
+        self.assertIn('COMICS: [{"title":"Business Leaders Edition"}', instruction)
+        self.assertNotIn("agent_comic.png", instruction)
+        self.assertLess(len(instruction), full_context_chars * 3 / 4)
+        self.assertEqual(
+            [(c.role, c.parts[0].text) for c in contents],
+            [
+                ("user", "certs:cloud"),
+                ("model", "[Showed certs about cloud]"),
+                ("user", "which one was hardest?"),
+                ("model", "He holds many certifications."),
+                ("user", "and the newest?"),
+            ],
+        )
+
+    async def test_follow_up_about_unrendered_section(self):
+        [event async for event in self.agent.stream("awards:recognition", "s1")]
+        _, _, instruction = await self._chat("what projects has he built?")
+
+        self.assertIn("AWARDS:", instruction)
+        self.assertIn("OUTLINE OF THE OTHER SECTIONS:", instruction)
+        for section in ("PROJECTS", "SKILLS", "PUBLICATIONS"):
+            self.assertIn(f"\n{section}: ", instruction)
+        self.assertIn("NBC Olympic Concierge", instruction)
+
+    async def test_summary_in_instruction_keeps_turns_alternating(self):
+        self.agent.sessions = SessionStore(recent_turns=2)
+        for i in range(3):
+            await self._chat(f"question {i}")
+        _, contents, instruction = await self._chat("last question")
+
+        self.assertIn("EARLIER IN THIS CONVERSATION:\nuser: question 0", instruction)
+        roles = [c.role for c in contents]
+        self.assertEqual(roles, ["user", "model", "user"])
+        self.assertEqual(contents[-1].parts[0].text, "last question")
+
+    async def test_generate_endpoint_records_render(self):
+        transport = httpx.ASGITransport(app=server.app)
+        with patch.object(server, "get_agent", return_value=self.agent):
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                response = await client.post("/generate", json={"format": "certs", "context": "cloud", "session_id": "s1"})
+        self.assertEqual(response.status_code, 200)
+
+        _, _, instruction = await self._chat("which one was hardest?")
+        self.assertIn("ALREADY SHOWN TO THE USER: certs (cloud)", instruction)
+
+    async def test_sessions_are_isolated(self):
+        [event async for event in self.agent.stream("certs:cloud", "s1")]
+        _, contents, instruction = await self._chat("hello", "s2")
+        self.assertEqual(len(contents), 1)
+        self.assertIn("COMICS:", instruction)
+
+
+if __name__ == "__main__":
+    unittest.main()
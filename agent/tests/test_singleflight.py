@@ -0,0 +1,98 @@
+"""
+Unit tests for single-flight request coalescing.
+
+Tests:
+- Concurrent callers with the same key share one execution
+- Exceptions propagate to every waiter
+- Different keys and sequential calls are not coalesced
+- A cancelled waiter does not cancel the shared call
+"""
+
+import asyncio
+import unittest
+
+import sys
+import os
+
+# Add parent directories to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from singleflight import SingleFlight
+
+
+class TestSingleFlight(unittest.IsolatedAsyncioTestCase):
+    """Tests for SingleFlight."""
+
+    async def test_concurrent_calls_share_one_execution(self):
+        """Verify N concurrent callers trigger one call and all get its result."""
+        flight = SingleFlight()
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"format": "timeline"}
+
+        results = await asyncio.gather(*(flight.do("timeline", work) for _ in range(5)))
+
+        self.assertEqual(calls, 1)
+        self.assertTrue(all(r == {"format": "timeline"} for r in results))
+        self.assertEqual(flight.stats()["executions"], 1)
+        self.assertEqual(flight.stats()["coalesced"], 4)
+        self.assertEqual(flight.stats()["in_flight"], 0)
+
+    async def test_exception_propagates_to_all_waiters(self):
+        """Verify every waiter sees the leader's exception."""
+        flight = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("quota exceeded")
+
+        results = await asyncio.gather(*(flight.do("certs", work) for _ in range(3)), return_exceptions=True)
+
+        self.assertEqual(len(results), 3)
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
+
+    async def test_different_keys_not_coalesced(self):
+        """Verify distinct keys run independently."""
+        flight = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.01)
+            return True
+
+        await asyncio.gather(flight.do("a", work), flight.do("b", work))
+        self.assertEqual(flight.stats()["executions"], 2)
+        self.assertEqual(flight.stats()["coalesced"], 0)
+
+    async def test_sequential_calls_run_again(self):
+        """Verify a finished call is not reused by later callers."""
+        flight = SingleFlight()
+
+        async def work():
+            return True
+
+        await flight.do("a", work)
+        await flight.do("a", work)
+        self.assertEqual(flight.stats()["executions"], 2)
+
+    async def test_cancelled_waiter_does_not_cancel_shared_call(self):
+        """Verify other waiters still get the result when one is cancelled."""
+        flight = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        leader = asyncio.ensure_future(flight.do("k", work))
+        follower = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+
+        self.assertEqual(await follower, "done")
+
+
+if __name__ == "__main__":
+    unittest.main()
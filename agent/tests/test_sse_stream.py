@@ -0,0 +1,148 @@
+"""
+Unit tests for /a2a/stream disconnect handling, heartbeats and deadline.
+
+Tests cover:
+- Events encoded as SSE, with no-cache and unbuffered response headers
+- Heartbeat comments while the agent is idle
+- The stream deadline ending the stream with an error event
+- A client disconnect cancelling the agent's stream mid-generation
+- Cancellations counted in portfolio_stream_cancellations_total
+"""
+
+import asyncio
+import json
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+# Add parent directories to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import server
+from metrics import STREAM_CANCELLATIONS
+
+
+class FakeAgent:
+    """stream() yields one event per delay, recording whether it was cancelled."""
+
+    def __init__(self, delays=(0.0,)):
+        self.delays = delays
+        self.cancelled = asyncio.Event()
+        self.finished = False
+
+    async def stream(self, message, session_id=None):
+        try:
+            for index, delay in enumerate(self.delays):
+                await asyncio.sleep(delay)
+                yield {"index": index, "message": message}
+            self.finished = True
+        except asyncio.CancelledError:
+            self.cancelled.set()
+            raise
+
+
+class FakeRequest:
+    """Reports a disconnect once `disconnected` is set."""
+
+    def __init__(self):
+        self.disconnected = False
+
+    async def is_disconnected(self):
+        return self.disconnected
+
+
+def _events(chunks):
+    return [json.loads(chunk[len("data: "):]) for chunk in chunks if chunk.startswith("data: ")]
+
+
+class TestGuardStream(unittest.IsolatedAsyncioTestCase):
+    """Tests for server.guard_stream."""
+
+    def setUp(self):
+        for name, value in (("SSE_HEARTBEAT_INTERVAL", 0.02), ("SSE_STREAM_DEADLINE", 5.0)):
+            patcher = patch.object(server, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.request = FakeRequest()
+
+    async def _collect(self, agent):
+        return [chunk async for chunk in server.guard_stream(agent.stream("quiz:cloud"), self.request, "test")]
+
+    async def test_heartbeats_while_idle(self):
+        agent = FakeAgent(delays=(0.0, 0.1))
+        chunks = await self._collect(agent)
+
+        self.assertGreaterEqual(chunks.count(server.SSE_HEARTBEAT), 2)
+        self.assertEqual([e["index"] for e in _events(chunks)], [0, 1])
+        self.assertTrue(agent.finished)
+
+    async def test_deadline_cancels_the_agent(self):
+        agent = FakeAgent(delays=(0.0, 10.0))
+        before = STREAM_CANCELLATIONS.value("test", "deadline")
+        with patch.object(server, "SSE_STREAM_DEADLINE", 0.1):
+            chunks = await self._collect(agent)
+
+        events = _events(chunks)
+        self.assertEqual(events[0]["index"], 0)
+        self.assertIn("deadline", events[-1]["error"])
+        await asyncio.wait_for(agent.cancelled.wait(), 1)
+        self.assertEqual(STREAM_CANCELLATIONS.value("test", "deadline"), before + 1)
+
+    async def test_disconnect_cancels_the_agent(self):
+        agent = FakeAgent(delays=(0.0, 10.0))
+        before = STREAM_CANCELLATIONS.value("test", "disconnect")
+        stream = server.guard_stream(agent.stream("quiz:cloud"), self.request, "test")
+
+        self.assertEqual(_events([await stream.__anext__()])[0]["index"], 0)
+        self.request.disconnected = True
+        with self.assertRaises(StopAsyncIteration):
+            while True:
+                await stream.__anext__()
+
+        await asyncio.wait_for(agent.cancelled.wait(), 1)
+        self.assertFalse(agent.finished)
+        self.assertEqual(STREAM_CANCELLATIONS.value("test", "disconnect"), before + 1)
+
+    async def test_cancelled_response_cancels_the_agent(self):
+        """Starlette cancels the response task when it sees the disconnect first."""
+        agent = FakeAgent(delays=(10.0,))
+        before = STREAM_CANCELLATIONS.value("test", "disconnect")
+        task = asyncio.ensure_future(self._collect(agent))
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        await asyncio.wait_for(agent.cancelled.wait(), 1)
+        self.assertEqual(STREAM_CANCELLATIONS.value("test", "disconnect"), before + 1)
+
+    async def test_completed_stream_is_not_counted(self):
+        before = STREAM_CANCELLATIONS.value("test", "disconnect")
+        chunks = await self._collect(FakeAgent(delays=(0.0, 0.0)))
+
+        self.assertEqual(len(_events(chunks)), 2)
+        self.assertEqual(STREAM_CANCELLATIONS.value("test", "disconnect"), before)
+
+
+class TestA2AStreamEndpoint(unittest.IsolatedAsyncioTestCase):
+    """Tests for POST /a2a/stream."""
+
+    async def test_events_and_headers(self):
+        agent = FakeAgent(delays=(0.0, 0.0))
+        transport = httpx.ASGITransport(app=server.app)
+        with patch.object(server, "get_agent", return_value=agent):
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                response = await client.post("/a2a/stream", json={"message": "quiz:cloud"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["cache-control"], "no-cache")
+        self.assertEqual(response.headers["x-accel-buffering"], "no")
+        events = _events(response.text.split("\n\n"))
+        self.assertEqual([e["message"] for e in events], ["quiz:cloud", "quiz:cloud"])
+
+
+if __name__ == "__main__":
+    unittest.main()
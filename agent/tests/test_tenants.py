@@ -0,0 +1,206 @@
+"""
+Unit tests for the multi-tenant portfolio registry.
+
+Tests cover:
+- Loading JSON and YAML portfolio files on first use
+- LRU eviction of idle tenants and reloading on the next request
+- Invalid and unknown tenant IDs
+- Tenant agents rendering, prompting and attributing from their own data
+- Tenant selection on the server by header and path prefix
+"""
+
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import httpx
+
+# Add parent directories to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import agent as agent_module
+import server
+from agent import LearningMaterialAgent
+from context_cache import ContextCacheStore
+from context_projections import DEFAULT_PORTFOLIO, Portfolio
+from tenants import TenantRegistry, UnknownTenant, load_portfolio
+
+ACME = {
+    "PROFILE": {"name": "Ada Lovelace", "links": {"portfolio": "https://ada.example"}},
+    "EXPERIENCE": [{"company": "Analytical Engines", "role": "Programmer", "period": "1843", "highlights": ["First program"], "impact": "Invented programming"}],
+    "CERTIFICATIONS": ["Mathematics"],
+    "AWARDS": ["Pioneer Award"],
+    "RAW_AWARDS": [{"title": "Pioneer Award", "description": "For the first algorithm."}],
+}
+
+YAML_PORTFOLIO = """
+PROFILE:
+  name: Grace Hopper
+  links:
+    portfolio: https://grace.example
+SOURCES:
+  awards:
+    provider: Navy
+    url: https://navy.example
+"""
+
+
+def _agent(portfolio):
+    return LearningMaterialAgent(portfolio=portfolio, client=MagicMock(), cache_store=ContextCacheStore(":memory:"))
+
+
+class TestTenantRegistry(unittest.TestCase):
+    """Tests for TenantRegistry."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        path = Path(self.directory.name)
+        for name in ("acme", "beta", "gamma"):
+            (path / f"{name}.json").write_text(json.dumps(ACME))
+        (path / "grace.yaml").write_text(YAML_PORTFOLIO)
+        self.registry = TenantRegistry(self.directory.name, _agent, max_tenants=2)
+
+    def test_loads_on_first_use(self):
+        agent = self.registry.get("acme")
+        self.assertIs(self.registry.get("acme"), agent)
+        self.assertEqual(agent.portfolio.owner, "Ada Lovelace")
+        self.assertEqual(self.registry.stats(), {"loaded": 1, "loads": 1, "evictions": 0})
+
+    @unittest.skipUnless(importlib.util.find_spec("yaml"), "PyYAML not installed")
+    def test_yaml(self):
+        portfolio = load_portfolio(Path(self.directory.name) / "grace.yaml", "grace")
+        self.assertEqual(portfolio.owner, "Grace Hopper")
+        self.assertIn("grace.example", portfolio.contexts["full"])
+
+    def test_evicts_least_recently_used(self):
+        self.registry.get("acme")
+        self.registry.get("beta")
+        self.registry.get("acme")
+        self.registry.get("gamma")
+
+        self.assertNotIn("beta", self.registry)
+        self.assertIn("acme", self.registry)
+        self.assertEqual(self.registry.stats()["evictions"], 1)
+
+        self.registry.get("beta")
+        self.assertEqual(self.registry.stats()["loads"], 4)
+
+    def test_unknown_and_invalid_tenants(self):
+        with self.assertRaises(UnknownTenant):
+            self.registry.get("nobody")
+        for tenant_id in ("../acme", "acme.json", "", "a" * 65):
+            with self.subTest(tenant_id=tenant_id), self.assertRaises(ValueError):
+                self.registry.get(tenant_id)
+
+    def test_malformed_file(self):
+        (Path(self.directory.name) / "broken.json").write_text("[]")
+        with self.assertRaises(ValueError):
+            self.registry.get("broken")
+
+
+class TestTenantAgent(unittest.IsolatedAsyncioTestCase):
+    """Tests for an agent serving a tenant's portfolio."""
+
+    def setUp(self):
+        self.portfolio = Portfolio(ACME, tenant_id="acme")
+        self.agent = _agent(self.portfolio)
+
+    async def test_deterministic_render_uses_tenant_data(self):
+        result = await self.agent.generate_content("awards")
+        self.assertIn("Pioneer Award", json.dumps(result["a2ui"]))
+        self.assertEqual(result["source"], {"provider": "Ada Lovelace", "url": "https://ada.example"})
+
+    async def test_prompt_uses_tenant_context_and_name(self):
+        async def no_cache(*args):
+            return None
+
+        self.agent._get_cache_name = no_cache
+        _, config = await self.agent._prepare_generation("quiz", "career")
+
+        self.assertIn("Analytical Engines", config.system_instruction)
+        self.assertIn("Ada Lovelace's Portfolio Agent", config.system_instruction)
+        self.assertNotIn("Enrique", config.system_instruction)
+
+    def test_default_portfolio_is_unchanged(self):
+        self.assertEqual(DEFAULT_PORTFOLIO.personalize("Enrique K Chan"), "Enrique K Chan")
+        self.assertEqual(_agent(DEFAULT_PORTFOLIO)._source_for("certs")["provider"], "Credly / Google")
+
+
+class TestTenantSelection(unittest.IsolatedAsyncioTestCase):
+    """Tests for picking the tenant on the server."""
+
+    def setUp(self):
+        self.default = MagicMock()
+        self.tenant = MagicMock()
+
+        async def default_generate(*args, **kwargs):
+            return {"tenant": "default"}
+
+        async def tenant_generate(*args, **kwargs):
+            return {"tenant": "acme"}
+
+        self.default.generate_content = default_generate
+        self.tenant.generate_content = tenant_generate
+
+        def get_tenant_agent(tenant_id):
+            if tenant_id != "acme":
+                raise UnknownTenant(tenant_id)
+            return self.tenant
+
+        for name, value in (("get_agent", lambda: self.default), ("get_tenant_agent", get_tenant_agent)):
+            patcher = patch.object(server, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def _post(self, path, headers=None):
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post(path, json={"format": "quiz", "message": "quiz:career"}, headers=headers)
+
+    async def test_default_tenant(self):
+        self.assertEqual((await self._post("/generate")).json(), {"tenant": "default"})
+
+    async def test_header(self):
+        response = await self._post("/generate", headers={"X-Tenant-ID": "acme"})
+        self.assertEqual(response.json(), {"tenant": "acme"})
+
+    async def test_path_prefix(self):
+        for path in ("/tenants/acme/generate", "/tenants/acme/a2a/query"):
+            with self.subTest(path=path):
+                self.assertEqual((await self._post(path)).json(), {"tenant": "acme"})
+
+    async def test_query_parameter_is_ignored(self):
+        self.assertEqual((await self._post("/generate?tenant_id=acme")).json(), {"tenant": "default"})
+
+    async def test_unknown_and_invalid(self):
+        self.assertEqual((await self._post("/tenants/nobody/generate")).status_code, 404)
+        self.assertEqual((await self._post("/generate", headers={"X-Tenant-ID": "a.b"})).status_code, 400)
+
+
+class TestGetTenantAgent(unittest.TestCase):
+    """Tests for agent.get_tenant_agent."""
+
+    def test_default_and_shared_client(self):
+        with tempfile.TemporaryDirectory() as directory:
+            (Path(directory) / "acme.json").write_text(json.dumps(ACME))
+            default = _agent(DEFAULT_PORTFOLIO)
+            with patch.object(agent_module, "_agent", default), \
+                    patch.object(agent_module, "_tenants", None), \
+                    patch.object(agent_module, "TENANTS_DIR", directory):
+                self.assertIs(agent_module.get_tenant_agent("default"), default)
+                tenant = agent_module.get_tenant_agent("acme")
+
+        self.assertIs(tenant.client, default.client)
+        self.assertIs(tenant.context_caches.store, default.context_caches.store)
+        self.assertIs(tenant.sessions, default.sessions)
+        self.assertEqual(tenant.portfolio.tenant_id, "acme")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+"""
+Unit tests for the startup warmup and readiness endpoint.
+
+Tests cover:
+- Every format is generated once, under the concurrency bound
+- Failing formats, and formats answered from the stale snapshot, are
+  recorded without blocking readiness
+- /ready returns 503 during warmup and 200 afterwards
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock, patch
+
+import httpx
+
+# Add parent directories to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import server
+from warmup import COMPLETE, DISABLED, WarmupState, warm_up
+
+
+class FakeAgent:
+    """Records generate_content calls and peak concurrency."""
+
+    def __init__(self, delay=0.01, fail=(), stale=()):
+        self.delay = delay
+        self.fail = set(fail)
+        self.stale = set(stale)
+        self.generated = []
+        self.active = 0
+        self.peak = 0
+        self._get_client = MagicMock()
+
+    async def generate_content(self, format_type, context_topic=""):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        self.generated.append(format_type)
+        if format_type in self.fail:
+            return {"error": "boom"}
+        if format_type in self.stale:
+            return {"format": format_type, "a2ui": [], "stale": True}
+        return {"format": format_type, "a2ui": []}
+
+
+class TestWarmUp(unittest.IsolatedAsyncioTestCase):
+    """Tests for warm_up."""
+
+    async def test_generates_every_format_with_bounded_concurrency(self):
+        """Verify each format is generated once and concurrency is bounded."""
+        agent = FakeAgent()
+        formats = ["a", "b", "c", "d", "e", "f"]
+        state = await warm_up(agent, WarmupState(), formats, concurrency=2)
+
+        self.assertEqual(sorted(agent.generated), formats)
+        self.assertLessEqual(agent.peak, 2)
+        agent._get_client.assert_called_once()
+        self.assertEqual(state.status, COMPLETE)
+        self.assertTrue(state.ready)
+        self.assertEqual(state.to_dict()["completed"], 6)
+
+    async def test_failures_do_not_block_readiness(self):
+        """Verify a failing format is reported and the instance still becomes ready."""
+        state = await warm_up(FakeAgent(fail={"b"}), WarmupState(), ["a", "b"], concurrency=2)
+
+        self.assertTrue(state.ready)
+        self.assertEqual(state.failed, {"b": "boom"})
+        self.assertEqual(state.completed, ["a"])
+
+    async def test_stale_results_are_not_warmed(self):
+        """Verify a format answered from the stale snapshot counts as failed."""
+        state = await warm_up(FakeAgent(stale={"b"}), WarmupState(), ["a", "b"], concurrency=2)
+
+        self.assertEqual(state.failed, {"b": "served stale snapshot"})
+        self.assertEqual(state.completed, ["a"])
+
+    def test_disabled_is_ready(self):
+        """Verify an instance without warmup is ready immediately."""
+        state = WarmupState(enabled=False)
+        self.assertEqual(state.status, DISABLED)
+        self.assertTrue(state.ready)
+
+
+class TestReadinessEndpoint(unittest.IsolatedAsyncioTestCase):
+    """Tests for GET /ready."""
+
+    async def test_ready_reports_progress(self):
+        """Verify /ready is 503 while warming and 200 afterwards, /health always 200."""
+        state = WarmupState()
+        transport = httpx.ASGITransport(app=server.app)
+        with patch.object(server, "warmup_state", state):
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                response = await client.get("/ready")
+                self.assertEqual(response.status_code, 503)
+                self.assertFalse(response.json()["ready"])
+                self.assertEqual((await client.get("/health")).status_code, 200)
+
+                await warm_up(FakeAgent(delay=0), state, ["a", "b"])
+
+                response = await client.get("/ready")
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json()["completed"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+"""
+Startup warmup for the response cache.
+
+After a deploy or scale-up the first visitor would otherwise pay full Gemini
+latency for every section of the page. The warmup builds the genai client,
+then generates the default-topic output of each supported format with bounded
+concurrency. Generating also creates the context caches the prompts use and
+fills the response cache, so the first real request for any format is a hit.
+
+Progress is tracked on a WarmupState so a readiness probe can hold traffic
+back until the cache is warm.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+COMPLETE = "complete"
+DISABLED = "disabled"
+
+
+class WarmupState:
+    """Progress of a warmup run, as reported by the readiness endpoint."""
+
+    def __init__(self, enabled: bool = True):
+        self.status = PENDING if enabled else DISABLED
+        self.total = 0
+        self.completed: list[str] = []
+        self.failed: dict[str, str] = {}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        """True once traffic can be routed (warm, or warmup not enabled)."""
+        return self.status in (COMPLETE, DISABLED)
+
+    def to_dict(self) -> dict[str, Any]:
+        elapsed = None
+        if self.started_at is not None:
+            elapsed = round((self.finished_at or time.monotonic()) - self.started_at, 3)
+        return {
+            "ready": self.ready,
+            "status": self.status,
+            "total": self.total,
+            "completed": len(self.completed),
+            "failed": dict(self.failed),
+            "elapsed_seconds": elapsed,
+        }
+
+
+async def warm_up(agent: Any, state: WarmupState, formats: Iterable[str], concurrency: int = 4) -> WarmupState:
+    """
+    Pre-generate each format for the default topic into the agent's caches.
+
+    A format that fails is recorded and left to be generated on demand; it
+    does not keep the instance out of rotation.
+    """
+    formats = list(formats)
+    state.status = RUNNING
+    state.total = len(formats)
+    state.started_at = time.monotonic()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def warm(format_type: str) -> None:
+        async with semaphore:
+            try:
+                result = await agent.generate_content(format_type)
+            except Exception as e:
+                result = {"error": str(e)}
+        if "error" not in result and result.get("stale"):
+            # The model failed or ran late and the snapshot was served; nothing got warmed
+            result = {"error": "served stale snapshot"}
+        if "error" in result:
+            state.failed[format_type] = result["error"]
+            logger.warning(f"Warmup failed for {format_type}: {result['error']}")
+        else:
+            state.completed.append(format_type)
+
+    try:
+        # Build the client up front so a misconfiguration fails once, not per format
+        agent._get_client()
+        await asyncio.gather(*(warm(f) for f in formats))
+    except Exception as e:
+        logger.warning(f"Warmup aborted: {e}")
+        for format_type in formats:
+            if format_type not in state.completed:
+                state.failed.setdefault(format_type, str(e))
+    finally:
+        state.status = COMPLETE
+        state.finished_at = time.monotonic()
+
+    logger.info(
+        f"Warmup complete: {len(state.completed)}/{state.total} formats cached "
+        f"in {state.finished_at - state.started_at:.1f}s"
+    )
+    return state
@@ -113,6 +113,61 @@ def main():
     model_id = os.getenv("GENAI_MODEL", "gemini-1.5-flash")
     SURFACE_ID = "learningContent"
 
+    # =========================================================================
+    # ADMISSION CONTROL - Bounded concurrency, wait queue and rate for Gemini
+    # Mirrors agent/admission.py (threaded, since the tools use the sync client).
+    # Semaphores are created on first use so the AdkApp stays picklable.
+    # =========================================================================
+
+    from contextlib import contextmanager
+
+    GENAI_MAX_CONCURRENCY = int(os.getenv("GENAI_MAX_CONCURRENCY", "8"))
+    GENAI_MAX_QUEUE = int(os.getenv("GENAI_MAX_QUEUE", "16"))
+    GENAI_QUEUE_TIMEOUT = float(os.getenv("GENAI_QUEUE_TIMEOUT", "10"))
+    GENAI_RATE_LIMIT = float(os.getenv("GENAI_RATE_LIMIT", "0"))
+    _admission = {}
+
+    @contextmanager
+    def admit_model_call():
+        """Hold a Gemini call slot; raise quickly when the queue or quota is exhausted."""
+        import threading
+        import time
+
+        # dict.setdefault is atomic, so racing first calls agree on one lock
+        lock = _admission.get("lock") or _admission.setdefault("lock", threading.Lock())
+        slots = _admission.get("slots")
+        if slots is None:
+            with lock:
+                slots = _admission.get("slots")
+                if slots is None:
+                    slots = _admission["slots"] = threading.BoundedSemaphore(GENAI_MAX_CONCURRENCY)
+        deadline = time.monotonic() + GENAI_QUEUE_TIMEOUT
+
+        with lock:
+            if _admission.get("waiting", 0) >= GENAI_MAX_QUEUE:
+                raise RuntimeError("Model call queue is full, retry later")
+            _admission["waiting"] = _admission.get("waiting", 0) + 1
+        try:
+            acquired = slots.acquire(timeout=GENAI_QUEUE_TIMEOUT)
+        finally:
+            with lock:
+                _admission["waiting"] -= 1
+        if not acquired:
+            raise RuntimeError("Timed out waiting for a model call slot, retry later")
+
+        try:
+            if GENAI_RATE_LIMIT > 0:
+                with lock:
+                    now = time.monotonic()
+                    start = max(now, _admission.get("next_start", 0.0))
+                    if start > deadline:
+                        raise RuntimeError("Model call rate limit exceeded, retry later")
+                    _admission["next_start"] = start + 1.0 / GENAI_RATE_LIMIT
+                time.sleep(start - now)
+            yield
+        finally:
+            slots.release()
+
     # =========================================================================
     # OPENSTAX CONTENT - Chapter mappings and content fetching
     # =========================================================================
@@ -720,13 +775,14 @@ EXAMPLES:
 
 Return ONLY a JSON array with exactly {max_chapters} slugs (or [] for non-biology):"""
 
-            response = client.models.generate_content(
-                model=model_id,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    response_mime_type="application/json",
-                ),
-            )
+            with admit_model_call():
+                response = client.models.generate_content(
+                    model=model_id,
+                    contents=prompt,
+                    config=types.GenerateContentConfig(
+                        response_mime_type="application/json",
+                    ),
+                )
 
             slugs = json.loads(response.text.strip())
             if isinstance(slugs, list):
@@ -869,14 +925,15 @@ Textbook source content:
             },
         }
 
-        response = client.models.generate_content(
-            model=model_id,
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                response_mime_type="application/json",
-                response_schema=flashcard_schema,
-            ),
-        )
+        with admit_model_call():
+            response = client.models.generate_content(
+                model=model_id,
+                contents=prompt,
+                config=types.GenerateContentConfig(
+                    response_mime_type="application/json",
+                    response_schema=flashcard_schema,
+                ),
+            )
         cards = json.loads(response.text.strip())
 
         # Handle case where LLM returns empty or invalid response
@@ -1003,14 +1060,15 @@ Textbook source content:
             },
         }
 
-        response = client.models.generate_content(
-            model=model_id,
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                response_mime_type="application/json",
-                response_schema=quiz_schema,
-            ),
-        )
+        with admit_model_call():
+            response = client.models.generate_content(
+                model=model_id,
+                contents=prompt,
+                config=types.GenerateContentConfig(
+                    response_mime_type="application/json",
+                    response_schema=quiz_schema,
+                ),
+            )
         quizzes = json.loads(response.text.strip())
 
         # Handle case where LLM returns empty or invalid response